@@ -0,0 +1,198 @@
+"""
+Pool of warm headless Chrome WebDriver instances for Selenium scraping.
+
+Launching Chrome costs seconds and hundreds of MB, so drivers are kept alive
+between pages and handed out by `BrowserPool.driver()`. Each checkout is
+health-checked, drivers are recycled after `max_pages` pages (or after any
+error during use), and at most `max_size` browsers exist at once.
+
+Environment:
+  BROWSER_POOL_SIZE       max concurrent browsers (default 2)
+  BROWSER_MAX_PAGES       pages served before a driver is recycled (default 50)
+  BROWSER_ACQUIRE_TIMEOUT seconds to wait for a free driver (default 60)
+  BROWSER_PAGE_TIMEOUT    page-load and script timeout per checkout (default 30)
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Callable, Iterator, List, Optional
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+    SELENIUM_AVAILABLE = True
+except Exception:
+    SELENIUM_AVAILABLE = False
+
+
+def _chrome_factory() -> Any:
+    if not SELENIUM_AVAILABLE:
+        raise RuntimeError("selenium is not installed")
+    options = ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    return webdriver.Chrome(options=options)
+
+
+@dataclass
+class _PooledDriver:
+    driver: Any
+    pages: int = 0
+
+
+class BrowserPool:
+    """Thread-safe pool of WebDriver instances."""
+
+    def __init__(
+        self,
+        max_size: int = 2,
+        max_pages: int = 50,
+        acquire_timeout: float = 60.0,
+        factory: Callable[[], Any] = _chrome_factory,
+        page_timeout: float = 30.0,
+    ) -> None:
+        self.max_size = max(1, max_size)
+        self.max_pages = max(1, max_pages)
+        self.acquire_timeout = acquire_timeout
+        self.page_timeout = page_timeout
+        self._factory = factory
+        self._idle: List[_PooledDriver] = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Check out a healthy driver; it is returned (or recycled) on exit.
+
+        `timeout` caps both the wait for a free driver and the driver's page-load
+        and script timeouts, so a caller's deadline also bounds the browser work.
+        """
+        entry = self._acquire(self.acquire_timeout if timeout is None else min(self.acquire_timeout, timeout))
+        healthy = False
+        try:
+            page_timeout = self.page_timeout if timeout is None else min(self.page_timeout, timeout)
+            entry.driver.set_page_load_timeout(page_timeout)
+            entry.driver.set_script_timeout(page_timeout)
+            yield entry.driver
+            healthy = True
+        finally:
+            entry.pages += 1
+            self._release(entry, healthy)
+
+    def warm(self, count: int) -> None:
+        """Start up to `count` browsers ahead of the first checkout."""
+        created: List[_PooledDriver] = []
+        with self._cond:
+            count = min(count, self.max_size - self._size)
+            self._size += max(0, count)
+        try:
+            for _ in range(max(0, count)):
+                created.append(_PooledDriver(self._factory()))
+        finally:
+            with self._cond:
+                self._size -= max(0, count) - len(created)
+                self._idle.extend(created)
+                self._cond.notify_all()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._quit(entry)
+
+    def _acquire(self, timeout: float) -> _PooledDriver:
+        deadline = monotonic() + timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("browser pool is closed")
+                    if self._idle:
+                        entry: Optional[_PooledDriver] = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        entry = None
+                        break
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("timed out waiting for a browser from the pool")
+                    self._cond.wait(remaining)
+
+            # Browser startup and health checks happen outside the lock
+            if entry is None:
+                try:
+                    return _PooledDriver(self._factory())
+                except Exception:
+                    self._discard_slot()
+                    raise
+            if self._is_healthy(entry):
+                return entry
+            self._quit(entry)
+            self._discard_slot()
+
+    def _release(self, entry: _PooledDriver, healthy: bool) -> None:
+        with self._cond:
+            if healthy and not self._closed and entry.pages < self.max_pages:
+                self._idle.append(entry)
+                self._cond.notify()
+                return
+        self._quit(entry)
+        self._discard_slot()
+
+    def _discard_slot(self) -> None:
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _is_healthy(entry: _PooledDriver) -> bool:
+        try:
+            return entry.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(entry: _PooledDriver) -> None:
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Process-wide pool shared by every scraper; closed automatically at exit."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(
+                max_size=int(os.getenv("BROWSER_POOL_SIZE", "2")),
+                max_pages=int(os.getenv("BROWSER_MAX_PAGES", "50")),
+                acquire_timeout=float(os.getenv("BROWSER_ACQUIRE_TIMEOUT", "60")),
+                page_timeout=float(os.getenv("BROWSER_PAGE_TIMEOUT", "30")),
+            )
+            atexit.register(_pool.close)
+        return _pool
+
+
+__all__ = ["BrowserPool", "get_browser_pool", "SELENIUM_AVAILABLE"]
@@ -0,0 +1,321 @@
+"""
+Resumable, incremental candidate crawl.
+
+Keeps its state in Mongo so scheduled runs only fetch new candidates and a
+crashed run resumes from its last checkpoint:
+
+- `crawl_frontier`: one document per query with `status`, `next_run_at` and a
+  lease (`lease_until`) so an abandoned run's queries become claimable again
+- `crawl_cursors`: per source/query cursor (`page` reached in the current
+  pass, `last_seen_id` high-watermark from the last completed pass)
+- `crawl_visited`: per source ids already processed
+
+GitHub users are searched newest-first (`sort=joined`), so each pass stops as
+soon as it reaches an id at or below the previous pass's high-watermark.
+Cursor, visited set and profiles are checkpointed after every page. A query
+that caught up is due again after `--recrawl-hours`; one paused by the page
+budget is due again immediately (but claimed at most once per run), so the
+next run resumes it from its checkpoint.
+
+CLI:
+  python -m agents.crawler --queries-file skills.txt     # enqueue seeds, then crawl due queries
+  python -m agents.crawler --max-pages 5 --recrawl-hours 24
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import os
+import socket
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+
+from agents.github_client import GitHubClient, get_github_client
+from agents.recruitment_agent import (
+    UpsertStats,
+    github_item_profile,
+    github_user_query,
+    iter_queries,
+    upsert_profiles,
+)
+from backend.utils.identity import BloomFilter, load_known_identities
+from backend.utils.tracing import cli_span
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def query_key(query: str) -> str:
+    return hashlib.sha1(query.strip().lower().encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CrawlCursor:
+    source: str
+    query: str
+    page: int = 0
+    last_seen_id: int = 0
+    pass_max_id: int = 0
+    in_progress: bool = False
+
+    @property
+    def key(self) -> str:
+        return f"{self.source}:{query_key(self.query)}"
+
+
+class CrawlStore:
+    """Mongo-backed frontier, cursors and visited set."""
+
+    def __init__(self, db: AsyncIOMotorDatabase, owner: Optional[str] = None) -> None:
+        self.frontier = db["crawl_frontier"]
+        self.cursors = db["crawl_cursors"]
+        self.visited = db["crawl_visited"]
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+
+    async def enqueue(self, queries: Iterable[str]) -> int:
+        now = _now()
+        ops = [
+            UpdateOne(
+                {"_id": query_key(q)},
+                {"$setOnInsert": {"query": q, "status": "idle", "next_run_at": now, "created_at": now}},
+                upsert=True,
+            )
+            for q in queries
+        ]
+        if not ops:
+            return 0
+        result = await self.frontier.bulk_write(ops, ordered=False)
+        return result.upserted_count
+
+    async def claim(self, lease: timedelta, exclude: Iterable[str] = ()) -> Optional[dict]:
+        """Lease the next due query (idle, or running with an expired lease) not in `exclude`."""
+        now = _now()
+        query: dict = {
+            "next_run_at": {"$lte": now},
+            "$or": [{"status": "idle"}, {"status": "running", "lease_until": {"$lt": now}}],
+        }
+        exclude = list(exclude)
+        if exclude:
+            query["_id"] = {"$nin": exclude}
+        return await self.frontier.find_one_and_update(
+            query,
+            {"$set": {"status": "running", "lease_until": now + lease, "owner": self.owner}},
+            sort=[("next_run_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def release(self, entry: dict, recrawl_after: timedelta, result: dict) -> None:
+        await self.frontier.update_one(
+            {"_id": entry["_id"], "owner": self.owner},
+            {
+                "$set": {
+                    "status": "idle",
+                    "next_run_at": _now() + recrawl_after,
+                    "last_run": {**result, "finished_at": _now()},
+                },
+                "$unset": {"lease_until": "", "owner": ""},
+            },
+        )
+
+    async def load_cursor(self, source: str, query: str) -> CrawlCursor:
+        cursor = CrawlCursor(source=source, query=query)
+        doc = await self.cursors.find_one({"_id": cursor.key})
+        if doc:
+            cursor.page = doc.get("page", 0)
+            cursor.last_seen_id = doc.get("last_seen_id", 0)
+            cursor.pass_max_id = doc.get("pass_max_id", 0)
+            cursor.in_progress = doc.get("in_progress", False)
+        return cursor
+
+    async def save_cursor(self, cursor: CrawlCursor) -> None:
+        await self.cursors.update_one(
+            {"_id": cursor.key},
+            {
+                "$set": {
+                    "source": cursor.source,
+                    "query": cursor.query,
+                    "page": cursor.page,
+                    "last_seen_id": cursor.last_seen_id,
+                    "pass_max_id": cursor.pass_max_id,
+                    "in_progress": cursor.in_progress,
+                    "updated_at": _now(),
+                }
+            },
+            upsert=True,
+        )
+
+    async def unvisited(self, source: str, ids: List[str]) -> List[str]:
+        keys = [f"{source}:{i}" for i in ids]
+        seen = {d["_id"] async for d in self.visited.find({"_id": {"$in": keys}}, {"_id": 1})}
+        return [i for i, k in zip(ids, keys) if k not in seen]
+
+    async def mark_visited(self, source: str, ids: List[str]) -> None:
+        if not ids:
+            return
+        now = _now()
+        await self.visited.bulk_write(
+            [
+                UpdateOne({"_id": f"{source}:{i}"}, {"$setOnInsert": {"first_seen_at": now}}, upsert=True)
+                for i in ids
+            ],
+            ordered=False,
+        )
+
+
+@dataclass
+class CrawlResult:
+    query: str
+    pages: int = 0
+    fetched: int = 0
+    new: int = 0
+    inserted: int = 0
+    caught_up: bool = False
+
+
+async def crawl_github_query(
+    client: AsyncIOMotorClient,
+    db_name: str,
+    store: CrawlStore,
+    github: GitHubClient,
+    query: str,
+    max_pages: int,
+    known: Optional[BloomFilter] = None,
+    per_page: int = 100,
+) -> CrawlResult:
+    """Crawl one query newest-first until caught up with the previous pass or out of budget."""
+    result = CrawlResult(query=query)
+    cursor = await store.load_cursor("github", query)
+    if not cursor.in_progress:
+        # Start a new pass from the newest users
+        cursor.page, cursor.pass_max_id, cursor.in_progress = 0, 0, True
+
+    while result.pages < max_pages:
+        page = cursor.page + 1
+        items = await asyncio.to_thread(
+            github.search_users_page, github_user_query(query), page, per_page, "joined", "desc"
+        )
+        result.pages += 1
+        result.fetched += len(items)
+        fresh = [it for it in items if int(it.get("id", 0)) > cursor.last_seen_id]
+        ids = [str(it["id"]) for it in fresh if "id" in it]
+        new_ids = set(await store.unvisited("github", ids))
+        new_items = [it for it in fresh if str(it.get("id")) in new_ids]
+        if new_items:
+            upserted: UpsertStats = await upsert_profiles(
+                client, db_name, [github_item_profile(it) for it in new_items], known=known
+            )
+            result.inserted += upserted.inserted
+            result.new += len(new_items)
+        await store.mark_visited("github", ids)
+
+        # Checkpoint after every page so a crash resumes here
+        cursor.page = page
+        cursor.pass_max_id = max([cursor.pass_max_id] + [int(i) for i in ids])
+        reached_seen = len(fresh) < len(items)
+        exhausted = len(items) < per_page
+        if reached_seen or exhausted:
+            cursor.last_seen_id = max(cursor.last_seen_id, cursor.pass_max_id)
+            cursor.page, cursor.pass_max_id, cursor.in_progress = 0, 0, False
+            result.caught_up = True
+        await store.save_cursor(cursor)
+        if result.caught_up:
+            break
+    return result
+
+
+async def crawl_due(
+    client: AsyncIOMotorClient,
+    db_name: str,
+    store: CrawlStore,
+    github: GitHubClient,
+    max_pages: int,
+    recrawl_after: timedelta,
+    lease: timedelta,
+    known: Optional[BloomFilter] = None,
+) -> List[CrawlResult]:
+    """Crawl every due query once, releasing each according to how its pass ended."""
+    results: List[CrawlResult] = []
+    claimed: List[str] = []
+    while True:
+        # A paused query is due again at once; don't spend this run's budget on it twice
+        entry = await store.claim(lease, exclude=claimed)
+        if entry is None:
+            break
+        claimed.append(entry["_id"])
+        try:
+            res = await crawl_github_query(client, db_name, store, github, entry["query"], max_pages, known=known)
+        except Exception as exc:
+            # Leave the cursor at its last checkpoint; retry on the next run
+            await store.release(entry, lease, {"error": str(exc)})
+            print(f"[{entry['query']}] FAILED: {exc}")
+            continue
+        # Caught up: wait for new users. Paused by the page budget: resume on the next run.
+        await store.release(entry, recrawl_after if res.caught_up else timedelta(0), res.__dict__)
+        results.append(res)
+        status = "caught up" if res.caught_up else "paused (page budget)"
+        print(
+            f"[{res.query}] pages={res.pages} fetched={res.fetched} new={res.new} "
+            f"inserted={res.inserted} {status}"
+        )
+    return results
+
+
+async def crawl_main_async(
+    queries_file: Optional[str],
+    max_pages: int,
+    recrawl_hours: float,
+    lease_minutes: float,
+) -> List[CrawlResult]:
+    from backend.config import get_settings
+    from backend.db import create_mongo_client
+
+    settings = get_settings()
+    client = create_mongo_client(settings, appname="agents.crawler")
+    try:
+        db = client[settings.db_name]
+        store = CrawlStore(db)
+        if queries_file:
+            added = await store.enqueue(iter_queries(queries_file))
+            print(f"Enqueued {added} new queries")
+        known = await load_known_identities(db["profiles"])
+        results = await crawl_due(
+            client,
+            settings.db_name,
+            store,
+            get_github_client(),
+            max_pages,
+            recrawl_after=timedelta(hours=recrawl_hours),
+            lease=timedelta(minutes=lease_minutes),
+            known=known,
+        )
+    finally:
+        client.close()
+    print(
+        f"Crawl summary: queries={len(results)} pages={sum(r.pages for r in results)} "
+        f"new={sum(r.new for r in results)} inserted={sum(r.inserted for r in results)}"
+    )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Incremental, resumable candidate crawl")
+    parser.add_argument("--queries-file", help="Seed queries to add to the frontier ('-' for stdin)")
+    parser.add_argument("--max-pages", type=int, default=10, help="Page budget per query per run")
+    parser.add_argument(
+        "--recrawl-hours", type=float, default=24.0, help="Delay before a caught-up query is due again"
+    )
+    parser.add_argument("--lease-minutes", type=float, default=30.0, help="Lease on a claimed query")
+    args = parser.parse_args()
+    with cli_span("agents.crawler", max_pages=args.max_pages):
+        asyncio.run(crawl_main_async(args.queries_file, args.max_pages, args.recrawl_hours, args.lease_minutes))
+
+
+if __name__ == "__main__":
+    main()
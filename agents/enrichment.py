@@ -0,0 +1,311 @@
+"""
+Profile enrichment: replaces scraped placeholders with real skills and location.
+
+Streams profiles whose GitHub identity has not been enriched yet (or whose
+`enriched_at` is older than `--stale-days`) through a bounded pipeline:
+
+  reader --(queue)--> N fetch workers --(queue)--> bulk writer
+
+Both queues are bounded, so a slow GitHub API stalls the Mongo cursor instead
+of buffering the whole collection, and a slow database stalls the workers.
+Workers fetch `/users/{login}` and the user's own repositories (through the
+shared cached, rate-limit-aware `agents.github_client`) and derive:
+
+- `skills`: repository languages ranked by number of non-fork repos, followed
+  by well-known repository topics (e.g. `machine-learning` -> Machine Learning)
+- `location`: the user's GitHub location, when set
+- `github`: login, name, followers, public_repos
+
+Updates are written in unordered `bulk_write` batches. Failures are recorded in
+`enrichment_error`:
+
+- permanent (the user is gone: HTTP 404/410) also stamp `enriched_at`, so the
+  profile is only retried once stale
+- transient (network errors, 5xx, timeouts) stamp `enrichment_retry_at`
+  instead, so the profile is picked up again after `--retry-minutes`
+- an exhausted rate limit stops the run: no further profiles are read or
+  fetched, finished updates are flushed and the rest stay pending
+
+CLI:
+  python -m agents.enrichment --limit 500 --concurrency 8
+  python -m agents.enrichment --stale-days 7 --batch-size 200 --retry-minutes 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Iterable, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from agents.github_client import GitHubClient, GitHubHTTPError, GitHubRateLimitError, get_github_client
+from backend.utils.tracing import cli_span
+
+
+MAX_SKILLS = 8
+# The user no longer exists; retrying before the profile is stale is pointless
+_PERMANENT_STATUSES = frozenset({404, 410})
+_GITHUB_PROFILE = re.compile(r"^https://github\.com/([A-Za-z0-9-]+)$")
+# Repository topics that name a skill better than the repository language does
+_TOPIC_SKILLS = {
+    "machine-learning": "Machine Learning",
+    "deep-learning": "Deep Learning",
+    "nlp": "NLP",
+    "natural-language-processing": "NLP",
+    "llm": "LLMs",
+    "llms": "LLMs",
+    "large-language-models": "LLMs",
+    "langchain": "LangChain",
+    "pytorch": "PyTorch",
+    "tensorflow": "TensorFlow",
+    "computer-vision": "Computer Vision",
+    "data-engineering": "Data Engineering",
+    "data-science": "Data Science",
+    "react": "React",
+    "nextjs": "Next.js",
+    "fastapi": "FastAPI",
+    "django": "Django",
+    "kubernetes": "Kubernetes",
+    "docker": "Docker",
+    "blockchain": "Blockchain",
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def github_login(url: str) -> Optional[str]:
+    """Login from a canonical `https://github.com/<login>` profile URL."""
+    match = _GITHUB_PROFILE.match(url or "")
+    return match.group(1) if match else None
+
+
+def derive_skills(repos: Iterable[dict], max_skills: int = MAX_SKILLS) -> List[str]:
+    """Rank languages by how many of the user's own repos use them, then add topic skills."""
+    languages: Counter = Counter()
+    topics: Counter = Counter()
+    for repo in repos:
+        if repo.get("fork"):
+            continue
+        if repo.get("language"):
+            languages[repo["language"]] += 1
+        for topic in repo.get("topics") or []:
+            skill = _TOPIC_SKILLS.get(str(topic).lower())
+            if skill:
+                topics[skill] += 1
+    skills = [lang for lang, _ in languages.most_common()]
+    skills += [s for s, _ in topics.most_common() if s not in skills]
+    return skills[:max_skills]
+
+
+def enrich_user(github: GitHubClient, login: str) -> dict:
+    """Blocking: fetch one user and their repos; returns the `$set` document."""
+    user = github.user(login)
+    repos = github.user_repos(login)
+    update = {
+        "skills": derive_skills(repos),
+        "github": {
+            "login": user.get("login", login),
+            "name": user.get("name"),
+            "followers": user.get("followers"),
+            "public_repos": user.get("public_repos"),
+        },
+        "enriched_at": _now(),
+    }
+    location = (user.get("location") or "").strip()
+    if location:
+        update["location"] = location
+    return update
+
+
+def pending_filter(stale_after: timedelta) -> dict:
+    """Profiles with a GitHub identity that were never enriched or are stale, and not waiting to retry."""
+    now = _now()
+    return {
+        "linkedin_url": {"$regex": r"^https://github\.com/"},
+        "duplicate_of": {"$exists": False},
+        "enrichment_retry_at": {"$not": {"$gt": now}},
+        "$or": [
+            {"enriched_at": {"$exists": False}},
+            {"enriched_at": {"$lt": now - stale_after}},
+        ],
+    }
+
+
+def _is_permanent_failure(exc: BaseException) -> bool:
+    return isinstance(exc, GitHubHTTPError) and exc.status in _PERMANENT_STATUSES
+
+
+@dataclass
+class EnrichmentStats:
+    scanned: int = 0
+    enriched: int = 0
+    failed: int = 0
+    skipped: int = 0
+    written: int = 0
+    batches: int = 0
+    duration_ms: float = 0.0
+    # Set when the run stopped early on an exhausted GitHub rate limit
+    rate_limited_until: Optional[datetime] = None
+
+
+async def enrich_profiles(
+    db: AsyncIOMotorDatabase,
+    github: GitHubClient,
+    limit: int = 0,
+    concurrency: int = 8,
+    batch_size: int = 100,
+    stale_after: timedelta = timedelta(days=30),
+    retry_after: timedelta = timedelta(hours=1),
+) -> EnrichmentStats:
+    """Enrich pending profiles through a bounded reader -> workers -> writer pipeline."""
+    col = db["profiles"]
+    stats = EnrichmentStats()
+    concurrency = max(1, concurrency)
+    todo: asyncio.Queue[Optional[dict]] = asyncio.Queue(maxsize=concurrency * 2)
+    done: asyncio.Queue[Optional[UpdateOne]] = asyncio.Queue(maxsize=batch_size * 2)
+    stop = asyncio.Event()
+    start = perf_counter()
+
+    async def _reader() -> None:
+        try:
+            cursor = col.find(pending_filter(stale_after), {"linkedin_url": 1}).sort("_id", 1)
+            if limit:
+                cursor = cursor.limit(limit)
+            async for doc in cursor:
+                if stop.is_set():
+                    break
+                stats.scanned += 1
+                await todo.put(doc)
+        finally:
+            # On cancellation the workers are cancelled too; a put could block forever
+            if not asyncio.current_task().cancelling():
+                for _ in range(concurrency):
+                    await todo.put(None)
+
+    async def _worker() -> None:
+        while True:
+            doc = await todo.get()
+            if doc is None:
+                return
+            if stop.is_set():
+                # Drain without fetching; the profile stays pending for the next run
+                continue
+            login = github_login(doc.get("linkedin_url", ""))
+            if not login:
+                stats.skipped += 1
+                continue
+            try:
+                update = await asyncio.to_thread(enrich_user, github, login)
+                update_doc = {"$set": update, "$unset": {"enrichment_error": "", "enrichment_retry_at": ""}}
+                stats.enriched += 1
+            except GitHubRateLimitError as exc:
+                # Every further request would fail the same way until the reset
+                stats.rate_limited_until = datetime.fromtimestamp(exc.reset_at, timezone.utc)
+                stop.set()
+                continue
+            except Exception as exc:
+                error = str(exc)[:500]
+                if _is_permanent_failure(exc):
+                    update_doc = {
+                        "$set": {"enrichment_error": error, "enriched_at": _now()},
+                        "$unset": {"enrichment_retry_at": ""},
+                    }
+                else:
+                    retry_at = _now() + retry_after
+                    update_doc = {"$set": {"enrichment_error": error, "enrichment_retry_at": retry_at}}
+                stats.failed += 1
+            await done.put(UpdateOne({"_id": doc["_id"]}, update_doc))
+
+    async def _writer() -> None:
+        batch: List[UpdateOne] = []
+        while True:
+            op = await done.get()
+            if op is not None:
+                batch.append(op)
+            if batch and (op is None or len(batch) >= batch_size):
+                result = await col.bulk_write(batch, ordered=False)
+                stats.written += result.modified_count
+                stats.batches += 1
+                batch = []
+            if op is None:
+                return
+
+    async def _fetch() -> None:
+        try:
+            await asyncio.gather(_reader(), *(_worker() for _ in range(concurrency)))
+        finally:
+            if not asyncio.current_task().cancelling():
+                await done.put(None)
+
+    fetch = asyncio.create_task(_fetch())
+    writer = asyncio.create_task(_writer())
+    try:
+        await asyncio.gather(fetch, writer)
+    finally:
+        # A failed writer would leave the workers blocked on the full done queue
+        for task in (fetch, writer):
+            task.cancel()
+        await asyncio.gather(fetch, writer, return_exceptions=True)
+    stats.duration_ms = (perf_counter() - start) * 1000
+    return stats
+
+
+async def main_async(
+    limit: int, concurrency: int, batch_size: int, stale_days: float, retry_minutes: float = 60.0
+) -> EnrichmentStats:
+    from backend.config import get_settings
+    from backend.db import create_mongo_client
+
+    settings = get_settings()
+    client = create_mongo_client(settings, appname="agents.enrichment")
+    try:
+        stats = await enrich_profiles(
+            client[settings.db_name],
+            get_github_client(),
+            limit=limit,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            stale_after=timedelta(days=stale_days),
+            retry_after=timedelta(minutes=retry_minutes),
+        )
+    finally:
+        client.close()
+    print(
+        f"Enrichment: scanned={stats.scanned} enriched={stats.enriched} failed={stats.failed} "
+        f"skipped={stats.skipped} written={stats.written} batches={stats.batches} "
+        f"time={stats.duration_ms / 1000:.1f}s"
+    )
+    if stats.rate_limited_until:
+        print(f"Stopped early: GitHub rate limit exhausted until {stats.rate_limited_until.isoformat()}")
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Enrich scraped profiles with GitHub skills and location")
+    parser.add_argument("--limit", type=int, default=0, help="Max profiles to enrich (0 = all pending)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Users fetched in parallel")
+    parser.add_argument("--batch-size", type=int, default=100, help="Profiles per bulk write")
+    parser.add_argument("--stale-days", type=float, default=30.0, help="Re-enrich profiles older than this")
+    parser.add_argument(
+        "--retry-minutes", type=float, default=60.0, help="Retry profiles that failed transiently after this"
+    )
+    args = parser.parse_args()
+    with cli_span("agents.enrichment", limit=args.limit, concurrency=args.concurrency):
+        asyncio.run(
+            main_async(
+                args.limit, args.concurrency, max(1, args.batch_size), args.stale_days, args.retry_minutes
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+GitHub REST client for candidate discovery.
+
+- Pages through search results (`per_page` up to 100, GitHub caps search at 1000)
+- Sends conditional requests (`If-None-Match`) backed by an on-disk response
+  cache, so unchanged pages come back as 304s that don't consume quota
+- Tracks `X-RateLimit-*` headers per resource (core/search) and sleeps until
+  the window resets instead of failing, up to `max_wait` seconds
+- Retries 5xx responses and transient network errors (resets, timeouts,
+  refused connections) with exponential backoff
+- Reuses keep-alive connections (`agents.http_fetch.HTTPConnectionPool`)
+- Honours the caller's `agents.http_fetch.deadline`: socket timeouts and sleeps
+  never run past it
+
+Environment:
+  GITHUB_TOKEN          optional token for higher rate limits
+  GITHUB_API_URL        API base URL (default https://api.github.com); point it
+                        at a local fake server for testing
+  GITHUB_CACHE_DIR      response cache directory (default ~/.cache/hackathon-twin/github)
+  GITHUB_MAX_RATE_WAIT  max seconds to sleep for a rate-limit reset (default 60)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import http.client
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional
+from urllib.parse import urlencode
+
+from agents.http_fetch import HTTPConnectionPool, time_left
+
+
+DEFAULT_API_URL = "https://api.github.com"
+SEARCH_RESULTS_CAP = 1000
+# Connection resets, socket timeouts, DNS failures, malformed responses
+_TRANSIENT_ERRORS = (OSError, http.client.HTTPException)
+
+
+class GitHubRateLimitError(RuntimeError):
+    """Raised when the rate limit resets further out than the client is willing to wait."""
+
+    def __init__(self, resource: str, reset_at: float) -> None:
+        super().__init__(f"GitHub {resource} rate limit exhausted until {time.ctime(reset_at)}")
+        self.resource = resource
+        self.reset_at = reset_at
+
+
+class GitHubHTTPError(RuntimeError):
+    """A non-retryable (or retried-out) HTTP error response from the API."""
+
+    def __init__(self, path: str, status: int, body: str) -> None:
+        super().__init__(f"GitHub GET {path} failed with HTTP {status}: {body[:200]}")
+        self.path = path
+        self.status = status
+
+
+@dataclass
+class RateLimit:
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    reset_at: float = 0.0
+
+
+class ResponseCache:
+    """On-disk cache of `(etag, body)` keyed by request URL."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str) -> Optional[dict]:
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url: str, etag: str, body: str) -> None:
+        path = self._path(url)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump({"etag": etag, "body": body, "stored_at": time.time()}, fh)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+class GitHubClient:
+    """Thread-safe client; share one instance so cache and quota state are shared too."""
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        max_wait: float = 60.0,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        user_agent: str = "hackathon-twin-agent",
+        sleep: Callable[[float], None] = time.sleep,
+        pool: Optional[HTTPConnectionPool] = None,
+    ) -> None:
+        self.token = token
+        self.base_url = (base_url or DEFAULT_API_URL).rstrip("/")
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.user_agent = user_agent
+        self._sleep = sleep
+        self._pool = pool or HTTPConnectionPool(timeout=timeout)
+        self._lock = threading.Lock()
+        self.rate_limits: Dict[str, RateLimit] = {}
+        self.stats = {"requests": 0, "not_modified": 0, "rate_waits": 0, "retries": 0}
+
+    # ---------- public API ----------
+    def get_json(self, path: str, params: Optional[dict] = None) -> Any:
+        url = f"{self.base_url}{path}"
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        resource = "search" if path.startswith("/search/") else "core"
+        headers = {"Accept": "application/vnd.github+json", "User-Agent": self.user_agent}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        cached = self.cache.get(url) if self.cache else None
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        attempt = 0
+        while True:
+            self._wait_for_quota(resource)
+            try:
+                status, resp_headers, body = self._open(url, headers)
+            except _TRANSIENT_ERRORS:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self._retry_backoff(attempt)
+                continue
+            self._record_rate_limit(resource, resp_headers)
+            with self._lock:
+                self.stats["requests"] += 1
+
+            if status == 304 and cached is not None:
+                with self._lock:
+                    self.stats["not_modified"] += 1
+                return json.loads(cached["body"])
+            if status < 300:
+                etag = resp_headers.get("etag")
+                if self.cache and etag:
+                    self.cache.put(url, etag, body)
+                return json.loads(body) if body else None
+
+            if status in (403, 429) and self._is_rate_limited(resp_headers):
+                self._backoff_for_rate_limit(resource, resp_headers)
+                continue
+            if status >= 500 and attempt < self.max_retries:
+                attempt += 1
+                self._retry_backoff(attempt)
+                continue
+            raise GitHubHTTPError(path, status, body)
+
+    def search_users_page(
+        self,
+        query: str,
+        page: int,
+        per_page: int = 100,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+    ) -> list:
+        """Return one page of `/search/users` items (empty past the 1000-result cap)."""
+        if (page - 1) * per_page >= SEARCH_RESULTS_CAP:
+            return []
+        params: Dict[str, Any] = {"q": query, "per_page": per_page, "page": page}
+        if sort:
+            params["sort"] = sort
+        if order:
+            params["order"] = order
+        data = self.get_json("/search/users", params) or {}
+        return data.get("items", [])
+
+    def search_users(
+        self,
+        query: str,
+        limit: int,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        start_page: int = 1,
+    ) -> Iterator[tuple[int, dict]]:
+        """Yield `(page, item)` for up to `limit` users matching `query`."""
+        per_page = max(1, min(100, limit))
+        page = max(1, start_page)
+        yielded = 0
+        while yielded < limit:
+            items = self.search_users_page(query, page, per_page, sort=sort, order=order)
+            for item in items:
+                yield page, item
+                yielded += 1
+                if yielded >= limit:
+                    return
+            if len(items) < per_page:
+                return
+            page += 1
+
+    def user(self, login: str) -> dict:
+        return self.get_json(f"/users/{login}") or {}
+
+    def user_repos(self, login: str, per_page: int = 100) -> list:
+        return self.get_json(
+            f"/users/{login}/repos", {"per_page": per_page, "sort": "pushed", "type": "owner"}
+        ) or []
+
+    # ---------- transport ----------
+    def _open(self, url: str, headers: Dict[str, str]) -> tuple[int, Dict[str, str], str]:
+        # Keep-alive connections are reused across pages; response header names are lowercased
+        result = self._pool.request("GET", url, headers, timeout=self.timeout)
+        return result.status, result.headers, result.text
+
+    def _retry_backoff(self, attempt: int) -> None:
+        with self._lock:
+            self.stats["retries"] += 1
+        # Raises TimeoutError instead of sleeping past the caller's deadline
+        self._sleep(min(2 ** attempt, 30, time_left(30)))
+
+    # ---------- rate limiting ----------
+    def _record_rate_limit(self, resource: str, headers: Dict[str, str]) -> None:
+        remaining = headers.get("x-ratelimit-remaining")
+        if remaining is None:
+            return
+        resource = headers.get("x-ratelimit-resource", resource)
+        with self._lock:
+            state = self.rate_limits.setdefault(resource, RateLimit())
+            state.remaining = int(remaining)
+            if headers.get("x-ratelimit-limit"):
+                state.limit = int(headers["x-ratelimit-limit"])
+            if headers.get("x-ratelimit-reset"):
+                state.reset_at = float(headers["x-ratelimit-reset"])
+
+    @staticmethod
+    def _is_rate_limited(headers: Dict[str, str]) -> bool:
+        return headers.get("retry-after") is not None or headers.get("x-ratelimit-remaining") == "0"
+
+    def _wait_for_quota(self, resource: str) -> None:
+        with self._lock:
+            state = self.rate_limits.get(resource)
+            if state is None or state.remaining is None or state.remaining > 0:
+                return
+            reset_at = state.reset_at
+        self._sleep_until(resource, reset_at)
+        with self._lock:
+            # Optimistically allow one request; the response refreshes the real counters
+            state.remaining = None
+
+    def _backoff_for_rate_limit(self, resource: str, headers: Dict[str, str]) -> None:
+        retry_after = headers.get("retry-after")
+        if retry_after is not None:
+            reset_at = time.time() + float(retry_after)
+        else:
+            reset_at = float(headers.get("x-ratelimit-reset") or time.time() + 60)
+        self._sleep_until(resource, reset_at)
+        resource = headers.get("x-ratelimit-resource", resource)
+        with self._lock:
+            # Already waited for this reset; let `_wait_for_quota` pass until the next response
+            state = self.rate_limits.get(resource)
+            if state is not None:
+                state.remaining = None
+
+    def _sleep_until(self, resource: str, reset_at: float) -> None:
+        wait = reset_at - time.time() + 1
+        if wait <= 0:
+            return
+        if wait > self.max_wait:
+            raise GitHubRateLimitError(resource, reset_at)
+        if wait > time_left(wait):
+            raise TimeoutError(f"deadline expires before the GitHub {resource} rate limit resets")
+        with self._lock:
+            self.stats["rate_waits"] += 1
+        self._sleep(wait)
+
+
+_client: Optional[GitHubClient] = None
+_client_lock = threading.Lock()
+
+
+def get_github_client() -> GitHubClient:
+    """Process-wide client configured from the environment."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            cache_dir = os.getenv("GITHUB_CACHE_DIR") or os.path.join(
+                os.path.expanduser("~"), ".cache", "hackathon-twin", "github"
+            )
+            _client = GitHubClient(
+                token=os.getenv("GITHUB_TOKEN"),
+                base_url=os.getenv("GITHUB_API_URL"),
+                cache_dir=cache_dir,
+                max_wait=float(os.getenv("GITHUB_MAX_RATE_WAIT", "60")),
+            )
+        return _client
+
+
+__all__ = [
+    "GitHubClient",
+    "GitHubHTTPError",
+    "GitHubRateLimitError",
+    "RateLimit",
+    "ResponseCache",
+    "get_github_client",
+]
@@ -0,0 +1,244 @@
+"""
+HTTP-first page fetching for scrapers.
+
+`fetch` reuses keep-alive connections from a per-host pool (no new TCP/TLS
+handshake per page), follows redirects and decodes gzip. `make_soup` parses with
+lxml when it is installed (`uv sync --extra scrape`) and falls back to the
+pure-Python `html.parser`. `looks_js_gated` flags pages whose content is only
+rendered by JavaScript, the only case where callers need a real browser.
+
+`deadline(expires_at)` bounds every fetch made in its context (and in worker
+threads started with a copy of it): socket timeouts shrink to the time left and
+requests past the deadline raise `TimeoutError`.
+
+Environment:
+  HTTP_POOL_PER_HOST  idle keep-alive connections kept per host (default 8)
+"""
+
+from __future__ import annotations
+
+import gzip
+import http.client
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except Exception:
+    PARSER = "html.parser"
+
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; hackathon-twin-agent/0.1)",
+    "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+_RETRYABLE = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError, http.client.BadStatusLine)
+
+# Absolute `time.monotonic()` deadline for fetches in the current context
+_deadline: ContextVar[Optional[float]] = ContextVar("fetch_deadline", default=None)
+
+
+@contextmanager
+def deadline(expires_at: Optional[float]) -> Iterator[None]:
+    """Bound blocking fetches in this context to finish by `expires_at` (monotonic seconds)."""
+    token = _deadline.set(expires_at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left(default: float) -> float:
+    """Seconds until the current deadline, at most `default`; raises `TimeoutError` once it has passed."""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return default
+    remaining = expires_at - monotonic()
+    if remaining <= 0:
+        raise TimeoutError("deadline exceeded")
+    return min(default, remaining)
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    @property
+    def text(self) -> str:
+        charset = "utf-8"
+        match = re.search(r"charset=([\w-]+)", self.headers.get("content-type", ""))
+        if match:
+            charset = match.group(1)
+        return self.body.decode(charset, errors="replace")
+
+
+class HTTPConnectionPool:
+    """Thread-safe per-host pool of keep-alive `http.client` connections."""
+
+    def __init__(self, max_per_host: int = 8, timeout: float = 10.0) -> None:
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "connections": 0, "reused": 0}
+
+    def _key(self, url: str) -> Tuple[str, str, int]:
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        return parts.scheme, parts.hostname or "", port
+
+    def _checkout(self, key: Tuple[str, str, int], timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self.stats["reused"] += 1
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+            self.stats["connections"] += 1
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(host, port, timeout=timeout), False
+
+    def _checkin(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(
+        self, method: str, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None
+    ) -> FetchResult:
+        """One request/response on a pooled connection (no redirect handling).
+
+        `timeout` (default: the pool's) is the socket timeout, further capped by the context's `deadline`.
+        """
+        key = self._key(url)
+        parts = urlsplit(url)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        merged = {**DEFAULT_HEADERS, **(headers or {})}
+        for attempt in range(2):
+            conn, reused = self._checkout(key, time_left(timeout or self.timeout))
+            try:
+                conn.request(method, target, headers=merged)
+                resp = conn.getresponse()
+                body = resp.read()
+            except _RETRYABLE:
+                conn.close()
+                # A reused connection may have been closed by the server; retry once on a fresh one
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            with self._lock:
+                self.stats["requests"] += 1
+            return FetchResult(url=url, status=resp.status, headers=resp_headers, body=_decode(body, resp_headers))
+        raise RuntimeError("unreachable")
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+def _decode(body: bytes, headers: Dict[str, str]) -> bytes:
+    encoding = headers.get("content-encoding", "").lower()
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+_pool: Optional[HTTPConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_http_pool() -> HTTPConnectionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HTTPConnectionPool(max_per_host=int(os.getenv("HTTP_POOL_PER_HOST", "8")))
+        return _pool
+
+
+def fetch(url: str, headers: Optional[Dict[str, str]] = None, max_redirects: int = 5) -> FetchResult:
+    """GET `url` through the shared pool, following redirects."""
+    pool = get_http_pool()
+    for _ in range(max_redirects + 1):
+        result = pool.request("GET", url, headers)
+        location = result.headers.get("location")
+        if result.status in (301, 302, 303, 307, 308) and location:
+            url = urljoin(url, location)
+            continue
+        return result
+    raise RuntimeError(f"Too many redirects fetching {url}")
+
+
+def make_soup(html: str, parser: Optional[str] = None) -> BeautifulSoup:
+    return BeautifulSoup(html, parser or PARSER)
+
+
+_JS_MARKERS = re.compile(
+    r"(enable|requires?|turn on)\s+javascript|javascript\s+is\s+(disabled|required)",
+    re.IGNORECASE,
+)
+
+
+def looks_js_gated(soup: BeautifulSoup) -> bool:
+    """Heuristic: the page needs a browser to render its content."""
+    for noscript in soup.find_all("noscript"):
+        if _JS_MARKERS.search(noscript.get_text(" ", strip=True)):
+            return True
+    body = soup.body
+    if body is None:
+        return True
+    links = body.find_all("a", href=True)
+    text_len = len(body.get_text(" ", strip=True))
+    # App shells: a handful of scripts and an empty mount point
+    return len(links) < 3 and text_len < 200
+
+
+__all__ = [
+    "PARSER",
+    "FetchResult",
+    "HTTPConnectionPool",
+    "deadline",
+    "time_left",
+    "get_http_pool",
+    "fetch",
+    "make_soup",
+    "looks_js_gated",
+]
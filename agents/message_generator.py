@@ -17,9 +17,10 @@ from datetime import datetime, timezone
 from typing import List, Optional
 
 import google.generativeai as genai
-from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 
+from backend.utils.tracing import cli_span
+
 
 INVITE_PROMPT = (
     """
@@ -67,32 +68,40 @@ def _configure_gemini(api_key: Optional[str]) -> None:
 
 
 async def generate_message_for_profile(model_name: str, profile: dict) -> str:
-    model = genai.GenerativeModel(model_name)
+    from backend.utils.llm_usage import generate_content, response_text
+
     prompt = INVITE_PROMPT.format(
         name=profile.get("name", "there"),
         skills=", ".join(profile.get("skills", [])),
         location=profile.get("location", ""),
     )
-    resp = await asyncio.to_thread(model.generate_content, prompt)
-    return resp.text.strip() if hasattr(resp, "text") else str(resp)
+    resp = await generate_content(model_name, prompt, caller="message_generator.generate_message_for_profile")
+    return response_text(resp).strip()
 
 
 async def main_async(limit: int, model_name: str) -> None:
     from backend.config import get_settings
+    from backend.db import create_mongo_client
+    from backend.utils.llm_usage import recorder
 
     # Load env from .env at repo root if present
     load_dotenv()
     settings = get_settings()
     _configure_gemini(os.getenv("GOOGLE_API_KEY"))
 
-    client = AsyncIOMotorClient(settings.mongodb_uri)
+    client = create_mongo_client(settings, appname="agents.message_generator")
     try:
         db = client[settings.db_name]
-        profiles = await _fetch_recent_profiles(db, limit)
-        for p in profiles:
-            text = await generate_message_for_profile(model_name, p)
-            await _store_message(db, str(p.get("_id")), text)
-        print(f"Generated {len(profiles)} messages using {model_name}.")
+        await recorder.start(db)
+        try:
+            profiles = await _fetch_recent_profiles(db, limit)
+            for p in profiles:
+                text = await generate_message_for_profile(model_name, p)
+                await _store_message(db, str(p.get("_id")), text)
+            print(f"Generated {len(profiles)} messages using {model_name}.")
+        finally:
+            # Flush buffered LLM call records before the client goes away
+            await recorder.close()
     finally:
         client.close()
 
@@ -104,7 +113,8 @@ def main() -> None:
     args = parser.parse_args()
     # Ensure .env is loaded for CLI executions as well
     load_dotenv()
-    asyncio.run(main_async(args.limit, args.model))
+    with cli_span("agents.message_generator", limit=args.limit, model=args.model):
+        asyncio.run(main_async(args.limit, args.model))
 
 
 if __name__ == "__main__":
@@ -19,9 +19,10 @@ from typing import List
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import smtplib
-from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 
+from backend.utils.tracing import cli_span, span
+
 
 async def _fetch_pending_messages(db, limit: int) -> List[dict]:
     cursor = (
@@ -48,18 +49,20 @@ def send_email_via_gmail(to_email: str, subject: str, message: str) -> None:
     msg["Subject"] = subject
     msg.attach(MIMEText(message, "plain"))
 
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-        server.login(user, app_password)
-        server.sendmail(user, [to_email], msg.as_string())
+    with span("smtp.send", kind="client", **{"smtp.host": "smtp.gmail.com"}):
+        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
+            server.login(user, app_password)
+            server.sendmail(user, [to_email], msg.as_string())
 
 
 async def process_outreach_messages(limit: int, dry_run: bool) -> int:
     from backend.config import get_settings
+    from backend.db import create_mongo_client
 
     # load env vars from .env if present
     load_dotenv()
     settings = get_settings()
-    client = AsyncIOMotorClient(settings.mongodb_uri)
+    client = create_mongo_client(settings, appname="agents.outreach_agent")
     try:
         db = client[settings.db_name]
         messages = await _fetch_pending_messages(db, limit)
@@ -76,7 +79,8 @@ async def process_outreach_messages(limit: int, dry_run: bool) -> int:
                     status = "dry_run"
                 else:
                     try:
-                        send_email_via_gmail(
+                        await asyncio.to_thread(
+                            send_email_via_gmail,
                             to_email=to_email,
                             subject="You're invited to our AI hackathon!",
                             message=m.get("message", ""),
@@ -113,7 +117,8 @@ def main() -> None:
     parser.add_argument("--dry-run", action="store_true")
     args = parser.parse_args()
     load_dotenv()
-    sent = asyncio.run(process_outreach_messages(args.limit, args.dry_run))
+    with cli_span("agents.outreach_agent", limit=args.limit, dry_run=args.dry_run):
+        sent = asyncio.run(process_outreach_messages(args.limit, args.dry_run))
     print(f"Processed {args.limit} messages; sent: {sent}; dry_run={args.dry_run}")
 
 
@@ -1,37 +1,50 @@
 """
 Recruitment agent (free version placeholder).
 
-Attempts to run a headless Selenium search (best-effort), parse with BeautifulSoup,
+Searches the web over plain HTTP (escalating to a pooled headless Selenium
+browser only for JavaScript-gated pages) and GitHub, parses with BeautifulSoup,
 and persist discovered profiles into MongoDB. If scraping fails or yields
 insufficient results, falls back to synthesizing simple profiles based on the
 query terms to keep the demo flow unblocked.
 
 CLI:
   python -m agents.recruitment_agent --query "AI developer" --limit 10
+  python -m agents.recruitment_agent --queries-file skills.txt --limit 20 --concurrency 8
 """
 
 from __future__ import annotations
 
 import argparse
 import asyncio
+import contextvars
+import functools
 import random
 import re
-from dataclasses import dataclass
-from typing import Iterable, List
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from time import monotonic, perf_counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 from bs4 import BeautifulSoup
-import json
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 # Selenium (optional, may fail in constrained environments)
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options as ChromeOptions
-    SELENIUM_AVAILABLE = True
-except Exception:
-    SELENIUM_AVAILABLE = False
+from agents.browser_pool import SELENIUM_AVAILABLE, get_browser_pool
+from agents.github_client import get_github_client
+from agents.http_fetch import deadline, fetch, looks_js_gated, make_soup, time_left
+from backend.utils.identity import (
+    BloomFilter,
+    canonicalize_url,
+    identity_hash,
+    identity_key,
+    load_known_identities,
+)
+from backend.utils.tracing import cli_span
 
 
 # -----------------------------
@@ -47,6 +60,60 @@ class Profile:
     status: str = "scraped"
 
 
+SourceFn = Callable[[str, int], List[Profile]]
+
+
+@dataclass
+class Source:
+    """A candidate source: a blocking `fn(query, limit)` run in a worker thread.
+
+    `timeout` is enforced inside the thread through `agents.http_fetch.deadline`
+    (socket, rate-limit and browser timeouts), so a timed-out source stops working too.
+    """
+
+    name: str
+    fn: SourceFn
+    timeout: float = 20.0
+
+
+@dataclass
+class SourceStats:
+    name: str
+    status: str = "pending"
+    found: int = 0
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class DiscoveryResult:
+    profiles: List[Profile] = field(default_factory=list)
+    sources: List[SourceStats] = field(default_factory=list)
+
+
+# -----------------------------
+# Source registry
+# -----------------------------
+_SOURCES: Dict[str, Source] = {}
+
+
+def register_source(name: str, *, timeout: float = 20.0) -> Callable[[SourceFn], SourceFn]:
+    """Register a blocking `fn(query, limit) -> List[Profile]` as a discovery source.
+
+    Sources run concurrently in worker threads; results are merged in arrival order.
+    """
+
+    def decorator(fn: SourceFn) -> SourceFn:
+        _SOURCES[name] = Source(name=name, fn=fn, timeout=timeout)
+        return fn
+
+    return decorator
+
+
+def registered_sources() -> List[Source]:
+    return list(_SOURCES.values())
+
+
 # -----------------------------
 # Helpers
 # -----------------------------
@@ -90,173 +157,443 @@ def _fallback_profiles(query: str, limit: int) -> List[Profile]:
     return profiles
 
 
-def _run_selenium_search(query: str, limit: int) -> List[Profile]:
-    if not SELENIUM_AVAILABLE:
-        return []
-    try:
-        options = ChromeOptions()
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        driver = webdriver.Chrome(options=options)
-    except Exception:
-        return []
-
-    try:
-        # Best-effort generic search (not LinkedIn directly to avoid blocks)
-        from urllib.parse import quote_plus, urljoin
-
-        base_url = "https://duckduckgo.com/"
-        driver.get(f"{base_url}?q={quote_plus(query + ' developer profile')}")
+def _fetch_with_browser(url: str) -> str:
+    """Render `url` in a pooled headless browser and return the page source."""
+    with get_browser_pool().driver(timeout=time_left(60.0)) as driver:
+        driver.get(url)
         driver.implicitly_wait(3)
-        html = driver.page_source
-        soup = BeautifulSoup(html, "html.parser")
-        links = [a.get("href") for a in soup.select("a[href]")]
-        links = [l for l in links if isinstance(l, str)]
-        # normalize to absolute URLs; drop javascript/mailto
-        normalized: List[str] = []
-        for l in links:
-            if l.startswith("javascript:") or l.startswith("mailto:"):
-                continue
-            if l.startswith("/"):
-                l = urljoin(base_url, l)
-            normalized.append(l)
-
-        extracted: List[Profile] = []
-        seen = set()
-        for href in normalized:
-            if len(extracted) >= limit:
-                break
-            # Simple heuristics for demo; real logic would parse target pages
-            if any(k in href.lower() for k in ["github", "portfolio", "blog", "linkedin"]):
-                if href in seen:
-                    continue
-                seen.add(href)
-                extracted.append(
-                    Profile(
-                        name=_random_name(),
-                        email="",
-                        skills=["Python", "Machine Learning", "LLMs"],
-                        location=random.choice(["Remote", "London, UK", "New York, NY"]),
-                        linkedin_url=href,
-                    )
-                )
-        return extracted
-    finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
+        return driver.page_source
 
 
-def _fetch_github_users(query: str, limit: int) -> List[Profile]:
-    """Fetch developer profiles from GitHub Search API (unauthenticated, low volume).
+def fetch_page(url: str, browser_url: Optional[str] = None) -> tuple[BeautifulSoup, str]:
+    """Fetch and parse a page, HTTP first; returns (soup, engine).
 
-    Uses only one API call to stay within rate limits. Falls back silently on errors.
+    Only pages that fail over HTTP or look JavaScript-gated are escalated to the
+    pooled headless browser (`browser_url` lets the two paths use different
+    endpoints of the same site).
     """
     try:
-        q = f"{query} in:bio type:user"
-        params = {
-            "q": q,
-            "per_page": min(30, max(1, limit)),
-            "page": 1,
-        }
-        url = f"https://api.github.com/search/users?{urlencode(params)}"
-        headers = {
-            "Accept": "application/vnd.github+json",
-            "User-Agent": "hackathon-twin-agent",
-        }
-        # Optional token for higher rate limits
-        import os
-
-        token = os.getenv("GITHUB_TOKEN")
-        if token:
-            headers["Authorization"] = f"Bearer {token}"
-
-        req = Request(url, headers=headers)
-        with urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-        items = data.get("items", [])
-        results: List[Profile] = []
-        for it in items[:limit]:
-            html_url = it.get("html_url", "")
-            login = it.get("login", "Developer")
-            results.append(
+        result = fetch(url)
+        if result.status == 200:
+            soup = make_soup(result.text)
+            if not looks_js_gated(soup):
+                return soup, "http"
+    except Exception:
+        pass
+    if not SELENIUM_AVAILABLE:
+        raise RuntimeError(f"{url} needs a browser but selenium is not available")
+    return make_soup(_fetch_with_browser(browser_url or url)), "browser"
+
+
+def _extract_profiles_from_soup(soup: BeautifulSoup, base_url: str, limit: int) -> List[Profile]:
+    from urllib.parse import urljoin
+
+    links = [a.get("href") for a in soup.select("a[href]")]
+    links = [l for l in links if isinstance(l, str)]
+    # normalize to absolute URLs; drop javascript/mailto
+    normalized: List[str] = []
+    for l in links:
+        if l.startswith("javascript:") or l.startswith("mailto:"):
+            continue
+        if l.startswith("/"):
+            l = urljoin(base_url, l)
+        normalized.append(l)
+
+    extracted: List[Profile] = []
+    seen = set()
+    for href in normalized:
+        if len(extracted) >= limit:
+            break
+        # Unwraps search-engine redirect links and normalizes case/trailing slashes
+        href = canonicalize_url(href)
+        # Simple heuristics for demo; real logic would parse target pages
+        if href and any(k in href for k in ["github", "portfolio", "blog", "linkedin"]):
+            key = identity_key(href)
+            if key in seen:
+                continue
+            seen.add(key)
+            extracted.append(
                 Profile(
-                    name=login,
+                    name=_random_name(),
                     email="",
-                    skills=["Python", "Machine Learning", "LLMs"],
-                    location="",
-                    linkedin_url=html_url or "",
+                    skills=[],  # derived later by agents.enrichment
+                    location=random.choice(["Remote", "London, UK", "New York, NY"]),
+                    linkedin_url=href,
                 )
             )
-        return results
-    except Exception:
-        return []
+    return extracted
+
+
+def _extract_profiles_from_html(html: str, base_url: str, limit: int) -> List[Profile]:
+    return _extract_profiles_from_soup(make_soup(html), base_url, limit)
 
 
-async def _upsert_profiles(client: AsyncIOMotorClient, db_name: str, profiles: Iterable[Profile]) -> int:
-    db = client[db_name]
-    col = db["profiles"]
-    inserted = 0
-    async for session in _aiter([(p.__dict__) for p in profiles]):
-        doc = dict(session)
-        # Generate a simple string id (ObjectId string) for consistency
-        from bson import ObjectId
+@register_source("web", timeout=30.0)
+def _run_web_search(query: str, limit: int) -> List[Profile]:
+    # Best-effort generic search (not LinkedIn directly to avoid blocks). The
+    # DuckDuckGo HTML endpoint needs no JavaScript; the browser is a fallback.
+    from urllib.parse import quote_plus
 
-        doc.setdefault("_id", str(ObjectId()))
+    q = quote_plus(query + " developer profile")
+    soup, _engine = fetch_page(
+        f"https://html.duckduckgo.com/html/?q={q}",
+        browser_url=f"https://duckduckgo.com/?q={q}",
+    )
+    return _extract_profiles_from_soup(soup, "https://duckduckgo.com/", limit)
+
+
+def github_user_query(query: str) -> str:
+    return f"{query} in:bio type:user"
+
+
+def github_item_profile(item: dict) -> Profile:
+    """Map a `/search/users` item onto a Profile."""
+    return Profile(
+        name=item.get("login", "Developer"),
+        email="",
+        skills=[],  # derived later by agents.enrichment
+        location="",
+        linkedin_url=item.get("html_url", "") or "",
+    )
+
+
+@register_source("github", timeout=90.0)
+def _fetch_github_users(query: str, limit: int) -> List[Profile]:
+    """Fetch developer profiles from the GitHub Search API.
+
+    Pages through results with conditional, cached requests and waits out rate
+    limits (see `agents.github_client`); errors propagate to the source stats.
+    """
+    client = get_github_client()
+    return [
+        github_item_profile(it)
+        for _page, it in client.search_users(github_user_query(query), limit)
+    ]
+
+
+@dataclass
+class UpsertStats:
+    submitted: int = 0
+    inserted: int = 0
+    matched: int = 0
+    prefiltered: int = 0
+    errors: int = 0
+
+
+def _profile_upsert_ops(
+    profiles: Iterable[Profile], known: Optional[BloomFilter] = None
+) -> tuple[List[UpdateOne], List[str], int]:
+    """Build upsert ops keyed on identity_hash.
+
+    Returns (ops, identities they cover, count dropped by the pre-filter).
+    """
+    ops: List[UpdateOne] = []
+    identities: List[str] = []
+    seen: set[str] = set()
+    prefiltered = 0
+    for p in profiles:
+        doc = asdict(p)
         # Drop empty email to avoid triggering partial unique index conditions
         if not doc.get("email"):
             doc.pop("email", None)
-        if not doc.get("linkedin_url"):
+        url = canonicalize_url(doc.get("linkedin_url") or "")
+        ident = identity_hash(url) if url else ""
+        doc["_id"] = str(ObjectId())
+        if ident:
+            # Deduplicate by canonical identity, within the batch and against the collection
+            if ident in seen:
+                continue
+            seen.add(ident)
+            if known is not None and ident in known:
+                prefiltered += 1
+                continue
+            doc["linkedin_url"] = url
+            doc["identity_hash"] = ident
+            identities.append(ident)
+            query = {"identity_hash": ident}
+        else:
             doc.pop("linkedin_url", None)
-        # Deduplicate by linkedin_url if present
-        query = {"linkedin_url": doc.get("linkedin_url")} if doc.get("linkedin_url") else {"_id": doc["_id"]}
-        result = await col.update_one(query, {"$setOnInsert": doc}, upsert=True)
-        if result.upserted_id is not None:
-            inserted += 1
-    return inserted
+            query = {"_id": doc["_id"]}
+        ops.append(UpdateOne(query, {"$setOnInsert": doc}, upsert=True))
+    return ops, identities, prefiltered
+
+
+async def upsert_profiles(
+    client: AsyncIOMotorClient,
+    db_name: str,
+    profiles: Iterable[Profile],
+    known: Optional[BloomFilter] = None,
+) -> UpsertStats:
+    """Upsert profiles with one unordered bulk write; existing profiles are left untouched.
+
+    When `known` is given, identities it already contains are dropped before
+    any database round trip (a Bloom filter may rarely drop a new profile), and
+    newly written identities are added to it.
+    """
+    col = client[db_name]["profiles"]
+    ops, identities, prefiltered = _profile_upsert_ops(profiles, known)
+    stats = UpsertStats(submitted=len(ops), prefiltered=prefiltered)
+    if not ops:
+        return stats
+    try:
+        result = await col.bulk_write(ops, ordered=False)
+        stats.inserted = result.upserted_count
+        stats.matched = result.matched_count
+    except BulkWriteError as exc:
+        # Unordered: everything except the failed ops was applied
+        details = exc.details or {}
+        write_errors = details.get("writeErrors", [])
+        duplicates = sum(1 for e in write_errors if e.get("code") == 11000)
+        stats.inserted = details.get("nUpserted", 0)
+        # A concurrent writer inserted the same identity first
+        stats.matched = details.get("nMatched", 0) + duplicates
+        stats.errors = len(write_errors) - duplicates
+    if known is not None:
+        for ident in identities:
+            known.add(ident)
+    return stats
+
+
+_source_executor: Optional[ThreadPoolExecutor] = None
+_source_executor_lock = threading.Lock()
+
+
+def _get_source_executor() -> ThreadPoolExecutor:
+    """Threads for blocking sources, kept apart from asyncio's default executor."""
+    global _source_executor
+    with _source_executor_lock:
+        if _source_executor is None:
+            _source_executor = ThreadPoolExecutor(thread_name_prefix="source")
+        return _source_executor
+
+
+def shutdown_sources() -> None:
+    """Drop queued source calls; running ones stop at their deadline."""
+    global _source_executor
+    with _source_executor_lock:
+        executor, _source_executor = _source_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _call_with_deadline(source: Source, query: str, limit: int, expires_at: float) -> List[Profile]:
+    with deadline(expires_at):
+        return source.fn(query, limit)
+
+
+async def _run_source(source: Source, query: str, limit: int) -> tuple[SourceStats, List[Profile]]:
+    stats = SourceStats(name=source.name)
+    start = perf_counter()
+    expires_at = monotonic() + source.timeout
+    call = functools.partial(
+        contextvars.copy_context().run, _call_with_deadline, source, query, limit, expires_at
+    )
+    try:
+        # Blocking I/O (browser, HTTP) stays off the event loop
+        future = asyncio.get_running_loop().run_in_executor(_get_source_executor(), call)
+        profiles = await asyncio.wait_for(future, source.timeout)
+        stats.status = "ok"
+    except (asyncio.TimeoutError, TimeoutError):
+        profiles = []
+        stats.status = "timeout"
+    except Exception as exc:
+        profiles = []
+        stats.status = "error"
+        stats.error = str(exc)
+    stats.found = len(profiles)
+    stats.duration_ms = (perf_counter() - start) * 1000
+    return stats, profiles
+
+
+async def discover_candidates(
+    query: str, limit: int, sources: Optional[List[Source]] = None
+) -> DiscoveryResult:
+    """Run all sources concurrently and merge their results until `limit` is reached.
+
+    Each source is bounded by its own timeout. Once enough unique profiles have
+    arrived, slower sources are no longer waited for.
+    """
+    sources = registered_sources() if sources is None else sources
+    result = DiscoveryResult()
+    stats_by_name = {src.name: SourceStats(name=src.name) for src in sources}
+    tasks = [asyncio.create_task(_run_source(src, query, limit)) for src in sources]
+    seen: set[str] = set()
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            stats, profiles = await next_done
+            stats_by_name[stats.name] = stats
+            for p in profiles:
+                key = identity_key(p.linkedin_url) if p.linkedin_url else ""
+                if key:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                result.profiles.append(p)
+                if len(result.profiles) >= limit:
+                    break
+            if len(result.profiles) >= limit:
+                break
+    finally:
+        for src, task in zip(sources, tasks):
+            if not task.done():
+                task.cancel()
+                stats_by_name[src.name].status = "skipped"
+    result.sources = list(stats_by_name.values())
+    return result
+
+
+@dataclass
+class QueryStats:
+    query: str
+    scraped: int = 0
+    fallback: int = 0
+    upsert: UpsertStats = field(default_factory=UpsertStats)
+    sources: List[SourceStats] = field(default_factory=list)
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+
+    def summary(self) -> str:
+        sources = " ".join(f"{s.name}={s.status}:{s.found}" for s in self.sources)
+        line = (
+            f"[{self.query}] Scraped: {self.scraped}, Fallback: {self.fallback}, "
+            f"Inserted: {self.upsert.inserted}, "
+            f"Existing: {self.upsert.matched + self.upsert.prefiltered}, "
+            f"Errors: {self.upsert.errors} ({self.duration_ms:.0f} ms; {sources})"
+        )
+        return f"{line} FAILED: {self.error}" if self.error else line
+
+
+async def run_query(
+    client: AsyncIOMotorClient,
+    db_name: str,
+    query: str,
+    limit: int,
+    known: Optional[BloomFilter] = None,
+    fallback: bool = True,
+) -> QueryStats:
+    """Discover, top up with fallback profiles (optional) and upsert for one query."""
+    stats = QueryStats(query=query)
+    start = perf_counter()
+    discovery = await discover_candidates(query, limit)
+    candidates = discovery.profiles
+    stats.sources = discovery.sources
+    stats.scraped = len(candidates)
+    if fallback and stats.scraped < limit:
+        candidates.extend(_fallback_profiles(query, limit - stats.scraped))
+        stats.fallback = len(candidates) - stats.scraped
+    stats.upsert = await upsert_profiles(client, db_name, candidates, known=known)
+    stats.duration_ms = (perf_counter() - start) * 1000
+    return stats
+
+
+async def main_async(query: str, limit: int, fallback: bool = True) -> None:
+    from backend.config import get_settings
+    from backend.db import create_mongo_client
+
+    settings = get_settings()
+    client = create_mongo_client(settings, appname="agents.recruitment_agent")
+    try:
+        known = await load_known_identities(client[settings.db_name]["profiles"])
+        stats = await run_query(client, settings.db_name, query, limit, known=known, fallback=fallback)
+        for st in stats.sources:
+            print(f"  source={st.name} status={st.status} found={st.found} time={st.duration_ms:.0f}ms")
+        print(
+            f"Scraped: {stats.scraped}, Fallback: {stats.fallback}, "
+            f"Inserted: {stats.upsert.inserted}, "
+            f"Existing: {stats.upsert.matched + stats.upsert.prefiltered}, "
+            f"Errors: {stats.upsert.errors}"
+        )
+    finally:
+        shutdown_sources()
+        client.close()
 
 
-async def _aiter(items: Iterable[dict]):
-    for item in items:
-        yield item
+def iter_queries(path: str) -> Iterator[str]:
+    """Stream queries from a file (or stdin for "-"): one per line, `#` comments skipped."""
+    fh = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for line in fh:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
 
 
-async def main_async(query: str, limit: int) -> None:
+async def batch_main_async(path: str, limit: int, concurrency: int, fallback: bool) -> List[QueryStats]:
+    """Run many queries through one process, sharing the DB client, HTTP client and browser pool."""
     from backend.config import get_settings
+    from backend.db import create_mongo_client
 
     settings = get_settings()
-    client = AsyncIOMotorClient(settings.mongodb_uri)
+    client = create_mongo_client(settings, appname="agents.recruitment_agent")
+    results: List[QueryStats] = []
+    queue: asyncio.Queue[Optional[str]] = asyncio.Queue(maxsize=max(1, concurrency) * 2)
+    start = perf_counter()
+
+    async def _producer() -> None:
+        # Read lazily so huge query files never sit in memory; each line is read in a
+        # thread so a slow file or an idle stdin never blocks the workers' event loop.
+        lines = iter_queries(path)
+        while True:
+            q = await asyncio.to_thread(next, lines, None)
+            if q is None:
+                break
+            await queue.put(q)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def _worker() -> None:
+        while True:
+            q = await queue.get()
+            if q is None:
+                return
+            try:
+                stats = await run_query(client, settings.db_name, q, limit, known=known, fallback=fallback)
+            except Exception as exc:
+                stats = QueryStats(query=q, error=str(exc))
+            results.append(stats)
+            print(stats.summary(), flush=True)
+
     try:
-        candidates = _run_selenium_search(query, limit)
-        # If Selenium finds too few, try GitHub API to supplement real profiles
-        if len(candidates) < limit:
-            gh_needed = limit - len(candidates)
-            github_candidates = _fetch_github_users(query, gh_needed)
-            candidates.extend(github_candidates)
-        scraped_count = len(candidates)
-        if scraped_count < limit:
-            fallback_needed = limit - scraped_count
-            fallback = _fallback_profiles(query, fallback_needed)
-            candidates.extend(fallback)
-        inserted = await _upsert_profiles(client, settings.db_name, candidates)
-        fallback_count = max(0, len(candidates) - scraped_count)
-        print(f"Scraped: {scraped_count}, Fallback: {fallback_count}, Inserted: {inserted}")
+        known = await load_known_identities(client[settings.db_name]["profiles"])
+        await asyncio.gather(_producer(), *(_worker() for _ in range(concurrency)))
     finally:
+        shutdown_sources()
         client.close()
 
+    elapsed = perf_counter() - start
+    print(
+        f"Summary: queries={len(results)} failed={sum(1 for r in results if r.error)} "
+        f"scraped={sum(r.scraped for r in results)} fallback={sum(r.fallback for r in results)} "
+        f"inserted={sum(r.upsert.inserted for r in results)} "
+        f"existing={sum(r.upsert.matched + r.upsert.prefiltered for r in results)} "
+        f"errors={sum(r.upsert.errors for r in results)} "
+        f"elapsed={elapsed:.1f}s ({len(results) / elapsed if elapsed else 0:.2f} queries/s)"
+    )
+    return results
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Recruitment agent (free version)")
-    parser.add_argument("--query", required=True, help="Search query, e.g. 'AI developer'")
-    parser.add_argument("--limit", type=int, default=10, help="Max profiles to collect")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--query", help="Search query, e.g. 'AI developer'")
+    target.add_argument("--queries-file", help="File with one query per line ('-' for stdin)")
+    parser.add_argument("--limit", type=int, default=10, help="Max profiles to collect per query")
+    parser.add_argument("--concurrency", type=int, default=4, help="Queries in flight in batch mode")
+    parser.add_argument(
+        "--no-fallback", action="store_true", help="Don't synthesize profiles when sources find too few"
+    )
     args = parser.parse_args()
-    asyncio.run(main_async(args.query, args.limit))
+    with cli_span("agents.recruitment_agent", query=args.query or args.queries_file, limit=args.limit):
+        if args.queries_file:
+            asyncio.run(
+                batch_main_async(args.queries_file, args.limit, max(1, args.concurrency), not args.no_fallback)
+            )
+        else:
+            asyncio.run(main_async(args.query, args.limit, not args.no_fallback))
 
 
 if __name__ == "__main__":
     main()
-
-
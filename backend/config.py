@@ -1,19 +1,80 @@
 from functools import lru_cache
+from typing import Dict, Optional
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+READ_PREFERENCE_MODES = ("primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest")
+
+
 class Settings(BaseSettings):
     """Application configuration loaded from environment.
 
-    - MONGODB_URI: required
+    - MONGODB_URI: required; `memory://` uses the in-memory fake database
+      (`benchmarks/fakedb.py`, repository checkouts only) instead of a server
     - DB_NAME: defaults to "hackathon_twin"
+    - GENERATION_RATE_PER_MINUTE / GENERATION_BURST: per-client token bucket
+      for the Gemini-backed hackathon endpoints (split across WEB_CONCURRENCY
+      workers)
+    - WEB_CONCURRENCY: worker processes serving the app (set by `main.py`);
+      per-process limits are divided by it and `/metrics` series get a
+      `worker` label when it is above 1
+    - TRUST_PROXY_HEADERS: key clients by `X-Forwarded-For` (off by default;
+      only enable behind proxies that append to it)
+    - TRUSTED_PROXY_COUNT: proxies in front of the app that append to
+      `X-Forwarded-For`; the client is the entry that many hops from the right
+    - SLOW_QUERY_MS: Mongo commands at least this slow are explained and stored
+      in `slow_queries` (0 disables capture)
+    - LOG_JSON: emit log records as JSON lines (loguru `serialize`)
+    - LOG_SAMPLE_RATE / LOG_EXCLUDE_PATHS / LOG_SLOW_MS / LOG_ONLY_SLOW_OR_ERRORS:
+      access log sampling; errors and slow requests are always logged
+    - DISABLED_ROUTERS: comma-separated routers not to mount (e.g. "hackathons"
+      on CRUD-only replicas); disabled routers are never imported
+    - MONGO_MIN_POOL_SIZE / MONGO_MAX_POOL_SIZE / MONGO_MAX_IDLE_MS: connection
+      pool sizing per process; unset options keep the URI's or driver's value
+    - MONGO_COMPRESSORS: wire compression, e.g. "zstd,snappy,zlib" (zstd and
+      snappy need the `zstandard` / `python-snappy` packages)
+    - MONGO_SERVER_SELECTION_TIMEOUT_MS / MONGO_CONNECT_TIMEOUT_MS /
+      MONGO_SOCKET_TIMEOUT_MS: driver timeouts
+    - MONGO_READ_PREFERENCES: read preference of each router's list endpoints,
+      e.g. "profiles=secondaryPreferred,hackathons=nearest"; writes and
+      single-document reads always use the client's (primary) preference
     """
 
     mongodb_uri: str = Field(..., alias="MONGODB_URI")
     db_name: str = Field("hackathon_twin", alias="DB_NAME")
 
+    # Admission control for expensive generation endpoints
+    generation_rate_per_minute: float = Field(6.0, alias="GENERATION_RATE_PER_MINUTE", gt=0)
+    generation_burst: int = Field(3, alias="GENERATION_BURST", ge=1)
+    web_concurrency: int = Field(1, alias="WEB_CONCURRENCY", ge=1)
+    trust_proxy_headers: bool = Field(False, alias="TRUST_PROXY_HEADERS")
+    trusted_proxy_count: int = Field(1, alias="TRUSTED_PROXY_COUNT", ge=1)
+
+    # Mongo command monitoring
+    slow_query_ms: float = Field(100.0, alias="SLOW_QUERY_MS", ge=0)
+
+    # Logging
+    log_json: bool = Field(False, alias="LOG_JSON")
+    log_sample_rate: float = Field(1.0, alias="LOG_SAMPLE_RATE", ge=0, le=1)
+    log_exclude_paths: str = Field("/health,/metrics", alias="LOG_EXCLUDE_PATHS")
+    log_slow_ms: float = Field(1000.0, alias="LOG_SLOW_MS", ge=0)
+    log_only_slow_or_errors: bool = Field(False, alias="LOG_ONLY_SLOW_OR_ERRORS")
+
+    # Routers to leave out of this process
+    disabled_routers: str = Field("", alias="DISABLED_ROUTERS")
+
+    # Mongo client tuning (None = URI option or driver default)
+    mongo_min_pool_size: Optional[int] = Field(None, alias="MONGO_MIN_POOL_SIZE", ge=0)
+    mongo_max_pool_size: Optional[int] = Field(None, alias="MONGO_MAX_POOL_SIZE", ge=0)
+    mongo_max_idle_ms: Optional[int] = Field(None, alias="MONGO_MAX_IDLE_MS", ge=0)
+    mongo_compressors: str = Field("", alias="MONGO_COMPRESSORS")
+    mongo_server_selection_timeout_ms: Optional[int] = Field(None, alias="MONGO_SERVER_SELECTION_TIMEOUT_MS", ge=0)
+    mongo_connect_timeout_ms: Optional[int] = Field(None, alias="MONGO_CONNECT_TIMEOUT_MS", ge=0)
+    mongo_socket_timeout_ms: Optional[int] = Field(None, alias="MONGO_SOCKET_TIMEOUT_MS", ge=0)
+    mongo_read_preferences: str = Field("", alias="MONGO_READ_PREFERENCES")
+
     # Load from .env if present; ignore unknown env vars
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -26,6 +87,52 @@ class Settings(BaseSettings):
             )
         return value
 
+    @field_validator("mongo_read_preferences")
+    @classmethod
+    def validate_read_preferences(cls, value: str) -> str:
+        for item in value.split(","):
+            if not item.strip():
+                continue
+            router, _, mode = item.partition("=")
+            if not router.strip() or mode.strip() not in READ_PREFERENCE_MODES:
+                raise ValueError(
+                    f"MONGO_READ_PREFERENCES entries must look like router=mode with mode in "
+                    f"{', '.join(READ_PREFERENCE_MODES)}; got {item.strip()!r}"
+                )
+        return value
+
+    @property
+    def log_excluded_paths(self) -> list[str]:
+        return [path.strip() for path in self.log_exclude_paths.split(",") if path.strip()]
+
+    @property
+    def disabled_router_names(self) -> set[str]:
+        return {name.strip().lower() for name in self.disabled_routers.split(",") if name.strip()}
+
+    @property
+    def router_read_preferences(self) -> Dict[str, str]:
+        prefs: Dict[str, str] = {}
+        for item in self.mongo_read_preferences.split(","):
+            router, _, mode = item.partition("=")
+            if router.strip():
+                prefs[router.strip().lower()] = mode.strip()
+        return prefs
+
+    def mongo_client_options(self) -> dict:
+        """Keyword arguments for `AsyncIOMotorClient`, only for the options that are set."""
+        options = {
+            "minPoolSize": self.mongo_min_pool_size,
+            "maxPoolSize": self.mongo_max_pool_size,
+            "maxIdleTimeMS": self.mongo_max_idle_ms,
+            "serverSelectionTimeoutMS": self.mongo_server_selection_timeout_ms,
+            "connectTimeoutMS": self.mongo_connect_timeout_ms,
+            "socketTimeoutMS": self.mongo_socket_timeout_ms,
+        }
+        compressors = [c.strip() for c in self.mongo_compressors.split(",") if c.strip()]
+        if compressors:
+            options["compressors"] = compressors
+        return {key: value for key, value in options.items() if value is not None}
+
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -33,6 +140,6 @@ def get_settings() -> Settings:
     return Settings()
 
 
-__all__ = ["Settings", "get_settings"]
+__all__ = ["READ_PREFERENCE_MODES", "Settings", "get_settings"]
 
 
@@ -1,12 +1,16 @@
 from contextlib import asynccontextmanager
-from typing import AsyncIterator
+from typing import AsyncIterator, Callable, Optional
 import os
 
 from fastapi import Depends
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ReadPreference
 
-from .config import get_settings
-from .utils.indexes import ensure_indexes
+from .config import Settings, get_settings
+from .utils.indexes import check_hot_queries, ensure_indexes
+from .utils.llm_usage import recorder as llm_recorder
+from .utils.metrics import pool_monitor
+from .utils.mongo_monitor import get_command_monitor, slow_query_log
 
 try:
     from loguru import logger
@@ -22,17 +26,67 @@ except Exception:  # pragma: no cover
 
 
 _mongo_client: AsyncIOMotorClient | None = None
+_mongo_client_pid: int | None = None
+
+_READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+def create_mongo_client(settings: Optional[Settings] = None, appname: Optional[str] = None) -> AsyncIOMotorClient:
+    """Build a Motor client from `Settings` (pool, compression, timeouts) with the command and pool monitors.
+
+    Shared by the API and the agent CLIs; `appname` shows up in server logs and `currentOp`.
+    A `memory://` MONGODB_URI returns the process's in-memory fake instead
+    (`benchmarks.fakedb`), for tests and load runs without a server.
+    """
+    settings = settings or get_settings()
+    options = settings.mongo_client_options()
+    if appname:
+        options["appname"] = appname
+    if settings.mongodb_uri.strip().startswith("memory://"):
+        # Test/benchmark code, imported only when used; it is not part of the backend package
+        try:
+            from benchmarks.fakedb import memory_client
+        except ImportError as exc:
+            raise RuntimeError("MONGODB_URI=memory:// needs a repository checkout (benchmarks/fakedb.py)") from exc
+
+        return memory_client(settings.mongodb_uri, **options)  # type: ignore[return-value]
+    return AsyncIOMotorClient(
+        settings.mongodb_uri,
+        event_listeners=[get_command_monitor(settings.slow_query_ms), pool_monitor],
+        **options,
+    )
 
 
 def get_mongo_client() -> AsyncIOMotorClient:
-    """Return a singleton AsyncIOMotorClient instance."""
-    global _mongo_client
-    if _mongo_client is None:
-        settings = get_settings()
-        _mongo_client = AsyncIOMotorClient(settings.mongodb_uri)
+    """Return the process's AsyncIOMotorClient, creating it on first use.
+
+    A client is never shared across `fork()`: pymongo clients are not fork-safe,
+    so a worker forked from a process that already had one builds its own.
+    """
+    global _mongo_client, _mongo_client_pid
+    if _mongo_client is None or _mongo_client_pid != os.getpid():
+        _mongo_client = create_mongo_client(appname="hackathon-twin-api")
+        _mongo_client_pid = os.getpid()
     return _mongo_client
 
 
+def _forget_client_after_fork() -> None:
+    # The parent's client (its sockets and monitor threads) belongs to the parent; drop it unclosed
+    global _mongo_client, _mongo_client_pid
+    _mongo_client = None
+    _mongo_client_pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_client_after_fork)
+
+
 def get_database() -> AsyncIOMotorDatabase:
     """FastAPI dependency that returns the configured database."""
     settings = get_settings()
@@ -40,6 +94,21 @@ def get_database() -> AsyncIOMotorDatabase:
     return client[settings.db_name]
 
 
+def read_database(router: str) -> Callable[..., AsyncIOMotorDatabase]:
+    """Dependency for `router`'s list endpoints, using its MONGO_READ_PREFERENCES mode.
+
+    Built on `get_database`, so dependency overrides of it still apply.
+    """
+
+    def _dependency(db: AsyncIOMotorDatabase = Depends(get_database)) -> AsyncIOMotorDatabase:
+        mode = get_settings().router_read_preferences.get(router)
+        if not mode or mode == "primary":
+            return db
+        return db.with_options(read_preference=_READ_PREFERENCES[mode])
+
+    return _dependency
+
+
 @asynccontextmanager
 async def lifespan(app) -> AsyncIterator[None]:
     """FastAPI lifespan handler to manage MongoDB client lifecycle."""
@@ -60,23 +129,44 @@ async def lifespan(app) -> AsyncIterator[None]:
 
         # Ensure indexes/collections on startup
         db = get_database()
-        await ensure_indexes(db)
+        indexes = await ensure_indexes(db)
         try:
-            logger.bind(component="startup").info("Mongo indexes ensured")
+            logger.bind(component="startup").info(
+                "Mongo indexes {} ({:.0f} ms, fingerprint {})",
+                indexes.status,
+                indexes.duration_ms,
+                indexes.fingerprint[:12],
+            )
         except Exception:
             pass
+        if indexes.status != "skipped":
+            # Index set changed (or was never applied): make sure hot paths are covered
+            await check_hot_queries(db)
+        await llm_recorder.start(db)
+        await slow_query_log.start(db)
         yield
     finally:
-        global _mongo_client
+        await slow_query_log.close()
+        await llm_recorder.close()
+        try:
+            for route, total_ms, commands in get_command_monitor().top_routes():
+                logger.bind(component="shutdown").info(
+                    "DB time {}: {:.0f} ms over {} commands", route, total_ms, commands
+                )
+        except Exception:
+            pass
+        global _mongo_client, _mongo_client_pid
         if _mongo_client is not None:
-            _mongo_client.close()
+            if _mongo_client_pid == os.getpid():
+                _mongo_client.close()
             _mongo_client = None
+            _mongo_client_pid = None
             try:
                 logger.bind(component="shutdown").info("Mongo client closed; application shutdown complete")
             except Exception:
                 pass
 
 
-__all__ = ["get_database", "get_mongo_client", "lifespan"]
+__all__ = ["create_mongo_client", "get_database", "get_mongo_client", "lifespan", "read_database"]
 
 
@@ -1,10 +1,10 @@
+import importlib
 import os
 import sys
-from time import perf_counter
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.requests import Request
+from starlette.responses import Response
 
 try:
     from loguru import logger
@@ -18,11 +18,20 @@ except Exception:  # pragma: no cover - fallback if loguru unavailable
 
     logger = _NoopLogger()  # type: ignore
 
+from .config import get_settings
 from .db import lifespan
-from .routers.challenges import router as challenges_router
-from .routers.profiles import router as profiles_router
-from .routers.teams import router as teams_router
-from .routers.hackathons import router as hackathons_router
+from .utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .utils.metrics import MetricsMiddleware, registry as metrics_registry
+from .utils.request_logging import RequestLoggingMiddleware
+from .utils.tracing import TracingMiddleware
+
+# Routers by name, mounted in this order; DISABLED_ROUTERS skips (and never imports) them
+ROUTERS = {
+    "profiles": ".routers.profiles",
+    "challenges": ".routers.challenges",
+    "teams": ".routers.teams",
+    "hackathons": ".routers.hackathons",
+}
 
 
 def _allowed_origins() -> list[str]:
@@ -33,87 +42,93 @@ def _allowed_origins() -> list[str]:
     return origins
 
 
-app = FastAPI(lifespan=lifespan)
-
-# ---------------
-# Logging setup
-# ---------------
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
-try:
-    logger.remove()  # remove default handler to avoid duplicate logs
-    logger.add(
-        sys.stdout,
-        level=LOG_LEVEL,
-        enqueue=True,
-        backtrace=False,
-        diagnose=False,
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {extra[component]: <10} | {message}",
-    )
-except Exception:
-    # If loguru is not available, skip configuration
-    pass
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=_allowed_origins(),
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-    allow_headers=["*"],
-)
-
-# Log allowed origins once at startup time (module import time is fine in server context)
-try:
-    logger.bind(component="startup").info("Allowed CORS origins: {}", _allowed_origins())
-    host = os.getenv("HOST", "0.0.0.0")
-    port = os.getenv("PORT", "8000")
-    logger.bind(component="startup").info("Listening on {}:{}", host, port)
-except Exception:
-    pass
-
-
-# ---------------
-# Request logging
-# ---------------
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start = perf_counter()
+def _configure_logging(log_json: bool) -> None:
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
     try:
-        response = await call_next(request)
-        duration_ms = (perf_counter() - start) * 1000
-        try:
-            logger.bind(component="request").info(
-                "{method} {path} -> {status} ({duration:.2f} ms)",
-                method=request.method,
-                path=request.url.path,
-                status=response.status_code,
-                duration=duration_ms,
-            )
-        except Exception:
-            pass
-        return response
-    except Exception as exc:  # Log unhandled exceptions
-        duration_ms = (perf_counter() - start) * 1000
-        try:
-            logger.bind(component="request").exception(
-                "{method} {path} -> 500 ({duration:.2f} ms): {error}",
-                method=request.method,
-                path=request.url.path,
-                duration=duration_ms,
-                error=str(exc),
+        logger.remove()  # remove default handler to avoid duplicate logs
+        if log_json:
+            # One JSON object per line; bound fields (route, status, duration_ms, ...) land in record.extra
+            logger.add(sys.stdout, level=level, enqueue=True, backtrace=False, diagnose=False, serialize=True)
+        else:
+            logger.add(
+                sys.stdout,
+                level=level,
+                enqueue=True,
+                backtrace=False,
+                diagnose=False,
+                format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {extra[component]: <10} | {message}",
             )
-        except Exception:
-            pass
-        raise
+    except Exception:
+        # If loguru is not available, skip configuration
+        pass
 
 
-@app.get("/health")
 async def health():
     return {"status": "ok"}
 
 
-app.include_router(profiles_router)
-app.include_router(challenges_router)
-app.include_router(teams_router)
-app.include_router(hackathons_router)
+async def metrics():
+    return Response(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
 
 
+def _include_routers(app: FastAPI, disabled: set[str]) -> list[str]:
+    mounted: list[str] = []
+    for name, module in ROUTERS.items():
+        if name in disabled:
+            continue
+        app.include_router(importlib.import_module(module, __package__).router)
+        mounted.append(name)
+    try:
+        logger.bind(component="startup").info("Routers: {} (disabled: {})", mounted, sorted(disabled) or "none")
+    except Exception:
+        pass
+    return mounted
+
+
+def create_app() -> FastAPI:
+    """Build the API from the current settings (logging, middleware, routers)."""
+    settings = get_settings()
+    _configure_logging(settings.log_json)
+    app = FastAPI(lifespan=lifespan)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=_allowed_origins(),
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+        allow_headers=["*"],
+    )
+    # Wraps CORS and routing; route templates are read from the scope after routing
+    app.add_middleware(MetricsMiddleware)
+    # Access log, request id and `current_request` for everything below
+    app.add_middleware(
+        RequestLoggingMiddleware,
+        sample_rate=settings.log_sample_rate,
+        exclude_paths=settings.log_excluded_paths,
+        slow_ms=settings.log_slow_ms,
+        only_slow_or_errors=settings.log_only_slow_or_errors,
+    )
+    # Outermost: the request span covers the whole stack (TRACE_EXPORTER, TRACE_SAMPLE_RATE)
+    app.add_middleware(TracingMiddleware)
+
+    try:
+        logger.bind(component="startup").info("Allowed CORS origins: {}", _allowed_origins())
+        host = os.getenv("HOST", "0.0.0.0")
+        port = os.getenv("PORT", "8000")
+        logger.bind(component="startup").info("Listening on {}:{}", host, port)
+    except Exception:
+        pass
+
+    app.add_api_route("/health", health)
+    app.add_api_route("/metrics", metrics, include_in_schema=False)
+    _include_routers(app, settings.disabled_router_names)
+    return app
+
+
+def __getattr__(name: str):
+    # `app` is built on first access (`backend.main:app`, `from backend.main import app`),
+    # so importing this module never reads settings
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -222,6 +222,19 @@ class HackathonRead(MongoReadModel, HackathonBase):
     pass
 
 
+class BootstrapStage(BaseModel):
+    name: str
+    status: str
+    duration_ms: float
+    detail: Optional[str] = None
+
+
+class HackathonBootstrapResult(BaseModel):
+    hackathon: HackathonRead
+    stages: List[BootstrapStage] = Field(default_factory=list)
+    invites_created: int = 0
+
+
 __all__ = [
     # UserProfile
     "UserProfileBase",
@@ -248,6 +261,8 @@ __all__ = [
     "HackathonCreate",
     "HackathonUpdate",
     "HackathonRead",
+    "BootstrapStage",
+    "HackathonBootstrapResult",
 ]
 
 
@@ -1,43 +1,30 @@
-from typing import List, Optional
+from typing import List
 
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import ReturnDocument
 
-from ..db import get_database
+from ..db import get_database, read_database
 from ..models import (
     ChallengeCreate,
     ChallengeRead,
     ChallengeUpdate,
 )
+from ..utils.serialization import list_response, model_response
 
 
 router = APIRouter(prefix="/challenges", tags=["Challenges"])
 
 
-def _normalize_id(document: Optional[dict]) -> Optional[dict]:
-    if not document:
-        return document
-    doc = dict(document)
-    if "_id" in doc and not isinstance(doc["_id"], str):
-        doc["_id"] = str(doc["_id"])  # ensure CORS-safe JSON primitives
-    # ensure participants exists and is a list
-    doc.setdefault("participants", [])
-    return doc
-
-
 @router.get("/", response_model=List[ChallengeRead])
 async def list_challenges(
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncIOMotorDatabase = Depends(read_database("challenges")),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=200),
 ):
     cursor = db["challenges"].find({}, projection=None).skip(skip).limit(limit)
-    results: List[ChallengeRead] = []
-    async for doc in cursor:
-        results.append(ChallengeRead.model_validate(_normalize_id(doc)))
-    return results
+    return list_response(ChallengeRead, await cursor.to_list(length=limit))
 
 
 @router.get("/{challenge_id}", response_model=ChallengeRead)
@@ -50,7 +37,7 @@ async def get_challenge(
         doc = await db["challenges"].find_one({"_id": ObjectId(challenge_id)})
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Challenge not found")
-    return ChallengeRead.model_validate(_normalize_id(doc))
+    return model_response(ChallengeRead, doc)
 
 
 @router.post("/", response_model=ChallengeRead, status_code=status.HTTP_201_CREATED)
@@ -62,7 +49,7 @@ async def create_challenge(
     doc.setdefault("participants", [])
     doc.setdefault("_id", str(ObjectId()))
     await db["challenges"].insert_one(doc)
-    return ChallengeRead.model_validate(_normalize_id(doc))
+    return model_response(ChallengeRead, doc, status_code=status.HTTP_201_CREATED)
 
 
 @router.patch("/{challenge_id}", response_model=ChallengeRead)
@@ -88,7 +75,7 @@ async def update_challenge(
         )
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Challenge not found")
-    return ChallengeRead.model_validate(_normalize_id(doc))
+    return model_response(ChallengeRead, doc)
 
 
 @router.delete("/{challenge_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,12 +1,25 @@
+import asyncio
+import json
+import os
+import re
+from datetime import datetime, timezone
+from time import perf_counter
 from typing import List, Optional
 
 from bson import ObjectId
+from dotenv import load_dotenv
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import ReturnDocument
 
-from ..db import get_database
+from ..db import get_database, read_database
+from ..utils.admission import admit_generation, generation_flights, payload_key
+from ..utils.llm_usage import generate_content, response_text
+from ..utils.metrics import outreach_sends
+from ..utils.serialization import list_response, model_response, normalize_id
 from ..models import (
+    BootstrapStage,
+    HackathonBootstrapResult,
     HackathonCreate,
     HackathonDraft,
     HackathonRead,
@@ -17,26 +30,14 @@ from ..models import (
 router = APIRouter(prefix="/hackathons", tags=["Hackathons"])
 
 
-def _normalize_id(document: Optional[dict]) -> Optional[dict]:
-    if not document:
-        return document
-    doc = dict(document)
-    if "_id" in doc and not isinstance(doc["_id"], str):
-        doc["_id"] = str(doc["_id"])  # ensure CORS-safe JSON primitives
-    return doc
-
-
 @router.get("/", response_model=List[HackathonRead])
 async def list_hackathons(
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncIOMotorDatabase = Depends(read_database("hackathons")),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=200),
 ):
     cursor = db["hackathons"].find({}, projection=None).skip(skip).limit(limit)
-    results: List[HackathonRead] = []
-    async for doc in cursor:
-        results.append(HackathonRead.model_validate(_normalize_id(doc)))
-    return results
+    return list_response(HackathonRead, await cursor.to_list(length=limit))
 
 
 @router.get("/{hackathon_id}", response_model=HackathonRead)
@@ -49,7 +50,7 @@ async def get_hackathon(
         doc = await db["hackathons"].find_one({"_id": ObjectId(hackathon_id)})
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found")
-    return HackathonRead.model_validate(_normalize_id(doc))
+    return model_response(HackathonRead, doc)
 
 
 @router.post("/", response_model=HackathonRead, status_code=status.HTTP_201_CREATED)
@@ -60,7 +61,7 @@ async def create_hackathon(
     doc = payload.model_dump()
     doc.setdefault("_id", str(ObjectId()))
     await db["hackathons"].insert_one(doc)
-    return HackathonRead.model_validate(_normalize_id(doc))
+    return model_response(HackathonRead, doc, status_code=status.HTTP_201_CREATED)
 
 
 @router.patch("/{hackathon_id}", response_model=HackathonRead)
@@ -86,7 +87,7 @@ async def update_hackathon(
         )
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found")
-    return HackathonRead.model_validate(_normalize_id(doc))
+    return model_response(HackathonRead, doc)
 
 
 @router.delete("/{hackathon_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -103,17 +104,26 @@ async def delete_hackathon(
 
 
 # ---------- Plan generation via Gemini ----------
-import os
-import asyncio
-from dotenv import load_dotenv
-import google.generativeai as genai
-from agents.outreach_agent import send_email_via_gmail
+GEMINI_MODEL = "gemini-2.0-flash"
+_configured_api_key: Optional[str] = None
 
 
 def _configure_gemini(api_key: Optional[str]) -> None:
+    global _configured_api_key
     if not api_key:
         raise HTTPException(status_code=400, detail="GOOGLE_API_KEY is required for plan generation")
+    if api_key == _configured_api_key:
+        return
+    # The Gemini SDK takes hundreds of ms to import; only pay for it on first use
+    import google.generativeai as genai
+
     genai.configure(api_key=api_key)
+    _configured_api_key = api_key
+
+
+def _ensure_gemini() -> None:
+    load_dotenv()
+    _configure_gemini(os.getenv("GOOGLE_API_KEY"))
 
 
 PLAN_PROMPT = (
@@ -157,9 +167,6 @@ Respond with ONLY the JSON array. No markdown, no commentary.
 
 
 def _parse_json_from_text(text: str) -> dict:
-    import json
-    import re
-
     # Try direct parse first
     try:
         return json.loads(text)
@@ -185,17 +192,27 @@ def _parse_json_from_text(text: str) -> dict:
     raise HTTPException(status_code=502, detail="Failed to parse plan JSON from Gemini")
 
 
-@router.post("/generate-plan", response_model=HackathonRead)
-async def generate_plan(
-    draft: HackathonDraft,
-    db: AsyncIOMotorDatabase = Depends(get_database),
-):
-    """Generate a hackathon plan with Gemini and persist a new hackathon document."""
-    load_dotenv()
-    api_key = os.getenv("GOOGLE_API_KEY")
-    _configure_gemini(api_key)
+def _parse_problems_from_text(text: str) -> list:
+    try:
+        return json.loads(text)
+    except Exception:
+        # Try to extract JSON array
+        match = re.search(r"\[[\s\S]*\]", text)
+        if match:
+            try:
+                return json.loads(match.group(0))
+            except Exception:
+                pass
+    raise HTTPException(status_code=502, detail="Failed to parse problem statements from Gemini")
+
 
-    model = genai.GenerativeModel("gemini-2.0-flash")
+async def _generate_text(prompt: str, caller: str) -> str:
+    # Runs the blocking call in a thread and records latency/tokens in `llm_calls`
+    resp = await generate_content(GEMINI_MODEL, prompt, caller=caller)
+    return response_text(resp)
+
+
+async def _generate_plan_dict(draft: HackathonDraft) -> dict:
     prompt = PLAN_PROMPT.format(
         topic=draft.topic,
         description=draft.description or "",
@@ -203,90 +220,284 @@ async def generate_plan(
         location=draft.location or "",
         dates=((draft.start_date or "") + (" - " + draft.end_date if draft.end_date else "")),
     )
+    return _parse_json_from_text(await _generate_text(prompt, caller="hackathons.generate_plan"))
 
-    # Run blocking call in thread
-    resp = await asyncio.to_thread(model.generate_content, prompt)
-    text = resp.text if hasattr(resp, "text") else str(resp)
-    plan_dict = _parse_json_from_text(text)
 
-    # Compose hackathon doc and persist
-    doc = {
-        "_id": str(ObjectId()),
-        "topic": draft.topic,
-        "description": draft.description,
-        "target_audience": draft.target_audience or plan_dict.get("target_audience"),
-        "location": draft.location or plan_dict.get("location"),
-        "start_date": draft.start_date,
-        "end_date": draft.end_date,
-        "status": "planned",
-        "plan": plan_dict,
-    }
-    await db["hackathons"].insert_one(doc)
-    return HackathonRead.model_validate(_normalize_id(doc))
+async def _generate_problems(topic: str, description: Optional[str], audience: Optional[str]) -> list:
+    prompt = PROBLEMS_PROMPT.format(
+        topic=topic or "",
+        description=description or "",
+        audience=audience or "",
+    )
+    return _parse_problems_from_text(
+        await _generate_text(prompt, caller="hackathons.generate_problem_statements")
+    )
+
+
+async def _find_hackathon(db: AsyncIOMotorDatabase, hackathon_id: str, projection: Optional[dict] = None) -> dict:
+    hack = await db["hackathons"].find_one({"_id": hackathon_id}, projection)
+    if not hack and ObjectId.is_valid(hackathon_id):
+        hack = await db["hackathons"].find_one({"_id": ObjectId(hackathon_id)}, projection)
+    if not hack:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found")
+    return hack
 
 
-@router.post("/{hackathon_id}/generate-problems", response_model=HackathonRead)
+@router.post(
+    "/generate-plan",
+    response_model=HackathonRead,
+    dependencies=[Depends(admit_generation)],
+)
+async def generate_plan(
+    draft: HackathonDraft,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+):
+    """Generate a hackathon plan with Gemini and persist a new hackathon document.
+
+    Identical drafts submitted while one is in flight share its result.
+    """
+    _ensure_gemini()
+
+    async def _run() -> HackathonRead:
+        plan_dict = await _generate_plan_dict(draft)
+
+        # Compose hackathon doc and persist
+        doc = {
+            "_id": str(ObjectId()),
+            "topic": draft.topic,
+            "description": draft.description,
+            "target_audience": draft.target_audience or plan_dict.get("target_audience"),
+            "location": draft.location or plan_dict.get("location"),
+            "start_date": draft.start_date,
+            "end_date": draft.end_date,
+            "status": "planned",
+            "plan": plan_dict,
+        }
+        await db["hackathons"].insert_one(doc)
+        return HackathonRead.model_validate(normalize_id(doc))
+
+    return await generation_flights.do(payload_key("plan", draft), _run)
+
+
+@router.post(
+    "/{hackathon_id}/generate-problems",
+    response_model=HackathonRead,
+    dependencies=[Depends(admit_generation)],
+)
 async def generate_problem_statements(
     hackathon_id: str,
     db: AsyncIOMotorDatabase = Depends(get_database),
 ):
-    """Generate problem statements for an existing hackathon using Gemini."""
-    load_dotenv()
-    api_key = os.getenv("GOOGLE_API_KEY")
-    _configure_gemini(api_key)
+    """Generate problem statements for an existing hackathon using Gemini.
 
-    # Check hackathon exists
-    hack = await db["hackathons"].find_one({"_id": hackathon_id})
-    if not hack and ObjectId.is_valid(hackathon_id):
-        hack = await db["hackathons"].find_one({"_id": ObjectId(hackathon_id)})
-    if not hack:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found")
+    Concurrent requests for the same hackathon share one generation.
+    """
+    _ensure_gemini()
 
-    model = genai.GenerativeModel("gemini-2.0-flash")
-    prompt = PROBLEMS_PROMPT.format(
-        topic=hack.get("topic", ""),
-        description=hack.get("description", ""),
-        audience=hack.get("target_audience", ""),
+    async def _run() -> HackathonRead:
+        # Only the prompt inputs are needed; the plan itself is updated in place
+        hack = await _find_hackathon(
+            db, hackathon_id, projection={"topic": 1, "description": 1, "target_audience": 1}
+        )
+        problems = await _generate_problems(
+            hack.get("topic", ""), hack.get("description"), hack.get("target_audience")
+        )
+
+        doc = await db["hackathons"].find_one_and_update(
+            {"_id": hack["_id"], "plan": {"$type": "object"}},
+            {"$set": {"plan.problem_statements": problems}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not doc:
+            # No plan document yet (e.g. created via POST /hackathons); start one
+            doc = await db["hackathons"].find_one_and_update(
+                {"_id": hack["_id"]},
+                {"$set": {"plan": {"problem_statements": problems}}},
+                return_document=ReturnDocument.AFTER,
+            )
+        if not doc:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found")
+        return HackathonRead.model_validate(normalize_id(doc))
+
+    return await generation_flights.do(f"problems:{hackathon_id}", _run)
+
+
+# ---------- Bootstrap pipeline ----------
+BOOTSTRAP_STAGES = ("plan", "problems", "invites")
+
+
+def _plan_updates(draft: HackathonDraft, plan_dict: dict) -> dict:
+    updates = {
+        f"plan.{key}": value
+        for key, value in plan_dict.items()
+        # problem statements are owned by the concurrent "problems" stage
+        if key != "problem_statements"
+    }
+    if not draft.target_audience and plan_dict.get("target_audience"):
+        updates["target_audience"] = plan_dict["target_audience"]
+    if not draft.location and plan_dict.get("location"):
+        updates["location"] = plan_dict["location"]
+    return updates
+
+
+def _required_skills(problems: list) -> List[str]:
+    skills: List[str] = []
+    for problem in problems or []:
+        if not isinstance(problem, dict):
+            continue
+        for skill in problem.get("skills_required") or []:
+            if isinstance(skill, str) and skill.strip() and skill.strip() not in skills:
+                skills.append(skill.strip())
+    return skills
+
+
+async def _select_invitees(db: AsyncIOMotorDatabase, skills: List[str], limit: int) -> List[dict]:
+    """Pick profiles whose skills overlap the problem statements, topping up with recent ones."""
+    projection = {"_id": 1}
+    profiles: List[dict] = []
+    if skills:
+        patterns = [re.compile(f"^{re.escape(s)}$", re.IGNORECASE) for s in skills]
+        cursor = db["profiles"].find({"skills": {"$in": patterns}}, projection).sort("_id", -1).limit(limit)
+        profiles = await cursor.to_list(length=limit)
+    if len(profiles) < limit:
+        seen = [p["_id"] for p in profiles]
+        cursor = (
+            db["profiles"]
+            .find({"_id": {"$nin": seen}}, projection)
+            .sort("_id", -1)
+            .limit(limit - len(profiles))
+        )
+        profiles.extend(await cursor.to_list(length=limit - len(profiles)))
+    return profiles
+
+
+async def _create_invites(
+    db: AsyncIOMotorDatabase, hack: dict, profiles: List[dict]
+) -> int:
+    if not profiles:
+        return 0
+    message = f"You're invited to our hackathon on '{hack.get('topic', '')}' at {hack.get('location', '')}. Join us!"
+    await db["outreach_messages"].insert_many(
+        [
+            {
+                "profile_id": str(p.get("_id")),
+                "hackathon_id": str(hack.get("_id")),
+                "channel": "email",
+                "message": message,
+                "status": "generated",
+            }
+            for p in profiles
+        ],
+        ordered=False,
     )
+    return len(profiles)
 
-    # Run blocking call in thread
-    resp = await asyncio.to_thread(model.generate_content, prompt)
-    text = resp.text if hasattr(resp, "text") else str(resp)
-    
-    import json
-    import re
-    
-    # Parse JSON array from text
-    try:
-        problems = json.loads(text)
-    except Exception:
-        # Try to extract JSON array
-        match = re.search(r"\[[\s\S]*\]", text)
-        if match:
-            try:
-                problems = json.loads(match.group(0))
-            except Exception:
-                raise HTTPException(status_code=502, detail="Failed to parse problem statements from Gemini")
-        else:
-            raise HTTPException(status_code=502, detail="Failed to parse problem statements from Gemini")
-
-    # Update hackathon with problem statements
-    plan = hack.get("plan", {})
-    plan["problem_statements"] = problems
-    
+
+@router.post(
+    "/bootstrap",
+    response_model=HackathonBootstrapResult,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admit_generation)],
+)
+async def bootstrap_hackathon(
+    draft: HackathonDraft,
+    invite_limit: int = Query(20, ge=0, le=200),
+    db: AsyncIOMotorDatabase = Depends(get_database),
+):
+    """Create a hackathon with its plan, problem statements and invites in one call.
+
+    Plan and problem generation run concurrently, then invites are created for
+    profiles matching the problems' required skills. Each stage writes only its
+    own fields with `$set` and reports progress under `bootstrap.<stage>`, so the
+    document can be polled via `GET /hackathons/{id}` while the pipeline runs.
+    """
+    _ensure_gemini()
+    return await generation_flights.do(
+        f"{payload_key('bootstrap', draft)}:{invite_limit}",
+        lambda: _bootstrap(db, draft, invite_limit),
+    )
+
+
+async def _bootstrap(
+    db: AsyncIOMotorDatabase, draft: HackathonDraft, invite_limit: int
+) -> HackathonBootstrapResult:
+    hackathon_id = str(ObjectId())
+    await db["hackathons"].insert_one(
+        {
+            "_id": hackathon_id,
+            "topic": draft.topic,
+            "description": draft.description,
+            "target_audience": draft.target_audience,
+            "location": draft.location,
+            "start_date": draft.start_date,
+            "end_date": draft.end_date,
+            "status": "bootstrapping",
+            "plan": {},
+            "bootstrap": {name: {"status": "pending"} for name in BOOTSTRAP_STAGES},
+        }
+    )
+
+    async def _run_stage(name: str, work) -> tuple[BootstrapStage, object]:
+        start = perf_counter()
+        await db["hackathons"].update_one(
+            {"_id": hackathon_id}, {"$set": {f"bootstrap.{name}.status": "running"}}
+        )
+        try:
+            updates, result = await work()
+            stage = BootstrapStage(name=name, status="done", duration_ms=(perf_counter() - start) * 1000)
+        except Exception as exc:
+            detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            updates, result = {}, None
+            stage = BootstrapStage(
+                name=name,
+                status="error",
+                duration_ms=(perf_counter() - start) * 1000,
+                detail=str(detail),
+            )
+        updates[f"bootstrap.{name}"] = stage.model_dump(exclude={"name"})
+        await db["hackathons"].update_one({"_id": hackathon_id}, {"$set": updates})
+        return stage, result
+
+    async def _plan_stage():
+        plan_dict = await _generate_plan_dict(draft)
+        return _plan_updates(draft, plan_dict), plan_dict
+
+    async def _problems_stage():
+        problems = await _generate_problems(draft.topic, draft.description, draft.target_audience)
+        return {"plan.problem_statements": problems}, problems
+
+    (plan_stage, plan_dict), (problems_stage, problems) = await asyncio.gather(
+        _run_stage("plan", _plan_stage),
+        _run_stage("problems", _problems_stage),
+    )
+
+    hack = {
+        "_id": hackathon_id,
+        "topic": draft.topic,
+        "location": draft.location or (plan_dict or {}).get("location", ""),
+    }
+
+    async def _invites_stage():
+        invitees = await _select_invitees(db, _required_skills(problems), invite_limit) if invite_limit else []
+        created = await _create_invites(db, hack, invitees)
+        return {}, created
+
+    invites_stage, invites_created = await _run_stage("invites", _invites_stage)
+
+    stages = [plan_stage, problems_stage, invites_stage]
+    final_status = "planned" if all(s.status == "done" for s in stages) else "incomplete"
     doc = await db["hackathons"].find_one_and_update(
-        {"_id": hackathon_id if isinstance(hackathon_id, str) else ObjectId(hackathon_id)},
-        {"$set": {"plan": plan}},
+        {"_id": hackathon_id},
+        {"$set": {"status": final_status}},
         return_document=ReturnDocument.AFTER,
     )
-    if not doc and ObjectId.is_valid(hackathon_id):
-        doc = await db["hackathons"].find_one_and_update(
-            {"_id": ObjectId(hackathon_id)},
-            {"$set": {"plan": plan}},
-            return_document=ReturnDocument.AFTER,
-        )
-    
-    return HackathonRead.model_validate(_normalize_id(doc))
+    if not doc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found")
+    return HackathonBootstrapResult(
+        hackathon=HackathonRead.model_validate(normalize_id(doc)),
+        stages=stages,
+        invites_created=invites_created or 0,
+    )
 
 
 # ---------- Invitations ----------
@@ -301,33 +512,14 @@ async def invite_profiles(
     Returns the number of messages generated.
     """
     # Check hackathon exists
-    hack = await db["hackathons"].find_one({"_id": hackathon_id})
-    if not hack and ObjectId.is_valid(hackathon_id):
-        hack = await db["hackathons"].find_one({"_id": ObjectId(hackathon_id)})
-    if not hack:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found")
+    hack = await _find_hackathon(db, hackathon_id, projection={"topic": 1, "location": 1})
 
     # Fetch recent profiles
-    cursor = db["profiles"].find({}).sort("_id", -1).limit(limit)
-    profiles: List[dict] = []
-    async for p in cursor:
-        profiles.append(p)
+    cursor = db["profiles"].find({}, {"_id": 1}).sort("_id", -1).limit(limit)
+    profiles: List[dict] = await cursor.to_list(length=limit)
 
     # Create outreach messages tied to this hackathon
-    created = 0
-    for p in profiles:
-        await db["outreach_messages"].insert_one(
-            {
-                "profile_id": str(p.get("_id")),
-                "hackathon_id": str(hack.get("_id")),
-                "channel": "email",
-                "message": f"You're invited to our hackathon on '{hack.get('topic', '')}' at {hack.get('location', '')}. Join us!",
-                "status": "generated",
-            }
-        )
-        created += 1
-
-    return created
+    return await _create_invites(db, hack, profiles)
 
 
 @router.post("/{hackathon_id}/send-emails", response_model=int)
@@ -359,7 +551,7 @@ async def send_emails_for_hackathon(
     async for m in cursor:
         messages.append(m)
 
-    from datetime import datetime, timezone
+    from agents.outreach_agent import send_email_via_gmail
 
     sent = 0
     for m in messages:
@@ -373,7 +565,9 @@ async def send_emails_for_hackathon(
                 sent += 1
             else:
                 try:
-                    send_email_via_gmail(
+                    # smtplib blocks; the worker thread inherits the request's span context
+                    await asyncio.to_thread(
+                        send_email_via_gmail,
                         to_email=to_email,
                         subject=f"You're invited: {hack.get('topic', 'Hackathon')}",
                         message=m.get("message", "You're invited!"),
@@ -384,6 +578,7 @@ async def send_emails_for_hackathon(
                     status_value = "error"
                     error = str(e)
 
+        outreach_sends.inc("email", status_value)
         await db["outreach_logs"].insert_one(
             {
                 "profile_id": m.get("profile_id"),
@@ -1,41 +1,51 @@
-from typing import List, Optional
+from typing import List
 
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
-from ..db import get_database
+from ..db import get_database, read_database
 from ..models import (
     UserProfileCreate,
     UserProfileRead,
     UserProfileUpdate,
 )
+from ..utils.identity import identity_hash
+from ..utils.serialization import list_response, model_response
 
 
 router = APIRouter(prefix="/profiles", tags=["Profiles"])
 
 
-def _normalize_id(document: Optional[dict]) -> Optional[dict]:
-    if not document:
-        return document
-    doc = dict(document)
-    if "_id" in doc and not isinstance(doc["_id"], str):
-        doc["_id"] = str(doc["_id"])  # ensure CORS-safe JSON primitives
-    return doc
+def _identity_update(updates: dict) -> dict:
+    """Build the update document, keeping `identity_hash` in sync with `linkedin_url`."""
+    update: dict = {"$set": updates}
+    if "linkedin_url" in updates:
+        ident = identity_hash(updates["linkedin_url"] or "")
+        if ident:
+            updates["identity_hash"] = ident
+        else:
+            update["$unset"] = {"identity_hash": ""}
+    return update
+
+
+def _conflict() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A profile with this email or profile URL already exists",
+    )
 
 
 @router.get("/", response_model=List[UserProfileRead])
 async def list_profiles(
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncIOMotorDatabase = Depends(read_database("profiles")),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=200),
 ):
     cursor = db["profiles"].find({}, projection=None).skip(skip).limit(limit)
-    results: List[UserProfileRead] = []
-    async for doc in cursor:
-        results.append(UserProfileRead.model_validate(_normalize_id(doc)))
-    return results
+    return list_response(UserProfileRead, await cursor.to_list(length=limit))
 
 
 @router.get("/{profile_id}", response_model=UserProfileRead)
@@ -50,7 +60,7 @@ async def get_profile(
             doc = await db["profiles"].find_one({"_id": ObjectId(profile_id)})
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
-    return UserProfileRead.model_validate(_normalize_id(doc))
+    return model_response(UserProfileRead, doc)
 
 
 @router.post("/", response_model=UserProfileRead, status_code=status.HTTP_201_CREATED)
@@ -61,8 +71,14 @@ async def create_profile(
     # Generate string _id server-side for consistency
     doc = payload.model_dump()
     doc.setdefault("_id", str(ObjectId()))
-    await db["profiles"].insert_one(doc)
-    return UserProfileRead.model_validate(_normalize_id(doc))
+    ident = identity_hash(doc.get("linkedin_url") or "")
+    if ident:
+        doc["identity_hash"] = ident
+    try:
+        await db["profiles"].insert_one(doc)
+    except DuplicateKeyError:
+        raise _conflict()
+    return model_response(UserProfileRead, doc, status_code=status.HTTP_201_CREATED)
 
 
 @router.patch("/{profile_id}", response_model=UserProfileRead)
@@ -76,20 +92,24 @@ async def update_profile(
         # nothing to update; return current doc if exists
         return await get_profile(profile_id, db)
 
-    doc = await db["profiles"].find_one_and_update(
-        {"_id": profile_id},
-        {"$set": updates},
-        return_document=ReturnDocument.AFTER,
-    )
-    if not doc and ObjectId.is_valid(profile_id):
+    update = _identity_update(updates)
+    try:
         doc = await db["profiles"].find_one_and_update(
-            {"_id": ObjectId(profile_id)},
-            {"$set": updates},
+            {"_id": profile_id},
+            update,
             return_document=ReturnDocument.AFTER,
         )
+        if not doc and ObjectId.is_valid(profile_id):
+            doc = await db["profiles"].find_one_and_update(
+                {"_id": ObjectId(profile_id)},
+                update,
+                return_document=ReturnDocument.AFTER,
+            )
+    except DuplicateKeyError:
+        raise _conflict()
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
-    return UserProfileRead.model_validate(_normalize_id(doc))
+    return model_response(UserProfileRead, doc)
 
 
 @router.delete("/{profile_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -5,26 +5,17 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import ReturnDocument
 
-from ..db import get_database
+from ..db import get_database, read_database
 from ..models import TeamCreate, TeamRead, TeamUpdate
+from ..utils.serialization import list_response, model_response
 
 
 router = APIRouter(prefix="/teams", tags=["Teams"])
 
 
-def _normalize_id(document: Optional[dict]) -> Optional[dict]:
-    if not document:
-        return document
-    doc = dict(document)
-    if "_id" in doc and not isinstance(doc["_id"], str):
-        doc["_id"] = str(doc["_id"])  # ensure CORS-safe JSON primitives
-    doc.setdefault("members", [])
-    return doc
-
-
 @router.get("/", response_model=List[TeamRead])
 async def list_teams(
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncIOMotorDatabase = Depends(read_database("teams")),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=200),
     challenge_id: Optional[str] = Query(default=None),
@@ -33,10 +24,7 @@ async def list_teams(
     if challenge_id is not None:
         query["challenge_id"] = challenge_id
     cursor = db["teams"].find(query).skip(skip).limit(limit)
-    results: List[TeamRead] = []
-    async for doc in cursor:
-        results.append(TeamRead.model_validate(_normalize_id(doc)))
-    return results
+    return list_response(TeamRead, await cursor.to_list(length=limit))
 
 
 @router.get("/{team_id}", response_model=TeamRead)
@@ -49,7 +37,7 @@ async def get_team(
         doc = await db["teams"].find_one({"_id": ObjectId(team_id)})
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
-    return TeamRead.model_validate(_normalize_id(doc))
+    return model_response(TeamRead, doc)
 
 
 @router.post("/", response_model=TeamRead, status_code=status.HTTP_201_CREATED)
@@ -61,7 +49,7 @@ async def create_team(
     doc.setdefault("members", [])
     doc.setdefault("_id", str(ObjectId()))
     await db["teams"].insert_one(doc)
-    return TeamRead.model_validate(_normalize_id(doc))
+    return model_response(TeamRead, doc, status_code=status.HTTP_201_CREATED)
 
 
 @router.patch("/{team_id}", response_model=TeamRead)
@@ -87,7 +75,7 @@ async def update_team(
         )
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
-    return TeamRead.model_validate(_normalize_id(doc))
+    return model_response(TeamRead, doc)
 
 
 @router.delete("/{team_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -122,7 +110,7 @@ async def add_team_member(
         )
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
-    return TeamRead.model_validate(_normalize_id(doc))
+    return model_response(TeamRead, doc)
 
 
 @router.delete("/{team_id}/members/{user_id}", response_model=TeamRead)
@@ -144,6 +132,6 @@ async def remove_team_member(
         )
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
-    return TeamRead.model_validate(_normalize_id(doc))
+    return model_response(TeamRead, doc)
 
 
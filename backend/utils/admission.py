@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import math
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel
+
+from ..config import get_settings
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens/second refill up to `capacity`."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Consume one token. Returns 0 when admitted, else seconds until a token is available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Per-client token buckets with LRU eviction to bound memory."""
+
+    def __init__(self, rate_per_minute: float, burst: int, max_clients: int = 10_000) -> None:
+        self.rate = rate_per_minute / 60.0
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def acquire(self, key: str) -> float:
+        now = monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst, now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take(now)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one in-flight task.
+
+    Callers joining an in-flight key await the same result (or exception). The
+    shared task is shielded so a disconnecting caller does not cancel it for the
+    others.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(fn())
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f: self._forget(key, f))
+        return await asyncio.shield(fut)
+
+    def _forget(self, key: str, fut: asyncio.Future) -> None:
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not fut.cancelled():
+            fut.exception()
+
+
+def payload_key(prefix: str, payload: BaseModel) -> str:
+    """Stable key for a request body, e.g. `plan:<sha256 of the draft>`."""
+    digest = hashlib.sha256(payload.model_dump_json().encode("utf-8")).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+def client_key(request: Request) -> str:
+    """The client address used for rate limiting.
+
+    Behind `TRUSTED_PROXY_COUNT` proxies, each appends its peer's address to
+    `X-Forwarded-For`, so only the right-most entries are trustworthy; anything
+    further left was sent by the client and is ignored.
+    """
+    settings = get_settings()
+    if settings.trust_proxy_headers:
+        hops = [hop.strip() for hop in ",".join(request.headers.getlist("x-forwarded-for")).split(",")]
+        hops = [hop for hop in hops if hop]
+        if hops:
+            return hops[max(0, len(hops) - settings.trusted_proxy_count)]
+    return request.client.host if request.client else "unknown"
+
+
+_generation_limiter: Optional[RateLimiter] = None
+generation_flights = SingleFlight()
+
+
+def get_generation_limiter() -> RateLimiter:
+    """The process's limiter. Buckets live in each worker and the listening socket
+    spreads a client's connections across workers, so each worker enforces its
+    share of the configured budget."""
+    global _generation_limiter
+    if _generation_limiter is None:
+        settings = get_settings()
+        workers = settings.web_concurrency
+        _generation_limiter = RateLimiter(
+            rate_per_minute=settings.generation_rate_per_minute / workers,
+            burst=math.ceil(settings.generation_burst / workers),
+        )
+    return _generation_limiter
+
+
+async def admit_generation(request: Request) -> None:
+    """FastAPI dependency guarding the Gemini-backed endpoints; raises 429 when over budget."""
+    retry_after = get_generation_limiter().acquire(client_key(request))
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many generation requests; slow down",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+__all__ = [
+    "TokenBucket",
+    "RateLimiter",
+    "SingleFlight",
+    "payload_key",
+    "client_key",
+    "admit_generation",
+    "generation_flights",
+    "get_generation_limiter",
+]
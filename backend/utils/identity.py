@@ -0,0 +1,227 @@
+"""
+Canonical profile identities.
+
+`canonicalize_url` maps the many spellings of a profile link
+(`http://github.com/Foo/`, `https://www.github.com/foo?tab=repos`, DuckDuckGo
+`/l/?uddg=` redirects, ...) onto one URL, and `identity_hash` turns it into the
+value stored in `profiles.identity_hash` (unique index `uniq_identity_hash`).
+`BloomFilter` is a compact in-memory pre-filter of known identity hashes.
+
+CLI (backfill identity hashes for existing profiles):
+  python -m backend.utils.identity --backfill
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import math
+import re
+from typing import Iterable, Optional
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+
+# Hosts whose profile paths are case-insensitive, mapped to an identity namespace
+_PROFILE_HOSTS = {
+    "github.com": "github",
+    "linkedin.com": "linkedin",
+    "twitter.com": "twitter",
+    "x.com": "twitter",
+    "gitlab.com": "gitlab",
+}
+_GITHUB_RESERVED = {
+    "about", "apps", "collections", "enterprise", "events", "explore", "features",
+    "login", "marketplace", "orgs", "pricing", "search", "settings", "sponsors",
+    "topics", "trending", "users",
+}
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|ref|ref_src|trk|trackingid)$", re.IGNORECASE)
+
+
+def _unwrap_redirect(host: str, path: str, query: str) -> Optional[str]:
+    params = dict(parse_qsl(query))
+    if host.endswith("duckduckgo.com") and path.startswith("/l/"):
+        return params.get("uddg")
+    if host.startswith("google.") or ".google." in host:
+        if path == "/url":
+            return params.get("q") or params.get("url")
+    return None
+
+
+def canonicalize_url(url: str) -> str:
+    """Return a normalized https URL for `url`, or "" when it is empty/unusable."""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    if url.startswith("//"):
+        url = "https:" + url
+    elif "://" not in url:
+        if re.match(r"^[a-zA-Z][a-zA-Z0-9+.-]*:(?!\d)", url):
+            return ""  # javascript:, mailto:, tel:, ...
+        url = "https://" + url
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname or "." not in parts.hostname:
+        return ""
+
+    host = parts.hostname.lower()
+    target = _unwrap_redirect(host, parts.path, parts.query)
+    if target:
+        return canonicalize_url(unquote(target))
+
+    host = re.sub(r"^(www|m|mobile)\.", "", host)
+    if host.endswith(".linkedin.com"):
+        # country subdomains (uk.linkedin.com) serve the same profiles
+        host = "linkedin.com"
+    path = re.sub(r"/{2,}", "/", unquote(parts.path)).rstrip("/")
+
+    namespace = _PROFILE_HOSTS.get(host)
+    if namespace:
+        path = path.lower()
+        segments = [s for s in path.split("/") if s]
+        if namespace in ("github", "gitlab") and segments and segments[0] not in _GITHUB_RESERVED:
+            # repository/tab links identify their owner
+            path = f"/{segments[0]}"
+        elif namespace == "linkedin" and len(segments) >= 2 and segments[0] in ("in", "pub", "company"):
+            path = f"/{segments[0]}/{segments[1]}"
+        return f"https://{host}{path}"
+
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not _TRACKING_PARAMS.match(k)))
+    return f"https://{host}{path}" + (f"?{query}" if query else "")
+
+
+def identity_key(url: str) -> str:
+    """Namespace-qualified identity, e.g. `github:foo`; "" when the URL is unusable."""
+    canonical = canonicalize_url(url)
+    if not canonical:
+        return ""
+    rest = canonical[len("https://"):]
+    host, _, path = rest.partition("/")
+    namespace = _PROFILE_HOSTS.get(host)
+    if namespace and path:
+        return f"{namespace}:{path}"
+    return rest
+
+
+def identity_hash(url: str) -> str:
+    key = identity_key(url)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest() if key else ""
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives, tunable false positives)."""
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01) -> None:
+        capacity = max(1, capacity)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+async def load_known_identities(col, capacity: Optional[int] = None, error_rate: float = 0.01) -> BloomFilter:
+    """Seed a Bloom filter with every stored identity hash (index-only scan)."""
+    if capacity is None:
+        capacity = max(10_000, 2 * await col.estimated_document_count())
+    bloom = BloomFilter(capacity=capacity, error_rate=error_rate)
+    cursor = col.find({"identity_hash": {"$type": "string"}}, {"identity_hash": 1, "_id": 0})
+    async for doc in cursor:
+        bloom.add(doc["identity_hash"])
+    return bloom
+
+
+async def backfill_identities(db, batch_size: int = 1000) -> dict:
+    """Set canonical `linkedin_url`/`identity_hash` on profiles that lack them.
+
+    Profiles whose identity is already taken are marked `duplicate_of` instead,
+    so the unique index can be built without deleting anything.
+    """
+    from pymongo import UpdateOne
+
+    col = db["profiles"]
+    claimed: dict[str, object] = {}
+    async for doc in col.find({"identity_hash": {"$type": "string"}}, {"identity_hash": 1}):
+        claimed[doc["identity_hash"]] = doc["_id"]
+
+    stats = {"updated": 0, "duplicates": 0}
+    ops: list = []
+    cursor = col.find(
+        {
+            "identity_hash": {"$exists": False},
+            "duplicate_of": {"$exists": False},
+            "linkedin_url": {"$type": "string", "$ne": ""},
+        },
+        {"linkedin_url": 1},
+    ).sort("_id", 1)
+    async for doc in cursor:
+        h = identity_hash(doc["linkedin_url"])
+        if not h:
+            continue
+        if h in claimed:
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"duplicate_of": claimed[h]}}))
+            stats["duplicates"] += 1
+        else:
+            claimed[h] = doc["_id"]
+            ops.append(
+                UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {"identity_hash": h, "linkedin_url": canonicalize_url(doc["linkedin_url"])}},
+                )
+            )
+            stats["updated"] += 1
+        if len(ops) >= batch_size:
+            await col.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        await col.bulk_write(ops, ordered=False)
+    return stats
+
+
+async def main_async() -> None:
+    from backend.config import get_settings
+    from backend.db import create_mongo_client
+
+    settings = get_settings()
+    client = create_mongo_client(settings, appname="backend.utils.identity")
+    try:
+        stats = await backfill_identities(client[settings.db_name])
+        print(f"Identity backfill: updated={stats['updated']} duplicates={stats['duplicates']}")
+    finally:
+        client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile identity maintenance")
+    parser.add_argument("--backfill", action="store_true", help="Backfill identity_hash on existing profiles")
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.error("nothing to do (pass --backfill)")
+    asyncio.run(main_async())
+
+
+__all__ = [
+    "canonicalize_url",
+    "identity_key",
+    "identity_hash",
+    "BloomFilter",
+    "load_known_identities",
+    "backfill_identities",
+]
+
+
+if __name__ == "__main__":
+    main()
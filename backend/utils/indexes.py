@@ -1,56 +1,413 @@
+"""
+Declarative MongoDB index registry and reconciliation.
+
+Every index the app relies on is an `IndexSpec` in `INDEXES`. The registry is
+fingerprinted, and the fingerprint of the last reconciliation is stored in
+`schema_meta` (`_id: "indexes"`) together with the optional indexes that could
+not be built. On boot, workers whose fingerprint matches skip reconciliation
+entirely (one `find_one`) and only warn about those failures again. Otherwise
+one worker takes a lease on the same document and reconciles all collections
+concurrently, while the others wait briefly for it and then carry on serving.
+
+`HOT_QUERIES` lists the query shapes on hot paths. After a reconciliation,
+`check_hot_queries` explains each one and warns if its plan is a COLLSCAN.
+
+CLI (reconcile outside of boot, e.g. from a deploy step):
+  python -m backend.utils.indexes            # reconcile if the registry changed, then explain hot queries
+  python -m backend.utils.indexes --force    # reconcile even if the fingerprint matches (retries failed indexes)
+  python -m backend.utils.indexes --plan     # print the registry and fingerprint only
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import socket
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+try:
+    from loguru import logger
+except Exception:  # pragma: no cover
+    class _NoopLogger:
+        def __getattr__(self, name):
+            def _noop(*args, **kwargs):
+                return None
+
+            return _noop
 
+    logger = _NoopLogger()  # type: ignore
 
-async def _ensure_profiles_email_unique_index(db: AsyncIOMotorDatabase) -> None:
-    """Ensure unique email index with a partial filter; replace conflicting index if needed."""
-    col = db["profiles"]
-    desired_name = "uniq_email"
-    desired_key = {"email": 1}
-    desired_unique = True
-    desired_partial = {"email": {"$exists": True}}
-
-    existing = await col.list_indexes().to_list(length=None)
-    existing_named = next((i for i in existing if i.get("name") == desired_name), None)
-
-    def _keys_equal(a: dict, b: dict) -> bool:
-        return list(a.items()) == list(b.items())
-
-    needs_replace = False
-    if existing_named is not None:
-        key_ok = _keys_equal(existing_named.get("key", {}), desired_key)
-        unique_ok = bool(existing_named.get("unique", False)) == desired_unique
-        partial_ok = existing_named.get("partialFilterExpression") == desired_partial
-        if not (key_ok and unique_ok and partial_ok):
-            needs_replace = True
-
-    if needs_replace:
-        await col.drop_index(desired_name)
-
-    if existing_named is None or needs_replace:
-        await col.create_index(
-            list(desired_key.items()),
-            name=desired_name,
-            unique=desired_unique,
-            partialFilterExpression=desired_partial,
+
+META_COLLECTION = "schema_meta"
+META_ID = "indexes"
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """One desired index. `required=False` failures are logged instead of raised."""
+
+    collection: str
+    keys: Tuple[Tuple[str, int], ...]
+    name: str
+    unique: bool = False
+    partial_filter: Optional[dict] = None
+    expire_after_seconds: Optional[int] = None
+    required: bool = True
+    remedy: str = ""
+
+    def options(self) -> dict:
+        opts: dict = {"name": self.name}
+        if self.unique:
+            opts["unique"] = True
+        if self.partial_filter is not None:
+            opts["partialFilterExpression"] = self.partial_filter
+        if self.expire_after_seconds is not None:
+            opts["expireAfterSeconds"] = self.expire_after_seconds
+        return opts
+
+    def matches(self, existing: dict) -> bool:
+        keys = [(k, int(v) if isinstance(v, (int, float)) else v) for k, v in existing.get("key", {}).items()]
+        return (
+            keys == list(self.keys)
+            and bool(existing.get("unique", False)) == self.unique
+            and existing.get("partialFilterExpression") == self.partial_filter
+            and existing.get("expireAfterSeconds") == self.expire_after_seconds
         )
 
 
-async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
-    """Create required indexes if they don't already exist."""
+INDEXES: List[IndexSpec] = [
     # profiles
-    await _ensure_profiles_email_unique_index(db)
-    await db["profiles"].create_index("linkedin_url", name="idx_linkedin_url")
-
+    IndexSpec("profiles", (("email", 1),), "uniq_email", unique=True, partial_filter={"email": {"$exists": True}}),
+    IndexSpec("profiles", (("linkedin_url", 1),), "idx_linkedin_url"),
+    # Unique canonical identity per profile; profiles without a URL carry no hash
+    IndexSpec(
+        "profiles",
+        (("identity_hash", 1),),
+        "uniq_identity_hash",
+        unique=True,
+        partial_filter={"identity_hash": {"$type": "string"}},
+        required=False,
+        remedy="run `python -m backend.utils.identity --backfill`",
+    ),
+    # enrichment picks up never-enriched and stale profiles
+    IndexSpec("profiles", (("enriched_at", 1),), "idx_profiles_enriched_at"),
     # challenges
-    await db["challenges"].create_index("title", name="idx_title")
-
+    IndexSpec("challenges", (("title", 1),), "idx_title"),
     # teams
-    await db["teams"].create_index("challenge_id", name="idx_challenge_id")
-
+    IndexSpec("teams", (("challenge_id", 1),), "idx_challenge_id"),
     # hackathons
-    await db["hackathons"].create_index("topic", name="idx_hack_topic")
+    IndexSpec("hackathons", (("topic", 1),), "idx_hack_topic"),
+    # crawl frontier (claim the next due query)
+    IndexSpec("crawl_frontier", (("status", 1), ("next_run_at", 1)), "idx_frontier_status_next_run"),
+    # llm call accounting (reports filter by time window and group by caller)
+    IndexSpec("llm_calls", (("created_at", -1),), "idx_llm_created_at"),
+    # outreach send batches: per hackathon (API) and across hackathons (agent), oldest first
+    IndexSpec(
+        "outreach_messages", (("status", 1), ("hackathon_id", 1), ("_id", 1)), "idx_outreach_status_hackathon_id"
+    ),
+    IndexSpec("outreach_messages", (("status", 1), ("_id", 1)), "idx_outreach_status_id"),
+    # outreach logs by hackathon and by profile
+    IndexSpec("outreach_logs", (("hackathon_id", 1),), "idx_outreach_logs_hackathon"),
+    IndexSpec("outreach_logs", (("profile_id", 1),), "idx_outreach_logs_profile"),
+    # slow query log, kept for a week
+    IndexSpec("slow_queries", (("created_at", 1),), "ttl_slow_queries", expire_after_seconds=7 * 24 * 3600),
+]
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    """A query shape on a hot path that must be served by an index."""
+
+    name: str
+    collection: str
+    filter: dict
+    sort: Tuple[Tuple[str, int], ...] = ()
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery(
+        "send_emails_batch",
+        "outreach_messages",
+        {"status": "generated", "hackathon_id": "hackathon"},
+        (("_id", 1),),
+    ),
+    HotQuery("outreach_agent_batch", "outreach_messages", {"status": "generated"}, (("_id", 1),)),
+    HotQuery("outreach_logs_by_hackathon", "outreach_logs", {"hackathon_id": "hackathon"}),
+    HotQuery("outreach_logs_by_profile", "outreach_logs", {"profile_id": "profile"}),
+]
+
+
+def registry_fingerprint(specs: Optional[List[IndexSpec]] = None) -> str:
+    payload = sorted(
+        (json.dumps(asdict(s), sort_keys=True, default=str) for s in (specs or INDEXES)),
+    )
+    return hashlib.sha256("\n".join(payload).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ReconcileResult:
+    fingerprint: str
+    status: str = "skipped"  # skipped | reconciled | incomplete | busy
+    created: List[str] = field(default_factory=list)
+    replaced: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    duration_ms: float = 0.0
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _warn_failed(qualified: str, error: str, remedy: str) -> None:
+    try:
+        logger.bind(component="startup").warning(
+            "Could not build {} ({}); {}, then run `python -m backend.utils.indexes --force`",
+            qualified,
+            error,
+            remedy or "fix the data",
+        )
+    except Exception:
+        pass
+
+
+async def _restore_index(col, existing: dict) -> None:
+    """Rebuild an index from its `list_indexes` definition after a failed replacement."""
+    options = {k: v for k, v in existing.items() if k not in ("v", "key", "ns")}
+    try:
+        await col.create_index(list(existing["key"].items()), **options)
+    except OperationFailure as exc:
+        try:
+            logger.bind(component="startup").error(
+                "Could not restore the previous {}.{} ({})", col.name, existing["name"], exc
+            )
+        except Exception:
+            pass
+
+
+async def _reconcile_collection(
+    db: AsyncIOMotorDatabase, collection: str, specs: List[IndexSpec], result: ReconcileResult
+) -> None:
+    col = db[collection]
+    existing = {i["name"]: i for i in await col.list_indexes().to_list(length=None)}
+    for spec in specs:
+        qualified = f"{collection}.{spec.name}"
+        current = existing.get(spec.name)
+        if current is not None and spec.matches(current):
+            continue
+        try:
+            if current is not None:
+                # Same name, different definition: replace it. The server has no
+                # index rename and rejects a second index on the same keys, so
+                # the old one is dropped first and rebuilt if the new one fails.
+                await col.drop_index(spec.name)
+                try:
+                    await col.create_index(list(spec.keys), **spec.options())
+                except OperationFailure:
+                    await _restore_index(col, current)
+                    raise
+                result.replaced.append(qualified)
+            else:
+                await col.create_index(list(spec.keys), **spec.options())
+                result.created.append(qualified)
+        except OperationFailure as exc:
+            if spec.required:
+                raise
+            result.failed[qualified] = str(exc)
+            _warn_failed(qualified, str(exc), spec.remedy)
+
+
+async def _acquire_lease(db: AsyncIOMotorDatabase, owner: str, lease: timedelta) -> bool:
+    now = _now()
+    try:
+        doc = await db[META_COLLECTION].find_one_and_update(
+            {"_id": META_ID, "$or": [{"lease_until": {"$exists": False}}, {"lease_until": {"$lt": now}}]},
+            {"$set": {"lease_until": now + lease, "owner": owner}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # Document exists with a live lease held by another worker
+        return False
+    return bool(doc and doc.get("owner") == owner)
+
+
+async def _wait_for_fingerprint(db: AsyncIOMotorDatabase, fingerprint: str, timeout: float) -> bool:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.5)
+        meta = await db[META_COLLECTION].find_one({"_id": META_ID}, {"fingerprint": 1, "lease_until": 1})
+        if meta and meta.get("fingerprint") == fingerprint:
+            return True
+        if not meta or "lease_until" not in meta:
+            return False  # the holder gave up without applying
+    return False
+
+
+async def ensure_indexes(
+    db: AsyncIOMotorDatabase,
+    force: bool = False,
+    lease: timedelta = timedelta(minutes=5),
+    wait: float = 30.0,
+) -> ReconcileResult:
+    """Reconcile the registry unless the stored fingerprint already matches.
+
+    Only the worker holding the `schema_meta` lease reconciles. Optional indexes
+    that fail to build are stored with the fingerprint, so later boots skip
+    reconciliation and only warn again; they are retried when the registry
+    changes or with `force`.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    fingerprint = registry_fingerprint()
+    result = ReconcileResult(fingerprint=fingerprint)
+    meta_col = db[META_COLLECTION]
+
+    meta = await meta_col.find_one({"_id": META_ID}, {"fingerprint": 1, "failed": 1})
+    if not force and meta and meta.get("fingerprint") == fingerprint:
+        for failure in meta.get("failed") or []:
+            result.failed[failure["index"]] = failure["error"]
+            spec = next((s for s in INDEXES if f"{s.collection}.{s.name}" == failure["index"]), None)
+            _warn_failed(failure["index"], failure["error"], spec.remedy if spec else "")
+        result.duration_ms = (loop.time() - start) * 1000
+        return result
+
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    if not await _acquire_lease(db, owner, lease):
+        applied = await _wait_for_fingerprint(db, fingerprint, wait)
+        result.status = "skipped" if applied else "busy"
+        result.duration_ms = (loop.time() - start) * 1000
+        return result
+
+    by_collection: Dict[str, List[IndexSpec]] = {}
+    for spec in INDEXES:
+        by_collection.setdefault(spec.collection, []).append(spec)
+    try:
+        await asyncio.gather(
+            *(_reconcile_collection(db, name, specs, result) for name, specs in by_collection.items())
+        )
+    except BaseException:
+        # Let the next worker (or boot) retry
+        await meta_col.update_one({"_id": META_ID, "owner": owner}, {"$unset": {"lease_until": "", "owner": ""}})
+        raise
+
+    # Only optional indexes can fail here (required ones raised above)
+    result.status = "incomplete" if result.failed else "reconciled"
+    release: dict = {
+        "$set": {"fingerprint": fingerprint, "applied_at": _now(), "applied_by": owner},
+        "$unset": {"lease_until": "", "owner": ""},
+    }
+    if result.failed:
+        # Index names contain dots, so failures are stored as a list
+        release["$set"]["failed"] = [{"index": name, "error": error} for name, error in result.failed.items()]
+    else:
+        release["$unset"]["failed"] = ""
+    await meta_col.update_one({"_id": META_ID, "owner": owner}, release)
+    result.duration_ms = (loop.time() - start) * 1000
+    return result
+
+
+def plan_stages(plan) -> List[str]:
+    """Stage names of an explain() plan, outermost first."""
+    stages: List[str] = []
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+async def check_hot_queries(db: AsyncIOMotorDatabase) -> Dict[str, List[str]]:
+    """Explain every registered hot query; warn about (and return) those planned as COLLSCAN."""
+    scans: Dict[str, List[str]] = {}
+
+    async def _explain(query: HotQuery) -> None:
+        command: dict = {"find": query.collection, "filter": query.filter}
+        if query.sort:
+            command["sort"] = dict(query.sort)
+        try:
+            explained = await db.command("explain", command, verbosity="queryPlanner")
+        except Exception as exc:
+            try:
+                logger.bind(component="startup").warning("Could not explain hot query {}: {}", query.name, exc)
+            except Exception:
+                pass
+            return
+        stages = plan_stages(explained.get("queryPlanner", {}).get("winningPlan", {}))
+        if "COLLSCAN" in stages:
+            scans[query.name] = stages
+            try:
+                logger.bind(component="startup").warning(
+                    "Hot query {} on {} uses a COLLSCAN (plan: {}); add an index to INDEXES",
+                    query.name,
+                    query.collection,
+                    " <- ".join(stages),
+                )
+            except Exception:
+                pass
+
+    await asyncio.gather(*(_explain(q) for q in HOT_QUERIES))
+    return scans
+
+
+async def main_async(force: bool) -> ReconcileResult:
+    from backend.config import get_settings
+    from backend.db import create_mongo_client
+
+    settings = get_settings()
+    client = create_mongo_client(settings, appname="backend.utils.indexes")
+    try:
+        result = await ensure_indexes(client[settings.db_name], force=force)
+        scans = await check_hot_queries(client[settings.db_name])
+    finally:
+        client.close()
+    print(
+        f"Indexes {result.status} in {result.duration_ms:.0f}ms (fingerprint {result.fingerprint[:12]}): "
+        f"created={result.created or '-'} replaced={result.replaced or '-'} failed={result.failed or '-'}"
+    )
+    print(f"Hot queries: {len(HOT_QUERIES)} checked, COLLSCAN: {sorted(scans) or 'none'}")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconcile MongoDB indexes with the registry")
+    parser.add_argument("--force", action="store_true", help="Reconcile even if the fingerprint is unchanged")
+    parser.add_argument("--plan", action="store_true", help="Print the registry and its fingerprint, then exit")
+    args = parser.parse_args()
+    if args.plan:
+        for spec in INDEXES:
+            print(f"{spec.collection}.{spec.name}: {list(spec.keys)} {spec.options()}")
+        print(f"fingerprint {registry_fingerprint()}")
+        return
+    result = asyncio.run(main_async(args.force))
+    if result.status in ("incomplete", "busy"):
+        raise SystemExit(1)
 
 
-__all__ = ["ensure_indexes"]
+__all__ = [
+    "IndexSpec",
+    "INDEXES",
+    "HotQuery",
+    "HOT_QUERIES",
+    "ReconcileResult",
+    "registry_fingerprint",
+    "ensure_indexes",
+    "check_hot_queries",
+    "plan_stages",
+]
 
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+LLM call accounting.
+
+Every Gemini call made through `generate_content` is recorded with model,
+prompt/output size, token usage, latency and outcome. Records are buffered in
+memory and written to the `llm_calls` collection in batches by a background
+task, so accounting never adds a database round trip to the calling request.
+
+CLI (aggregate report):
+  python -m backend.utils.llm_usage --since-hours 24
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+
+from .tracing import span
+
+try:
+    from loguru import logger
+except Exception:  # pragma: no cover
+    class _NoopLogger:
+        def __getattr__(self, name):
+            def _noop(*args, **kwargs):
+                return None
+
+            return _noop
+
+    logger = _NoopLogger()  # type: ignore
+
+
+COLLECTION = "llm_calls"
+
+# USD per 1M tokens as (input, output); unknown models are reported with cost 0
+MODEL_PRICING_PER_MILLION: Dict[str, tuple[float, float]] = {
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.0-flash-lite": (0.075, 0.30),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+}
+
+
+def estimate_cost(model_name: str, prompt_tokens: int, output_tokens: int) -> float:
+    price_in, price_out = MODEL_PRICING_PER_MILLION.get(model_name, (0.0, 0.0))
+    return (prompt_tokens * price_in + output_tokens * price_out) / 1_000_000
+
+
+class LLMCallRecorder:
+    """Buffer call records and flush them to Mongo in batches."""
+
+    def __init__(self, batch_size: int = 50, flush_interval: float = 2.0, max_buffer: int = 10_000) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer: List[dict] = []
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._pending: set[asyncio.Task] = set()
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        self._db = db
+        if self._task is None or self._task.done():
+            self._stop = asyncio.Event()
+            self._task = asyncio.create_task(self._run(self._stop))
+
+    async def close(self) -> None:
+        if self._task is not None:
+            # Let the loop finish its current flush; cancelling it could drop a batch already taken from the buffer
+            self._stop.set()  # type: ignore[union-attr]
+            await self._task
+            self._task = None
+            self._stop = None
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        await self.flush()
+        self._db = None
+
+    def record(self, doc: dict) -> None:
+        self._buffer.append(doc)
+        if len(self._buffer) > self.max_buffer:
+            # No database bound (or it is down); keep only the newest records
+            del self._buffer[: len(self._buffer) - self.max_buffer]
+        if self._db is not None and len(self._buffer) >= self.batch_size:
+            try:
+                task = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                return
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def flush(self) -> int:
+        if self._db is None or not self._buffer:
+            return 0
+        batch, self._buffer = self._buffer, []
+        try:
+            await self._db[COLLECTION].insert_many(batch, ordered=False)
+        except Exception as exc:
+            try:
+                logger.bind(component="llm").warning("Dropped {} LLM call records: {}", len(batch), exc)
+            except Exception:
+                pass
+            return 0
+        return len(batch)
+
+    async def _run(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+
+recorder = LLMCallRecorder()
+
+
+def _usage_metadata(resp: Any) -> Dict[str, int]:
+    usage = getattr(resp, "usage_metadata", None)
+    if usage is None:
+        return {}
+    fields = (
+        "prompt_token_count",
+        "candidates_token_count",
+        "cached_content_token_count",
+        "total_token_count",
+    )
+    return {f: int(getattr(usage, f, 0) or 0) for f in fields}
+
+
+def response_text(resp: Any) -> str:
+    """Return the response text, or "" when the candidate was blocked/empty."""
+    try:
+        return resp.text if hasattr(resp, "text") else str(resp)
+    except ValueError:
+        return ""
+
+
+async def generate_content(model_name: str, prompt: str, caller: str) -> Any:
+    """Run `GenerativeModel(model_name).generate_content(prompt)` off the event loop and record it.
+
+    The caller must have configured the Gemini SDK (`genai.configure`).
+    """
+    import google.generativeai as genai
+
+    model = genai.GenerativeModel(model_name)
+    start = perf_counter()
+    resp: Any = None
+    outcome = "ok"
+    error: Optional[str] = None
+    usage: Dict[str, int] = {}
+    attributes = {"llm.model": model_name, "llm.caller": caller}
+    try:
+        with span("llm.generate_content", kind="client", **attributes) as current:
+            resp = await asyncio.to_thread(model.generate_content, prompt)
+            usage = _usage_metadata(resp)
+            current.set(
+                **{
+                    "llm.prompt_tokens": usage.get("prompt_token_count", 0),
+                    "llm.output_tokens": usage.get("candidates_token_count", 0),
+                }
+            )
+        return resp
+    except asyncio.CancelledError:
+        # Client disconnects, timeouts and coalesced-call cancellation are not successes
+        outcome = "cancelled"
+        raise
+    except Exception as exc:
+        outcome = "error"
+        error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        prompt_tokens = usage.get("prompt_token_count", 0)
+        output_tokens = usage.get("candidates_token_count", 0)
+        recorder.record(
+            {
+                "caller": caller,
+                "model": model_name,
+                "prompt_chars": len(prompt),
+                "output_chars": len(response_text(resp)) if resp is not None else 0,
+                "usage": usage,
+                "latency_ms": (perf_counter() - start) * 1000,
+                "outcome": outcome,
+                "error": error,
+                "cost_usd": estimate_cost(model_name, prompt_tokens, output_tokens),
+                "created_at": datetime.now(timezone.utc),
+            }
+        )
+
+
+async def _latency_histograms(db: AsyncIOMotorDatabase, match: dict) -> Dict[tuple, List[tuple]]:
+    """Per caller/model, (millisecond bucket, calls) pairs in ascending order.
+
+    Streams one small document per bucket instead of every latency in one group.
+    """
+    pipeline = [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": {"caller": "$caller", "model": "$model", "ms": {"$floor": "$latency_ms"}},
+                "calls": {"$sum": 1},
+            }
+        },
+    ]
+    histograms: Dict[tuple, List[tuple]] = {}
+    async for bucket in db[COLLECTION].aggregate(pipeline):
+        key = bucket["_id"]
+        histograms.setdefault((key.get("caller"), key.get("model")), []).append((key["ms"] or 0, bucket["calls"]))
+    for buckets in histograms.values():
+        buckets.sort()
+    return histograms
+
+
+def _histogram_percentile(buckets: List[tuple], pct: float) -> float:
+    total = sum(calls for _, calls in buckets)
+    if not total:
+        return 0.0
+    # nearest-rank percentile over the buckets
+    rank = max(1, math.ceil(pct / 100 * total))
+    seen = 0
+    for value, calls in buckets:
+        seen += calls
+        if seen >= rank:
+            return value
+    return buckets[-1][0]
+
+
+async def usage_report(db: AsyncIOMotorDatabase, since: Optional[datetime] = None) -> List[dict]:
+    """Aggregate calls per caller/model: counts, p50/p95 latency, tokens and cost.
+
+    Latency percentiles come from `$percentile` (MongoDB 7.0+); older servers
+    fall back to per-millisecond latency histograms. Cancelled calls are counted
+    separately and left out of the percentiles: their latency is wherever the
+    caller gave up, not how long Gemini took.
+    """
+    match: dict = {}
+    if since is not None:
+        match["created_at"] = {"$gte": since}
+    group: dict = {
+        "_id": {"caller": "$caller", "model": "$model"},
+        "calls": {"$sum": 1},
+        "errors": {"$sum": {"$cond": [{"$eq": ["$outcome", "error"]}, 1, 0]}},
+        "cancelled": {"$sum": {"$cond": [{"$eq": ["$outcome", "cancelled"]}, 1, 0]}},
+        "prompt_tokens": {"$sum": "$usage.prompt_token_count"},
+        "output_tokens": {"$sum": "$usage.candidates_token_count"},
+        "cost_usd": {"$sum": "$cost_usd"},
+    }
+    percentiles: Dict[tuple, tuple] = {}
+    try:
+        # Non-numeric inputs (null for cancelled calls) are ignored by $percentile
+        completed_latency = {"$cond": [{"$eq": ["$outcome", "cancelled"]}, None, "$latency_ms"]}
+        latency = {"$percentile": {"input": completed_latency, "p": [0.5, 0.95], "method": "approximate"}}
+        groups = await db[COLLECTION].aggregate(
+            [{"$match": match}, {"$group": {**group, "latency": latency}}]
+        ).to_list(length=None)
+        for g in groups:
+            percentiles[(g["_id"].get("caller"), g["_id"].get("model"))] = tuple(g.pop("latency") or (0.0, 0.0))
+    except OperationFailure:
+        groups = await db[COLLECTION].aggregate([{"$match": match}, {"$group": group}]).to_list(length=None)
+        completed = {**match, "outcome": {"$ne": "cancelled"}}
+        for key, buckets in (await _latency_histograms(db, completed)).items():
+            percentiles[key] = (_histogram_percentile(buckets, 50), _histogram_percentile(buckets, 95))
+    rows: List[dict] = []
+    for group_doc in groups:
+        key = group_doc.pop("_id")
+        p50, p95 = percentiles.get((key.get("caller"), key.get("model")), (0.0, 0.0))
+        rows.append(
+            {
+                **key,
+                **group_doc,
+                "p50_ms": round(p50 or 0.0, 2),
+                "p95_ms": round(p95 or 0.0, 2),
+                "cost_usd": round(group_doc["cost_usd"], 6),
+            }
+        )
+    rows.sort(key=lambda r: r["cost_usd"], reverse=True)
+    return rows
+
+
+async def main_async(since_hours: Optional[float]) -> None:
+    from backend.config import get_settings
+    from backend.db import create_mongo_client
+
+    settings = get_settings()
+    client = create_mongo_client(settings, appname="backend.utils.llm_usage")
+    try:
+        since = None
+        if since_hours:
+            since = datetime.now(timezone.utc) - timedelta(hours=since_hours)
+        rows = await usage_report(client[settings.db_name], since)
+        print(json.dumps(rows, indent=2))
+    finally:
+        client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LLM call usage report")
+    parser.add_argument("--since-hours", type=float, default=24.0, help="Window to report on (0 = all time)")
+    args = parser.parse_args()
+    asyncio.run(main_async(args.since_hours))
+
+
+__all__ = [
+    "LLMCallRecorder",
+    "recorder",
+    "generate_content",
+    "response_text",
+    "estimate_cost",
+    "usage_report",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import monitoring
+
+# Seconds; the last bucket is +Inf
+HTTP_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _with_label(line: str, label: str) -> str:
+    """Add `label` to one sample line (`name{...} value` or `name value`)."""
+    name, brace, rest = line.partition("{")
+    if brace:
+        return f"{name}{{{label},{rest}"
+    name, _, value = line.partition(" ")
+    return f"{name}{{{label}}} {value}"
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Labels = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Labels = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Labels = (), buckets: Tuple[float, ...] = HTTP_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+        self._values: Dict[Labels, list] = {}  # labels -> [bucket counts..., sum]
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[index] += 1
+            row[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines = self.header()
+        for labels, row in items:
+            lines.extend(render_histogram(self.name, self.labelnames, labels, self.buckets, row[:-1], row[-1]))
+        return lines
+
+
+def render_histogram(
+    name: str, labelnames: Labels, labels: Labels, buckets: Iterable[float], counts: List[int], total: float
+) -> List[str]:
+    """Exposition lines for per-bucket (non-cumulative) `counts` (len(buckets) + 1, last is +Inf)."""
+    lines: List[str] = []
+    running = 0
+    for bound, count in zip(list(buckets) + [float("inf")], counts):
+        running += count
+        le = 'le="' + _fmt(bound) + '"'
+        lines.append(f"{name}_bucket{_labels(labelnames, labels, le)} {running}")
+    lines.append(f"{name}_sum{_labels(labelnames, labels)} {_fmt(float(total))}")
+    lines.append(f"{name}_count{_labels(labelnames, labels)} {running}")
+    return lines
+
+
+class MetricsRegistry:
+    """Metrics owned by this process plus collectors that render external state at scrape time.
+
+    With several workers, a scrape reaches one of them; `workers > 1` adds a
+    `worker` (pid) label to every sample so the processes' series stay apart
+    and can be summed in queries.
+    """
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], List[str]]] = []
+        self.workers = workers
+
+    def counter(self, name: str, help: str, labelnames: Labels = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+    def histogram(self, name: str, help: str, labelnames: Labels = (), buckets: Tuple[float, ...] = HTTP_BUCKETS):
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        for collector in list(self._collectors):
+            try:
+                lines.extend(collector())
+            except Exception:
+                continue
+        if self._worker_count() > 1:
+            label = f'worker="{os.getpid()}"'
+            lines = [line if line.startswith("#") else _with_label(line, label) for line in lines]
+        return "\n".join(lines) + "\n"
+
+    def _worker_count(self) -> int:
+        if self.workers is None:
+            from ..config import get_settings
+
+            self.workers = get_settings().web_concurrency
+        return self.workers
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+http_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+outreach_sends = registry.counter(
+    "outreach_sends_total", "Outreach send attempts by channel and outcome", ("channel", "status")
+)
+
+
+# ---------- HTTP ----------
+def _route_template(scope: dict) -> str:
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    return template if isinstance(template, str) else UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: per route template counts, latency and in-flight requests.
+
+    The route template is read from `scope["route"]` after the router has run, so
+    raw paths never become label values. In-flight requests are tracked as a set
+    of scopes and grouped by route only when `/metrics` is scraped.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self._in_flight: Dict[int, dict] = {}
+        registry.add_collector(self._render_in_flight)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = perf_counter()
+        status = {"code": 500}
+
+        async def _send(message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        key = id(scope)
+        self._in_flight[key] = scope
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            del self._in_flight[key]
+            route = _route_template(scope)
+            method = scope.get("method", "")
+            http_requests.inc(method, route, str(status["code"]))
+            http_duration.observe(perf_counter() - start, method, route)
+
+    def _render_in_flight(self) -> List[str]:
+        counts: Dict[Labels, int] = {}
+        for scope in list(self._in_flight.values()):
+            labels = (scope.get("method", ""), _route_template(scope))
+            counts[labels] = counts.get(labels, 0) + 1
+        lines = [
+            "# HELP http_requests_in_flight HTTP requests being served (unrouted ones as <unmatched>)",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        lines += [f"http_requests_in_flight{_labels(('method', 'route'), k)} {v}" for k, v in counts.items()]
+        return lines
+
+
+# ---------- Mongo connection pool ----------
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Connection pool gauges and counters per server address."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _bump(self, address, field: str, amount: float = 1) -> None:
+        key = f"{address[0]}:{address[1]}" if isinstance(address, tuple) else str(address)
+        with self._lock:
+            row = self.stats.setdefault(
+                key,
+                {"open": 0, "checked_out": 0, "created": 0, "checkouts": 0, "checkout_failures": 0,
+                 "checkout_wait_seconds": 0.0, "cleared": 0},
+            )
+            row[field] += amount
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        self._bump(event.address, "cleared")
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        self._bump(event.address, "open")
+        self._bump(event.address, "created")
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        self._bump(event.address, "open", -1)
+
+    def connection_check_out_started(self, event) -> None:
+        pass
+
+    def connection_check_out_failed(self, event) -> None:
+        self._bump(event.address, "checkout_failures")
+
+    def connection_checked_out(self, event) -> None:
+        self._bump(event.address, "checked_out")
+        self._bump(event.address, "checkouts")
+        duration = getattr(event, "duration", None)  # pymongo >= 4.7
+        if duration:
+            self._bump(event.address, "checkout_wait_seconds", duration)
+
+    def connection_checked_in(self, event) -> None:
+        self._bump(event.address, "checked_out", -1)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            rows = {k: dict(v) for k, v in self.stats.items()}
+        series = [
+            ("mongodb_pool_connections", "gauge", "Open pooled connections", "open"),
+            ("mongodb_pool_checked_out", "gauge", "Connections currently checked out", "checked_out"),
+            ("mongodb_pool_connections_created_total", "counter", "Connections created", "created"),
+            ("mongodb_pool_checkouts_total", "counter", "Successful connection checkouts", "checkouts"),
+            ("mongodb_pool_checkout_failures_total", "counter", "Failed checkouts (timeouts, errors)", "checkout_failures"),
+            ("mongodb_pool_checkout_wait_seconds_total", "counter", "Time spent waiting for a connection", "checkout_wait_seconds"),
+            ("mongodb_pool_cleared_total", "counter", "Times the pool was cleared", "cleared"),
+        ]
+        lines: List[str] = []
+        for name, kind, help, field in series:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            lines += [f"{name}{_labels(('address',), (addr,))} {_fmt(row[field])}" for addr, row in rows.items()]
+        return lines
+
+
+pool_monitor = PoolMonitor()
+registry.add_collector(pool_monitor.render)
+
+
+# ---------- Mongo commands (see mongo_monitor) ----------
+def _render_commands() -> List[str]:
+    from . import mongo_monitor
+
+    monitor = mongo_monitor.command_monitor
+    if monitor is None:
+        return []
+    snapshot = monitor.snapshot()
+    buckets = [b / 1000 for b in mongo_monitor.LATENCY_BUCKETS_MS]
+    name = "mongodb_command_duration_seconds"
+    lines = [f"# HELP {name} Mongo command latency by collection and command", f"# TYPE {name} histogram"]
+    for key, stats in snapshot["commands"].items():
+        collection, _, command = key.partition(".")
+        cumulative = stats["cumulative"]
+        counts = [c - (cumulative[i - 1] if i else 0) for i, c in enumerate(cumulative)]
+        lines += render_histogram(
+            name, ("collection", "command"), (collection, command), buckets, counts, stats["sum"] / 1000
+        )
+    name = "mongodb_route_seconds_total"
+    lines += [f"# HELP {name} Mongo command time attributed to each route", f"# TYPE {name} counter"]
+    for route, stats in snapshot["routes"].items():
+        lines.append(f"{name}{_labels(('route',), (route,))} {_fmt(stats['total_ms'] / 1000)}")
+    return lines
+
+
+registry.add_collector(_render_commands)
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "MetricsMiddleware",
+    "PoolMonitor",
+    "registry",
+    "http_requests",
+    "http_duration",
+    "outreach_sends",
+    "pool_monitor",
+]
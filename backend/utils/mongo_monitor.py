@@ -0,0 +1,279 @@
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from .request_context import current_request
+from .tracing import current_span, get_tracer
+
+try:
+    from loguru import logger
+except Exception:  # pragma: no cover
+    class _NoopLogger:
+        def __getattr__(self, name):
+            def _noop(*args, **kwargs):
+                return None
+
+            return _noop
+
+    logger = _NoopLogger()  # type: ignore
+
+
+SLOW_QUERY_COLLECTION = "slow_queries"
+# Upper bounds in milliseconds; the last bucket is +Inf
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+_IGNORED = {"hello", "ismaster", "isMaster", "ping", "buildInfo", "saslStart", "saslContinue", "endSessions"}
+_DROPPED_FIELDS = {"lsid", "txnNumber", "$db", "$clusterTime", "$readPreference", "readConcern", "writeConcern"}
+
+
+class LatencyHistogram:
+    """Cumulative-bucket histogram (Prometheus style); not locked, callers serialize updates."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        cumulative: List[int] = []
+        running = 0
+        for c in self.counts:
+            running += c
+            cumulative.append(running)
+        return {"buckets": list(self.buckets), "cumulative": cumulative, "count": self.count, "sum": self.sum}
+
+
+def _collection_of(event: monitoring.CommandStartedEvent) -> str:
+    value = event.command.get(event.command_name)
+    return value if isinstance(value, str) else ""
+
+
+def _sanitize(command: dict) -> dict:
+    return {k: v for k, v in command.items() if k not in _DROPPED_FIELDS}
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Per (collection, command) latency histograms, DB time per route and slow-command capture.
+
+    Motor runs pymongo in executor threads with a copy of the caller's context,
+    so `current_request` identifies the HTTP request behind every command.
+    Commands slower than `slow_ms` are handed to `SlowQueryLog` (off the hot path).
+    """
+
+    def __init__(self, slow_ms: float = 100.0) -> None:
+        self.slow_ms = slow_ms
+        self.slow_log: Optional["SlowQueryLog"] = None
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[int, Any], tuple] = {}
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.failures: Dict[Tuple[str, str], int] = {}
+        self.route_time: Dict[str, List[float]] = {}  # route -> [commands, total_ms]
+
+    # ---------- listener callbacks (run on pymongo threads) ----------
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name in _IGNORED:
+            return
+        collection = _collection_of(event)
+        if collection == SLOW_QUERY_COLLECTION:
+            return
+        command = None
+        if self.slow_ms > 0 and self.slow_log is not None and event.command_name in EXPLAINABLE:
+            command = _sanitize(event.command)
+        span = current_span()
+        self._pending[(event.request_id, event.connection_id)] = (
+            event.command_name,
+            collection,
+            event.database_name,
+            current_request.get(),
+            command,
+            span if span is not None and span.sampled else None,
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, failed=True)
+
+    def _finish(self, event: Any, failed: bool) -> None:
+        pending = self._pending.pop((event.request_id, event.connection_id), None)
+        if pending is None:
+            return
+        command_name, collection, database, request, command, span = pending
+        duration_ms = event.duration_micros / 1000
+        if span is not None:
+            end_ns = time.time_ns()
+            get_tracer().record(
+                f"mongo.{command_name}",
+                span,
+                end_ns - event.duration_micros * 1000,
+                end_ns,
+                **{"db.collection": collection, "db.operation": command_name, "db.failed": failed},
+            )
+        key = (collection, command_name)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = LatencyHistogram()
+            hist.observe(duration_ms)
+            if failed:
+                self.failures[key] = self.failures.get(key, 0) + 1
+            if request is not None:
+                totals = self.route_time.setdefault(f"{request.method} {request.route}", [0, 0.0])
+                totals[0] += 1
+                totals[1] += duration_ms
+        if self.slow_ms > 0 and duration_ms >= self.slow_ms and self.slow_log is not None:
+            self.slow_log.submit(
+                {
+                    "database": database,
+                    "collection": collection,
+                    "command_name": command_name,
+                    "duration_ms": round(duration_ms, 3),
+                    "failed": failed,
+                    "request": request.as_dict() if request is not None else None,
+                    "trace_id": span.trace_id if span is not None else None,
+                    "command": command,
+                    "created_at": datetime.now(timezone.utc),
+                }
+            )
+
+    # ---------- reporting ----------
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "commands": {
+                    f"{col}.{cmd}": {**hist.snapshot(), "failures": self.failures.get((col, cmd), 0)}
+                    for (col, cmd), hist in self.histograms.items()
+                },
+                "routes": {
+                    route: {"commands": int(n), "total_ms": round(total, 3)}
+                    for route, (n, total) in self.route_time.items()
+                },
+            }
+
+    def top_routes(self, n: int = 5) -> List[Tuple[str, float, int]]:
+        with self._lock:
+            rows = [(route, total, int(count)) for route, (count, total) in self.route_time.items()]
+        return sorted(rows, key=lambda r: r[1], reverse=True)[:n]
+
+
+class SlowQueryLog:
+    """Explains slow commands and stores them in `slow_queries` from a background task."""
+
+    def __init__(self, max_pending: int = 100) -> None:
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._db = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, db) -> None:
+        self._db = db
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = self._queue = self._loop = None
+
+    def submit(self, record: dict) -> None:
+        """Thread-safe; drops the record when the backlog is full."""
+        loop, queue = self._loop, self._queue
+        if loop is None or queue is None or loop.is_closed():
+            return
+
+        def _put() -> None:
+            try:
+                queue.put_nowait(record)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+        try:
+            loop.call_soon_threadsafe(_put)
+        except RuntimeError:
+            pass
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            record = await self._queue.get()
+            try:
+                await self._store(record)
+            except Exception as exc:
+                try:
+                    logger.bind(component="mongo").warning("Could not store slow query: {}", exc)
+                except Exception:
+                    pass
+
+    async def _store(self, record: dict) -> None:
+        from .indexes import plan_stages
+
+        command = record.get("command")
+        if command:
+            try:
+                explained = await self._db.client[record["database"]].command(
+                    {"explain": command, "verbosity": "queryPlanner"}
+                )
+                winning = explained.get("queryPlanner", {}).get("winningPlan", {})
+                record["plan"] = {"stages": plan_stages(winning), "winning_plan": winning}
+            except Exception as exc:
+                record["plan"] = {"error": str(exc)}
+            if len(repr(command)) > 8000:
+                record["command"] = {"truncated": repr(command)[:8000]}
+        try:
+            request = record.get("request") or {}
+            logger.bind(component="mongo").warning(
+                "Slow {}.{} {:.0f} ms (route: {} {}, plan: {})",
+                record["collection"],
+                record["command_name"],
+                record["duration_ms"],
+                request.get("method", "-"),
+                request.get("route", "-"),
+                " <- ".join((record.get("plan") or {}).get("stages", [])) or "-",
+            )
+        except Exception:
+            pass
+        await self._db[SLOW_QUERY_COLLECTION].insert_one(record)
+
+
+command_monitor: Optional[CommandMonitor] = None
+slow_query_log = SlowQueryLog()
+
+
+def get_command_monitor(slow_ms: float = 100.0) -> CommandMonitor:
+    """Process-wide listener; pass it to the Mongo client's `event_listeners`."""
+    global command_monitor
+    if command_monitor is None:
+        command_monitor = CommandMonitor(slow_ms=slow_ms)
+        command_monitor.slow_log = slow_query_log
+    return command_monitor
+
+
+__all__ = [
+    "LATENCY_BUCKETS_MS",
+    "LatencyHistogram",
+    "CommandMonitor",
+    "SlowQueryLog",
+    "get_command_monitor",
+    "slow_query_log",
+]
@@ -0,0 +1,44 @@
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+@dataclass
+class RequestInfo:
+    """The HTTP request being served by the current task (and threads it starts)."""
+
+    request_id: str
+    method: str
+    path: str
+    scope: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def route(self) -> str:
+        """Route template (`/profiles/{profile_id}`) once routing has happened, else the raw path."""
+        route: Any = self.scope.get("route")
+        template = getattr(route, "path_format", None) or getattr(route, "path", None)
+        return template if isinstance(template, str) else self.path
+
+    def as_dict(self) -> dict:
+        return {"request_id": self.request_id, "method": self.method, "path": self.path, "route": self.route}
+
+
+current_request: ContextVar[Optional[RequestInfo]] = ContextVar("current_request", default=None)
+
+
+def request_info_from_scope(scope: dict) -> RequestInfo:
+    request_id = ""
+    for name, value in scope.get("headers") or []:
+        if name == b"x-request-id":
+            request_id = value.decode("latin-1")[:64]
+            break
+    return RequestInfo(
+        request_id=request_id or uuid.uuid4().hex,
+        method=scope.get("method", ""),
+        path=scope.get("path", ""),
+        scope=scope,
+    )
+
+
+__all__ = ["RequestInfo", "current_request", "request_info_from_scope"]
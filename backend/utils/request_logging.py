@@ -0,0 +1,110 @@
+import random
+from time import perf_counter
+from typing import Iterable, Optional
+
+from .request_context import current_request, request_info_from_scope
+from .tracing import current_span
+
+try:
+    from loguru import logger
+except Exception:  # pragma: no cover
+    class _NoopLogger:
+        def __getattr__(self, name):
+            def _noop(*args, **kwargs):
+                return None
+
+            return _noop
+
+    logger = _NoopLogger()  # type: ignore
+
+
+class RequestLoggingMiddleware:
+    """Pure ASGI access log (no `BaseHTTPMiddleware` task/stream buffering).
+
+    - errors (5xx or unhandled exceptions) and requests slower than `slow_ms`
+      are always logged
+    - `exclude_paths` (health checks, metrics scrapes) are otherwise never logged
+    - other requests are logged with probability `sample_rate`, or not at all
+      when `only_slow_or_errors` is set
+
+    Fields are bound on the record (`method`, `path`, `route`, `status`,
+    `duration_ms`, `request_id`, `trace_id`), so a `serialize=True` sink emits them as JSON.
+    It also sets `current_request` for the request's task and echoes
+    `X-Request-ID` on the response.
+    """
+
+    def __init__(
+        self,
+        app,
+        sample_rate: float = 1.0,
+        exclude_paths: Iterable[str] = ("/health", "/metrics"),
+        slow_ms: float = 1000.0,
+        only_slow_or_errors: bool = False,
+    ) -> None:
+        self.app = app
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.exclude_paths = frozenset(exclude_paths)
+        self.slow_ms = slow_ms
+        self.only_slow_or_errors = only_slow_or_errors
+
+    def _sampled(self, path: str) -> bool:
+        if self.only_slow_or_errors or path in self.exclude_paths:
+            return False
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = perf_counter()
+        info = request_info_from_scope(scope)
+        sampled = self._sampled(info.path)
+        request_id = info.request_id.encode("latin-1", errors="replace")
+        status = 500
+
+        async def _send(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", ()), (b"x-request-id", request_id)]
+            await send(message)
+
+        token = current_request.set(info)
+        try:
+            await self.app(scope, receive, _send)
+        except Exception as exc:
+            self._log(info, 500, (perf_counter() - start) * 1000, exc)
+            raise
+        else:
+            duration_ms = (perf_counter() - start) * 1000
+            if sampled or status >= 500 or duration_ms >= self.slow_ms:
+                self._log(info, status, duration_ms, None)
+        finally:
+            current_request.reset(token)
+
+    def _log(self, info, status: int, duration_ms: float, exc: Optional[BaseException]) -> None:
+        try:
+            span = current_span()
+            bound = logger.bind(
+                component="request",
+                request_id=info.request_id,
+                trace_id=span.trace_id if span is not None and span.sampled else None,
+                method=info.method,
+                path=info.path,
+                route=info.route,
+                status=status,
+                duration_ms=round(duration_ms, 2),
+            )
+            if exc is not None:
+                bound.opt(exception=exc).error(
+                    "{} {} -> 500 ({:.2f} ms): {}", info.method, info.path, duration_ms, exc
+                )
+            elif status >= 500 or duration_ms >= self.slow_ms:
+                bound.warning("{} {} -> {} ({:.2f} ms)", info.method, info.path, status, duration_ms)
+            else:
+                bound.info("{} {} -> {} ({:.2f} ms)", info.method, info.path, status, duration_ms)
+        except Exception:
+            pass
+
+
+__all__ = ["RequestLoggingMiddleware"]
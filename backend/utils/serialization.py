@@ -0,0 +1,54 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def normalize_id(document: Optional[dict]) -> Optional[dict]:
+    """Stringify a non-string `_id` in place; documents straight from Motor are ours to mutate."""
+    if document:
+        _id = document.get("_id")
+        if _id is not None and not isinstance(_id, str):
+            document["_id"] = str(_id)  # ensure CORS-safe JSON primitives
+    return document
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])  # type: ignore[valid-type]
+
+
+def model_response(model: Type[BaseModel], document: Any, status_code: int = 200) -> Response:
+    """Validate one document (or model instance) and serialize it to JSON bytes.
+
+    Returning a `Response` makes FastAPI skip its own `response_model`
+    validation and serialization, so the document is validated exactly once.
+    Keep `response_model=` on the route for the OpenAPI schema.
+    """
+    if isinstance(document, model):
+        instance = document
+    else:
+        instance = model.model_validate(normalize_id(document))
+    return Response(
+        content=instance.model_dump_json(by_alias=True),
+        status_code=status_code,
+        media_type=JSON_MEDIA_TYPE,
+    )
+
+
+def list_response(model: Type[BaseModel], documents: Iterable[dict], status_code: int = 200) -> Response:
+    """Validate a batch of documents in one pydantic-core call and serialize it to a JSON array."""
+    adapter = _list_adapter(model)
+    items = adapter.validate_python([normalize_id(doc) for doc in documents])
+    return Response(
+        content=adapter.dump_json(items, by_alias=True),
+        status_code=status_code,
+        media_type=JSON_MEDIA_TYPE,
+    )
+
+
+__all__ = ["JSON_MEDIA_TYPE", "normalize_id", "model_response", "list_response"]
@@ -0,0 +1,381 @@
+"""
+Lightweight tracing: nested spans carried in a contextvar.
+
+A trace starts at each HTTP request (`TracingMiddleware`) or agent CLI run
+(`cli_span`); DB commands, Gemini calls and SMTP sends add child spans. The
+current span lives in a contextvar, so it follows `await`s and is copied into
+`asyncio.to_thread` workers and Motor's executor threads. Incoming W3C
+`traceparent` headers (or a `TRACEPARENT` env var for CLIs) continue an
+existing trace.
+
+Sampling is decided once per trace (`TRACE_SAMPLE_RATE`); unsampled traces
+cost one contextvar lookup per instrumented call. Finished spans are batched
+by a background thread to the exporter:
+
+Environment:
+  TRACE_EXPORTER     none (default) | file | zipkin
+  TRACE_FILE         JSON-lines output for the file exporter (default traces.jsonl)
+  TRACE_ENDPOINT     collector URL for the zipkin exporter
+                     (default http://localhost:9411/api/v2/spans)
+  TRACE_SAMPLE_RATE  fraction of traces recorded (default 0.1)
+  TRACE_SERVICE      service name (default hackathon-twin)
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.request import Request, urlopen
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    kind: str = "internal"
+    start_ns: int = 0
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    sampled: bool = True
+
+    def set(self, **attributes: Any) -> None:
+        if self.sampled:
+            self.attributes.update(attributes)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def as_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_us": self.start_ns // 1000,
+            "duration_us": max(0, self.end_ns - self.start_ns) // 1000,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_NOOP_SPAN = Span(trace_id="0" * 32, span_id="0" * 16, parent_id=None, name="noop", sampled=False)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Span]:
+    """Remote parent from a W3C `traceparent` value (`00-<trace>-<span>-<flags>`)."""
+    parts = (value or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return Span(trace_id=parts[1], span_id=parts[2], parent_id=None, name="remote", sampled=sampled)
+
+
+# ---------- exporters ----------
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        ...
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileExporter(SpanExporter):
+    """Appends one JSON object per span."""
+
+    def __init__(self, path: str, service: str) -> None:
+        self.path = path
+        self.service = service
+
+    def export(self, spans: List[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as fh:
+            for span in spans:
+                fh.write(json.dumps({"service": self.service, **span.as_dict()}, default=str) + "\n")
+
+
+class ZipkinExporter(SpanExporter):
+    """POSTs Zipkin v2 JSON (accepted by Zipkin, Jaeger and the OpenTelemetry collector)."""
+
+    _KINDS = {"server": "SERVER", "client": "CLIENT"}
+
+    def __init__(self, endpoint: str, service: str, timeout: float = 5.0) -> None:
+        self.endpoint = endpoint
+        self.service = service
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]) -> None:
+        payload = []
+        for span in spans:
+            item: Dict[str, Any] = {
+                "traceId": span.trace_id,
+                "id": span.span_id,
+                "name": span.name,
+                "timestamp": span.start_ns // 1000,
+                "duration": max(1, (span.end_ns - span.start_ns) // 1000),
+                "localEndpoint": {"serviceName": self.service},
+                "tags": {k: str(v) for k, v in span.attributes.items()},
+            }
+            if span.parent_id:
+                item["parentId"] = span.parent_id
+            if span.kind in self._KINDS:
+                item["kind"] = self._KINDS[span.kind]
+            if span.error:
+                item["tags"]["error"] = span.error
+            payload.append(item)
+        body = json.dumps(payload, default=str).encode("utf-8")
+        req = Request(self.endpoint, data=body, headers={"Content-Type": "application/json"}, method="POST")
+        with urlopen(req, timeout=self.timeout) as resp:
+            resp.read()
+
+
+class _BatchProcessor:
+    """Bounded buffer flushed by a daemon thread; spans are dropped when it is full."""
+
+    def __init__(self, exporter: SpanExporter, max_queue: int = 2048, batch_size: int = 256, interval: float = 2.0):
+        self.exporter = exporter
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._buffer: List[Span] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        with self._cond:
+            if len(self._buffer) >= self.max_queue:
+                self.dropped += 1
+                return
+            self._buffer.append(span)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._buffer) < self.batch_size:
+                    self._cond.wait(self.interval)
+                batch, self._buffer = self._buffer, []
+                closed = self._closed
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception:
+                    self.dropped += len(batch)
+            if closed:
+                return
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        self.exporter.shutdown()
+
+
+# ---------- tracer ----------
+class Tracer:
+    def __init__(self, exporter: Optional[SpanExporter] = None, sample_rate: float = 0.1) -> None:
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self._processor = _BatchProcessor(exporter) if exporter is not None else None
+
+    @property
+    def enabled(self) -> bool:
+        return self._processor is not None
+
+    def _child(self, name: str, kind: str, parent: Optional[Span], attributes: Dict[str, Any]) -> Span:
+        if parent is None:
+            sampled = self.enabled and (self.sample_rate >= 1.0 or random.random() < self.sample_rate)
+            trace_id = _new_id(128)
+        else:
+            sampled = parent.sampled and self.enabled
+            trace_id = parent.trace_id
+        return Span(
+            trace_id=trace_id,
+            span_id=_new_id(64),
+            parent_id=parent.span_id if parent else None,
+            name=name,
+            kind=kind,
+            start_ns=time.time_ns(),
+            attributes=attributes if sampled else {},
+            sampled=sampled,
+        )
+
+    @contextmanager
+    def span(
+        self, name: str, kind: str = "internal", parent: Optional[Span] = None, **attributes: Any
+    ) -> Iterator[Span]:
+        """Start a child of the current span (or of `parent`) and make it current."""
+        parent = parent or _current_span.get()
+        if self._processor is None:
+            yield _NOOP_SPAN
+            return
+        if parent is not None and not parent.sampled:
+            # Unsampled trace: children share the parent's (non-recording) span
+            yield parent
+            return
+        span = self._child(name, kind, parent, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end(span)
+
+    def end(self, span: Span, end_ns: Optional[int] = None) -> None:
+        span.end_ns = end_ns or time.time_ns()
+        if span.sampled and self._processor is not None:
+            self._processor.on_end(span)
+
+    def record(
+        self, name: str, parent: Optional[Span], start_ns: int, end_ns: int, kind: str = "client", **attributes: Any
+    ) -> None:
+        """Record an already-finished child span (e.g. from a pymongo listener)."""
+        if parent is None or not parent.sampled or self._processor is None:
+            return
+        span = self._child(name, kind, parent, attributes)
+        span.start_ns = start_ns
+        self.end(span, end_ns)
+
+    def shutdown(self) -> None:
+        if self._processor is not None:
+            self._processor.shutdown()
+
+
+def tracer_from_env() -> Tracer:
+    kind = os.getenv("TRACE_EXPORTER", "none").lower()
+    service = os.getenv("TRACE_SERVICE", "hackathon-twin")
+    sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+    exporter: Optional[SpanExporter] = None
+    if kind == "file":
+        exporter = FileExporter(os.getenv("TRACE_FILE", "traces.jsonl"), service)
+    elif kind == "zipkin":
+        exporter = ZipkinExporter(os.getenv("TRACE_ENDPOINT", "http://localhost:9411/api/v2/spans"), service)
+    return Tracer(exporter, sample_rate)
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer configured from the environment; flushed at exit."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = tracer_from_env()
+                atexit.register(_tracer.shutdown)
+    return _tracer
+
+
+def _reset_after_fork() -> None:
+    # The exporter thread does not survive fork(); the child starts its own tracer on first use
+    global _tracer
+    _tracer = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def span(name: str, kind: str = "internal", **attributes: Any):
+    return get_tracer().span(name, kind, **attributes)
+
+
+@contextmanager
+def cli_span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Root span for an agent CLI run, continuing `TRACEPARENT` when a caller set it."""
+    tracer = get_tracer()
+    with tracer.span(name, parent=parse_traceparent(os.getenv("TRACEPARENT")), **attributes) as root:
+        yield root
+
+
+# ---------- ASGI ----------
+class TracingMiddleware:
+    """Pure ASGI middleware: one server span per HTTP request, named by route template."""
+
+    def __init__(self, app, tracer: Optional[Tracer] = None) -> None:
+        self.app = app
+        self.tracer = tracer or get_tracer()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        parent = None
+        for name, value in scope.get("headers") or []:
+            if name == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        status = {"code": 500}
+
+        async def _send(message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        method = scope.get("method", "")
+        with self.tracer.span(f"{method} {scope.get('path', '')}", kind="server", parent=parent) as root:
+            try:
+                await self.app(scope, receive, _send)
+            finally:
+                if root.sampled:
+                    route = scope.get("route")
+                    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+                    if isinstance(template, str):
+                        root.name = f"{method} {template}"
+                    root.set(
+                        **{"http.method": method, "http.path": scope.get("path", ""), "http.status": status["code"]}
+                    )
+                    if status["code"] >= 500 and root.error is None:
+                        root.error = f"HTTP {status['code']}"
+
+
+__all__ = [
+    "Span",
+    "Tracer",
+    "SpanExporter",
+    "FileExporter",
+    "ZipkinExporter",
+    "TracingMiddleware",
+    "current_span",
+    "parse_traceparent",
+    "get_tracer",
+    "span",
+    "cli_span",
+]
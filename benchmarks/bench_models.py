@@ -0,0 +1,239 @@
+"""
+Micro-benchmarks for the read path: model validation, serialization and `_id` normalization.
+
+For each `*Read` model at realistic document sizes (hackathon plans at several
+sizes) it reports microseconds per document for:
+
+- validate: `model_validate(dict)`, `model_validate_json(bytes)`, and
+  `model_construct` (no validation, the lower bound)
+- serialize: `model_dump()`, `model_dump(mode="json")`, `model_dump_json(by_alias=True)`
+- alternatives: the same schema without `str_strip_whitespace`, with `EmailStr`
+  as a plain `str` (profiles), and as a `TypedDict` through a `TypeAdapter`
+  (validated plain dicts, no model instances)
+- normalization: the old copying `_normalize_id` vs the in-place
+  `backend.utils.serialization.normalize_id`, for ObjectId and string ids
+
+Prints one JSON document; keep it as the baseline for read-path changes:
+
+CLI:
+  python -m benchmarks.bench_models
+  python -m benchmarks.bench_models --number 2000 --repeat 7 --history benchmarks/bench_models.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import sys
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Type, Union, get_args, get_origin
+
+from bson import ObjectId
+from pydantic import BaseModel, ConfigDict, EmailStr, TypeAdapter, create_model
+from typing_extensions import TypedDict
+
+from backend.models import ChallengeRead, HackathonRead, TeamRead, UserProfileRead
+from backend.utils.serialization import normalize_id
+from benchmarks.bench_serialization import hackathon_doc, profile_doc
+from benchmarks.import_time import _git_sha
+
+# Hackathon plan sizes: workshops, agenda items, problem statements
+PLAN_SIZES = {"empty": (0, 0, 0), "realistic": (6, 10, 5), "large": (20, 40, 15)}
+
+
+# ---------- documents ----------
+def challenge_doc(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "title": f" Challenge {i} ",
+        "description": "Ship something useful for local communities in 48 hours. " * 2,
+        "difficulty": "medium",
+        "participants": [str(ObjectId()) for _ in range(8)],
+    }
+
+
+def team_doc(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "name": f" Team {i} ",
+        "members": [str(ObjectId()) for _ in range(4)],
+        "skills_needed": ["Python", "React", "Design"],
+        "challenge_id": str(ObjectId()),
+    }
+
+
+def hackathon_doc_sized(i: int, size: str = "realistic") -> dict:
+    """`bench_serialization.hackathon_doc` with its plan lists resized to `PLAN_SIZES[size]`."""
+    doc = hackathon_doc(i)
+    for key, n in zip(("workshops", "agenda", "problem_statements"), PLAN_SIZES[size]):
+        items = doc["plan"][key]
+        doc["plan"][key] = [dict(items[j % len(items)], title=f"{items[0]['title']} {j}") for j in range(n)]
+    return doc
+
+
+# ---------- alternative schemas ----------
+def _rebuild(model: Type[BaseModel], suffix: str, config: dict, replace: Dict[Any, Any], cache: dict) -> Type[BaseModel]:
+    """Copy of `model` (and nested models) with `config` merged in and annotations swapped via `replace`."""
+    if model in cache:
+        return cache[model]
+
+    def swap(annotation: Any) -> Any:
+        if annotation in replace:
+            return replace[annotation]
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return _rebuild(annotation, suffix, config, replace, cache)
+        origin, args = get_origin(annotation), get_args(annotation)
+        if origin is Union:
+            return Union[tuple(swap(a) for a in args)]
+        if origin in (list, List):
+            return List[swap(args[0])]
+        return annotation
+
+    fields = {}
+    for name, info in model.model_fields.items():
+        fields[name] = (swap(info.annotation), copy.copy(info))
+    rebuilt = create_model(
+        f"{model.__name__}{suffix}", __config__=ConfigDict(**{**model.model_config, **config}), **fields
+    )
+    cache[model] = rebuilt
+    return rebuilt
+
+
+def without_strip(model: Type[BaseModel]) -> Type[BaseModel]:
+    return _rebuild(model, "NoStrip", {"str_strip_whitespace": False}, {}, {})
+
+
+def plain_email(model: Type[BaseModel]) -> Type[BaseModel]:
+    return _rebuild(model, "PlainEmail", {}, {EmailStr: str}, {})
+
+
+def as_typed_dict(model: Type[BaseModel], cache: Optional[dict] = None) -> Any:
+    """TypedDict with the model's fields (by alias); optional fields are not required."""
+    cache = {} if cache is None else cache
+    if model in cache:
+        return cache[model]
+
+    def swap(annotation: Any) -> Any:
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return as_typed_dict(annotation, cache)
+        origin, args = get_origin(annotation), get_args(annotation)
+        if origin is Union:
+            return Union[tuple(swap(a) for a in args)]
+        if origin in (list, List):
+            return List[swap(args[0])]
+        return annotation
+
+    fields = {(info.alias or name): swap(info.annotation) for name, info in model.model_fields.items()}
+    typed = TypedDict(f"{model.__name__}Dict", fields, total=False)  # type: ignore[operator]
+    cache[model] = typed
+    return typed
+
+
+# ---------- timing ----------
+def _legacy_normalize(document: dict) -> dict:
+    doc = dict(document)
+    if "_id" in doc and not isinstance(doc["_id"], str):
+        doc["_id"] = str(doc["_id"])
+    return doc
+
+
+def _best_us(fn: Callable[[], Any], number: int, repeat: int) -> float:
+    fn()  # warm-up (schema caches, first-call costs)
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (perf_counter() - start) / number)
+    return round(best * 1e6, 3)
+
+
+def bench_model(model: Type[BaseModel], doc: dict, number: int, repeat: int) -> Dict[str, Any]:
+    doc = normalize_id(dict(doc))
+    raw = json.dumps(doc).encode()
+    instance = model.model_validate(doc)
+    t = lambda fn: _best_us(fn, number, repeat)  # noqa: E731
+
+    result: Dict[str, Any] = {
+        "json_bytes": len(raw),
+        "validate": {
+            "model_validate": t(lambda: model.model_validate(doc)),
+            "model_validate_json": t(lambda: model.model_validate_json(raw)),
+            "model_construct": t(lambda: model.model_construct(**doc)),
+        },
+        "serialize": {
+            "model_dump": t(lambda: instance.model_dump()),
+            "model_dump_mode_json": t(lambda: instance.model_dump(mode="json", by_alias=True)),
+            "model_dump_json": t(lambda: instance.model_dump_json(by_alias=True)),
+        },
+    }
+    alternatives = {"no_strip_whitespace": without_strip(model)}
+    if model is UserProfileRead:
+        alternatives["email_as_str"] = plain_email(model)
+    result["alternatives"] = {}
+    for label, alt in alternatives.items():
+        alt_instance = alt.model_validate(doc)
+        result["alternatives"][label] = {
+            "validate": t(lambda: alt.model_validate(doc)),
+            "dump_json": t(lambda: alt_instance.model_dump_json(by_alias=True)),
+        }
+    adapter = TypeAdapter(as_typed_dict(model))
+    validated = adapter.validate_python(doc)
+    result["alternatives"]["typed_dict"] = {
+        "validate": t(lambda: adapter.validate_python(doc)),
+        "dump_json": t(lambda: adapter.dump_json(validated)),
+    }
+    return result
+
+
+def bench_normalize(doc: dict, number: int, repeat: int) -> Dict[str, float]:
+    with_oid = dict(doc, _id=ObjectId())
+    with_str = dict(doc, _id=str(ObjectId()))
+    fresh = [dict(with_oid) for _ in range(number * (repeat + 1))]
+    pool = iter(fresh)
+    return {
+        "copy_objectid": _best_us(lambda: _legacy_normalize(with_oid), number, repeat),
+        "copy_str": _best_us(lambda: _legacy_normalize(with_str), number, repeat),
+        # each call gets its own document, as with documents straight from a cursor
+        "in_place_objectid": _best_us(lambda: normalize_id(next(pool)), number, repeat),
+        "in_place_str": _best_us(lambda: normalize_id(with_str), number, repeat),
+    }
+
+
+def run(number: int, repeat: int) -> dict:
+    models: Dict[str, Any] = {
+        "UserProfileRead": bench_model(UserProfileRead, profile_doc(1), number, repeat),
+        "ChallengeRead": bench_model(ChallengeRead, challenge_doc(1), number, repeat),
+        "TeamRead": bench_model(TeamRead, team_doc(1), number, repeat),
+    }
+    for size in PLAN_SIZES:
+        models[f"HackathonRead[{size}]"] = bench_model(HackathonRead, hackathon_doc_sized(1, size), number, repeat)
+    return {
+        "unit": "us per document",
+        "number": number,
+        "repeat": repeat,
+        "models": models,
+        "normalize_id": bench_normalize(hackathon_doc(1), number, repeat),
+        "python": sys.version.split()[0],
+        "git_sha": _git_sha(),
+        "measured_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Model validation and normalization micro-benchmarks")
+    parser.add_argument("--number", type=int, default=1000, help="Calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs (the best is reported)")
+    parser.add_argument("--history", help="Append the report as one JSON line to this file")
+    args = parser.parse_args()
+    report = run(max(1, args.number), max(1, args.repeat))
+    print(json.dumps(report, indent=2))
+    if args.history:
+        with open(args.history, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(report) + "\n")
+
+
+if __name__ == "__main__":
+    main()
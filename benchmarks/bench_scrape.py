@@ -0,0 +1,153 @@
+"""
+Scraping throughput benchmark (pages/sec), fully offline.
+
+Serves the HTML fixtures in `benchmarks/fixtures/` from a local keep-alive
+HTTP server and measures each stage of the recruitment scraper:
+
+- parse: `html.parser` vs `lxml` (when installed) on the search results page
+- fetch: a new urllib connection per page vs the pooled `agents.http_fetch`
+- end-to-end: pooled fetch + parse + profile extraction, plus the JavaScript
+  gate probe on an app-shell page (the HTTP cost paid before escalating)
+- browser: pooled headless Chrome, only with `--browser` and Selenium available;
+  also the full escalation path (app shell over HTTP -> gated -> browser render
+  -> extraction)
+
+Prints one JSON document.
+
+CLI:
+  python -m benchmarks.bench_scrape --pages 200
+  python -m benchmarks.bench_scrape --pages 50 --browser
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+from typing import Callable, Dict, Optional
+from urllib.request import urlopen
+
+from agents.http_fetch import PARSER, HTTPConnectionPool, looks_js_gated, make_soup
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SEARCH_PAGE = "search_results.html"
+JS_SHELL_PAGE = "js_shell.html"
+
+
+class _FixtureHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, directory=FIXTURES, **kwargs)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def _serve() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _rate(fn: Callable[[], object], pages: int) -> Dict[str, float]:
+    fn()  # warm-up
+    start = perf_counter()
+    for _ in range(pages):
+        fn()
+    elapsed = perf_counter() - start
+    return {"pages": pages, "seconds": round(elapsed, 4), "pages_per_sec": round(pages / elapsed, 1)}
+
+
+def _parsers() -> list[str]:
+    parsers = ["html.parser"]
+    if PARSER == "lxml":
+        parsers.append("lxml")
+    return parsers
+
+
+def run(pages: int, browser: bool = False) -> dict:
+    from agents.recruitment_agent import _extract_profiles_from_soup
+
+    with open(os.path.join(FIXTURES, SEARCH_PAGE), "r", encoding="utf-8") as fh:
+        html = fh.read()
+    results: dict = {"pages": pages, "default_parser": PARSER, "parse": {}, "fetch": {}, "end_to_end": {}}
+
+    for parser in _parsers():
+        results["parse"][parser] = _rate(lambda: make_soup(html, parser), pages)
+
+    server = _serve()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    url = f"{base}/{SEARCH_PAGE}"
+    shell_url = f"{base}/{JS_SHELL_PAGE}"
+    pool = HTTPConnectionPool(max_per_host=1)
+    try:
+        results["fetch"]["urllib"] = _rate(lambda: urlopen(url, timeout=10).read(), pages)
+        results["fetch"]["pooled"] = _rate(lambda: pool.request("GET", url).body, pages)
+        results["fetch"]["pooled"]["connections"] = pool.stats["connections"]
+        for parser in _parsers():
+            results["end_to_end"][f"pooled+{parser}"] = _rate(
+                lambda: _extract_profiles_from_soup(
+                    make_soup(pool.request("GET", url).text, parser), "https://duckduckgo.com/", 50
+                ),
+                pages,
+            )
+
+        def probe(page_url: str) -> bool:
+            return looks_js_gated(make_soup(pool.request("GET", page_url).text))
+
+        if probe(url) or not probe(shell_url):
+            raise RuntimeError("looks_js_gated misclassifies the benchmark fixtures")
+        results["end_to_end"]["js_gate_probe"] = _rate(lambda: probe(shell_url), pages)
+        if browser:
+            results["browser"] = _bench_browser(pool, url, shell_url, pages)
+    finally:
+        pool.close()
+        server.shutdown()
+    return results
+
+
+def _bench_browser(pool: HTTPConnectionPool, url: str, shell_url: str, pages: int) -> Optional[dict]:
+    from agents.browser_pool import SELENIUM_AVAILABLE, BrowserPool
+    from agents.recruitment_agent import _extract_profiles_from_soup
+
+    if not SELENIUM_AVAILABLE:
+        return None
+    browser_pool = BrowserPool(max_size=1)
+    try:
+
+        def render(page_url: str) -> str:
+            with browser_pool.driver() as driver:
+                driver.get(page_url)
+                return driver.page_source
+
+        def escalate() -> object:
+            # Mirrors fetch_page(): the app shell is gated, so the results are rendered
+            soup = make_soup(pool.request("GET", shell_url).text)
+            if looks_js_gated(soup):
+                soup = make_soup(render(url))
+            return _extract_profiles_from_soup(soup, "https://duckduckgo.com/", 50)
+
+        results = _rate(lambda: render(url), pages)
+        results["escalation"] = _rate(escalate, pages)
+        return results
+    except Exception as exc:
+        return {"error": str(exc)}
+    finally:
+        browser_pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scraping throughput benchmark")
+    parser.add_argument("--pages", type=int, default=200, help="Pages per measurement")
+    parser.add_argument("--browser", action="store_true", help="Also measure the pooled headless browser")
+    args = parser.parse_args()
+    print(json.dumps(run(args.pages, browser=args.browser), indent=2))
+
+
+if __name__ == "__main__":
+    main()
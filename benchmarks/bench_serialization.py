@@ -0,0 +1,166 @@
+"""
+Response serialization benchmark: legacy double-validation path vs the fast path.
+
+For the list endpoints of profiles and hackathons (with a full nested `plan`)
+it measures, per document:
+
+- legacy: `dict(doc)` copy + `model_validate` in the handler, then FastAPI's
+  `response_model` validation and JSON serialization (`serialize_response`
+  with the field FastAPI builds for `response_model=List[...]`)
+- fast: `backend.utils.serialization.list_response` (in-place id
+  normalization, one `TypeAdapter` validation, `dump_json` straight to bytes)
+
+Both paths must produce identical JSON bodies; the benchmark checks that first.
+Prints one JSON document.
+
+CLI:
+  python -m benchmarks.bench_serialization --items 100 --rounds 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from time import perf_counter
+from typing import Callable, Dict, List, Type
+
+from bson import ObjectId
+from fastapi.routing import APIRoute, serialize_response
+from pydantic import BaseModel
+
+from backend.models import HackathonRead, UserProfileRead
+from backend.utils.serialization import list_response
+
+
+def profile_doc(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "name": f"  Candidate {i}  ",
+        "email": f"candidate{i}@example.com",
+        "skills": ["Python", "Machine Learning", "FastAPI", "Docker", "React"][: 1 + i % 5],
+        "location": "Berlin, Germany",
+        "linkedin_url": f"https://github.com/candidate{i}",
+        "status": "new",
+        "identity_hash": f"{i:040x}",
+        "github": {"login": f"candidate{i}", "followers": i, "public_repos": 12},
+    }
+
+
+def hackathon_doc(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "topic": f" AI for Climate #{i} ",
+        "description": "Build tools that help cities adapt to extreme weather. " * 3,
+        "target_audience": "Students and early-career engineers",
+        "location": "Remote",
+        "start_date": "2026-03-01",
+        "end_date": "2026-03-03",
+        "status": "planned",
+        "plan": {
+            "target_audience": "Students and early-career engineers",
+            "location": "Remote",
+            "dates": "2026-03-01 - 2026-03-03",
+            "workshops": [
+                {"title": f"Workshop {w}", "description": "Hands-on session with mentors. " * 2} for w in range(6)
+            ],
+            "agenda": [
+                {"time": f"{9 + a}:00", "title": f"Session {a}", "description": "Talks and demos."}
+                for a in range(10)
+            ],
+            "problem_statements": [
+                {
+                    "title": f"Problem {p}",
+                    "description": "Forecast flood risk from open sensor data. " * 4,
+                    "difficulty": ("easy", "medium", "hard")[p % 3],
+                    "skills_required": ["Python", "Data Science", "GIS"],
+                }
+                for p in range(5)
+            ],
+        },
+    }
+
+
+def _response_field(model: Type[BaseModel]):
+    """The field FastAPI builds for `response_model=List[model]` on a route."""
+
+    async def endpoint() -> None:
+        return None
+
+    return APIRoute("/", endpoint, response_model=List[model]).response_field  # type: ignore[valid-type]
+
+
+def _legacy_normalize(document: dict) -> dict:
+    doc = dict(document)
+    if "_id" in doc and not isinstance(doc["_id"], str):
+        doc["_id"] = str(doc["_id"])
+    return doc
+
+
+def _complete(coro):
+    """Drive a coroutine that never suspends (no event loop overhead in the timings)."""
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    coro.close()
+    raise RuntimeError("coroutine suspended")
+
+
+def _legacy(model: Type[BaseModel], field) -> Callable[[List[dict]], bytes]:
+    def run(docs: List[dict]) -> bytes:
+        results = [model.model_validate(_legacy_normalize(doc)) for doc in docs]
+        return _complete(serialize_response(field=field, response_content=results, dump_json=True))
+
+    return run
+
+
+def _fast(model: Type[BaseModel]) -> Callable[[List[dict]], bytes]:
+    def run(docs: List[dict]) -> bytes:
+        return list_response(model, docs).body
+
+    return run
+
+
+def _time(fn: Callable[[List[dict]], bytes], batches: List[List[dict]], items: int) -> Dict[str, float]:
+    start = perf_counter()
+    for batch in batches:
+        fn(batch)
+    elapsed = perf_counter() - start
+    return {
+        "seconds": round(elapsed, 4),
+        "us_per_item": round(elapsed / (len(batches) * items) * 1e6, 2),
+    }
+
+
+def bench(name: str, model: Type[BaseModel], make: Callable[[int], dict], items: int, rounds: int) -> dict:
+    docs = [make(i) for i in range(items)]
+    paths = {"legacy": _legacy(model, _response_field(model)), "fast": _fast(model)}
+    bodies = {label: fn([dict(d) for d in docs]) for label, fn in paths.items()}
+    if json.loads(bodies["legacy"]) != json.loads(bodies["fast"]):
+        raise AssertionError(f"{name}: legacy and fast responses differ")
+    result: Dict[str, object] = {"items": items, "rounds": rounds, "body_bytes": len(bodies["fast"])}
+    for label, fn in paths.items():
+        # Fresh shallow copies per round: the fast path normalizes ids in place
+        batches = [[dict(d) for d in docs] for _ in range(rounds)]
+        result[label] = _time(fn, batches, items)
+    result["speedup"] = round(result["legacy"]["us_per_item"] / result["fast"]["us_per_item"], 2)
+    return result
+
+
+def run(items: int, rounds: int) -> dict:
+    return {
+        "profiles": bench("profiles", UserProfileRead, profile_doc, items, rounds),
+        "hackathons": bench("hackathons", HackathonRead, hackathon_doc, items, rounds),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Response serialization benchmark")
+    parser.add_argument("--items", type=int, default=100, help="Documents per response")
+    parser.add_argument("--rounds", type=int, default=200, help="Responses serialized per path")
+    args = parser.parse_args()
+    print(json.dumps(run(max(1, args.items), max(1, args.rounds)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
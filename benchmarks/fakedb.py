@@ -0,0 +1,1338 @@
+import functools
+import math
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from bson import ObjectId, decode, encode
+from bson.codec_options import CodecOptions
+from bson.int64 import Int64
+from bson.regex import Regex
+from bson.timestamp import Timestamp
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, InvalidOperation, OperationFailure, WriteError
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+
+MEMORY_SCHEME = "memory://"
+DEFAULT_DB_NAME = "test"
+ID_INDEX = "_id_"
+
+_MISSING = object()
+_clients: Dict[str, "FakeMongoClient"] = {}
+_clients_lock = threading.Lock()
+
+
+# ---------- values ----------
+def _bson(value: Any, codec_options: CodecOptions) -> Any:
+    """`value` as it comes back from the server (naive UTC datetimes at ms precision, lists for tuples)."""
+    return decode(encode({"v": value}), codec_options)["v"]
+
+
+def _rank(value: Any) -> int:
+    """BSON comparison order of the value's type."""
+    if value is None or value is _MISSING:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float, Int64)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, Mapping):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, bytes):
+        return 6
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    if isinstance(value, Timestamp):
+        return 10
+    if isinstance(value, (Regex, re.Pattern)):
+        return 11
+    return 12
+
+
+def _compare(a: Any, b: Any) -> int:
+    ra, rb = _rank(a), _rank(b)
+    if ra != rb:
+        return -1 if ra < rb else 1
+    if ra == 4:
+        for (ka, va), (kb, vb) in zip(a.items(), b.items()):
+            order = _compare(ka, kb) or _compare(va, vb)
+            if order:
+                return order
+        return _compare(len(a), len(b))
+    if ra == 5:
+        for va, vb in zip(a, b):
+            order = _compare(va, vb)
+            if order:
+                return order
+        return _compare(len(a), len(b))
+    if ra in (1, 11, 12):
+        return 0
+    return -1 if a < b else (1 if a > b else 0)
+
+
+def _equal(a: Any, b: Any) -> bool:
+    return _compare(a, b) == 0
+
+
+def _freeze(value: Any) -> Any:
+    """Hashable form of a BSON value (for `_id` and unique index keys)."""
+    if isinstance(value, Mapping):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return ("__list__",) + tuple(_freeze(v) for v in value)
+    if isinstance(value, bool):
+        return ("__bool__", value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _lookup(value: Any, parts: List[str]) -> List[Any]:
+    """Values at a dotted path, descending into array elements like the server does."""
+    if not parts:
+        return [value]
+    head, rest = parts[0], parts[1:]
+    if isinstance(value, Mapping):
+        return _lookup(value[head], rest) if head in value else []
+    if isinstance(value, list):
+        if head.isdigit() and int(head) < len(value):
+            return _lookup(value[int(head)], rest)
+        found: List[Any] = []
+        for item in value:
+            if isinstance(item, Mapping):
+                found.extend(_lookup(item, parts))
+        return found
+    return []
+
+
+def _get(doc: Mapping, path: str) -> Any:
+    """The value at `path` (the list of values when the path crosses an array), or `_MISSING`."""
+    values = _lookup(doc, path.split("."))
+    if not values:
+        return _MISSING
+    return values if _crosses_array(doc, path) else values[0]
+
+
+def _crosses_array(doc: Mapping, path: str) -> bool:
+    value: Any = doc
+    for part in path.split(".")[:-1]:
+        if isinstance(value, list):
+            return True
+        value = value.get(part) if isinstance(value, Mapping) else None
+    return isinstance(value, list)
+
+
+# ---------- query matching ----------
+_REGEX_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}
+
+
+@functools.lru_cache(maxsize=512)
+def _compile(pattern: str, options: str = "") -> "re.Pattern[str]":
+    flags = 0
+    for option in options:
+        flags |= _REGEX_FLAGS.get(option, 0)
+    return re.compile(pattern, flags)
+
+
+def _as_regex(value: Any) -> Optional["re.Pattern[str]"]:
+    if isinstance(value, re.Pattern):
+        return value
+    if isinstance(value, Regex):
+        return re.compile(value.pattern, value.flags)
+    return None
+
+
+def _candidates(values: List[Any]) -> Iterable[Any]:
+    for value in values:
+        yield value
+        if isinstance(value, list):
+            yield from value
+
+
+def _eq(values: List[Any], target: Any) -> bool:
+    if target is None and not values:
+        return True
+    regex = _as_regex(target)
+    if regex is not None:
+        return any(isinstance(v, str) and regex.search(v) for v in _candidates(values))
+    return any(_equal(v, target) for v in _candidates(values))
+
+
+def _ordered(values: List[Any], target: Any, accept: Callable[[int], bool]) -> bool:
+    rank = _rank(target)
+    return any(_rank(v) == rank and accept(_compare(v, target)) for v in _candidates(values))
+
+
+_TYPE_ALIASES = {
+    "double": (float,),
+    "string": (str,),
+    "object": (Mapping,),
+    "array": (list,),
+    "binData": (bytes,),
+    "objectId": (ObjectId,),
+    "bool": (bool,),
+    "date": (datetime,),
+    "null": (type(None),),
+    "regex": (Regex, re.Pattern),
+    "int": (int,),
+    "long": (Int64,),
+    "timestamp": (Timestamp,),
+    "number": (int, float, Int64),
+}
+_TYPE_NUMBERS = {1: "double", 2: "string", 3: "object", 4: "array", 5: "binData", 7: "objectId", 8: "bool",
+                 9: "date", 10: "null", 11: "regex", 16: "int", 17: "timestamp", 18: "long"}
+
+
+def _is_type(value: Any, alias: Union[str, int]) -> bool:
+    name = _TYPE_NUMBERS.get(alias, alias) if isinstance(alias, int) else alias
+    types = _TYPE_ALIASES.get(name)
+    if types is None:
+        raise OperationFailure(f"Unknown type name alias: {alias}", code=2)
+    if isinstance(value, bool) and bool not in types:
+        return False
+    return isinstance(value, types)
+
+
+def _is_operator_doc(value: Any) -> bool:
+    return isinstance(value, Mapping) and bool(value) and all(str(k).startswith("$") for k in value)
+
+
+def _match_field(values: List[Any], condition: Any) -> bool:
+    if not _is_operator_doc(condition):
+        return _eq(values, condition)
+    for op, arg in condition.items():
+        if op == "$options":
+            continue
+        if op == "$eq":
+            ok = _eq(values, arg)
+        elif op == "$ne":
+            ok = not _eq(values, arg)
+        elif op == "$gt":
+            ok = _ordered(values, arg, lambda c: c > 0)
+        elif op == "$gte":
+            ok = _ordered(values, arg, lambda c: c >= 0)
+        elif op == "$lt":
+            ok = _ordered(values, arg, lambda c: c < 0)
+        elif op == "$lte":
+            ok = _ordered(values, arg, lambda c: c <= 0)
+        elif op == "$in":
+            ok = any(_eq(values, item) for item in arg)
+        elif op == "$nin":
+            ok = not any(_eq(values, item) for item in arg)
+        elif op == "$exists":
+            ok = bool(values) == bool(arg)
+        elif op == "$type":
+            aliases = arg if isinstance(arg, list) else [arg]
+            ok = any(_is_type(v, a) for v in _candidates(values) for a in aliases)
+        elif op == "$regex":
+            regex = _as_regex(arg) or _compile(arg, condition.get("$options", ""))
+            ok = _eq(values, regex)
+        elif op == "$size":
+            ok = any(isinstance(v, list) and len(v) == arg for v in values)
+        elif op == "$all":
+            ok = bool(arg) and all(_eq(values, item) for item in arg)
+        elif op == "$elemMatch":
+            ok = any(
+                isinstance(v, list) and any(_match_element(item, arg) for item in v) for v in values
+            )
+        elif op == "$not":
+            ok = not _match_field(values, arg if _is_operator_doc(arg) else {"$regex": arg})
+        else:
+            raise OperationFailure(f"unknown operator: {op}", code=2)
+        if not ok:
+            return False
+    return True
+
+
+def _match_element(item: Any, condition: Mapping) -> bool:
+    if _is_operator_doc(condition):
+        return _match_field([item], condition)
+    return isinstance(item, Mapping) and match(item, condition)
+
+
+def match(doc: Mapping, query: Optional[Mapping]) -> bool:
+    """Whether `doc` matches the MongoDB `query` (the subset of the query language in `FakeCollection`)."""
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            ok = any(match(doc, q) for q in condition)
+        elif key == "$and":
+            ok = all(match(doc, q) for q in condition)
+        elif key == "$nor":
+            ok = not any(match(doc, q) for q in condition)
+        elif key == "$comment":
+            ok = True
+        elif key.startswith("$"):
+            raise OperationFailure(f"{key} is not supported by the in-memory database", code=2)
+        else:
+            ok = _match_field(_lookup(doc, key.split(".")), condition)
+        if not ok:
+            return False
+    return True
+
+
+# ---------- updates ----------
+def _parent(doc: dict, path: str, create: bool) -> Tuple[Any, str]:
+    parts = path.split(".")
+    node: Any = doc
+    for part in parts[:-1]:
+        if isinstance(node, list) and part.isdigit():
+            index = int(part)
+            if index >= len(node):
+                if not create:
+                    return None, parts[-1]
+                node.extend([None] * (index + 1 - len(node)))
+            if node[index] is None and create:
+                node[index] = {}
+            node = node[index]
+        elif isinstance(node, dict):
+            if part not in node:
+                if not create:
+                    return None, parts[-1]
+                node[part] = {}
+            node = node[part]
+        else:
+            if not create:
+                return None, parts[-1]
+            raise WriteError(f"Cannot create field '{part}' in element {{{path}: ...}}", code=28)
+    return node, parts[-1]
+
+
+def _read(doc: dict, path: str) -> Any:
+    node, key = _parent(doc, path, create=False)
+    if isinstance(node, dict):
+        return node.get(key, _MISSING)
+    if isinstance(node, list) and key.isdigit() and int(key) < len(node):
+        return node[int(key)]
+    return _MISSING
+
+
+def _write(doc: dict, path: str, value: Any) -> None:
+    node, key = _parent(doc, path, create=True)
+    if isinstance(node, list) and key.isdigit():
+        index = int(key)
+        node.extend([None] * (index + 1 - len(node)))
+        node[index] = value
+    elif isinstance(node, dict):
+        node[key] = value
+    else:
+        raise WriteError(f"Cannot create field '{key}' in element {{{path}: ...}}", code=28)
+
+
+def _remove(doc: dict, path: str) -> None:
+    node, key = _parent(doc, path, create=False)
+    if isinstance(node, dict):
+        node.pop(key, None)
+    elif isinstance(node, list) and key.isdigit() and int(key) < len(node):
+        node[int(key)] = None
+
+
+def _array_at(doc: dict, path: str, op: str) -> list:
+    current = _read(doc, path)
+    if current is _MISSING:
+        current = []
+        _write(doc, path, current)
+    if not isinstance(current, list):
+        raise WriteError(f"The field '{path}' must be an array to apply {op}", code=2)
+    return current
+
+
+def _pull_matches(item: Any, condition: Any) -> bool:
+    if _is_operator_doc(condition):
+        return _match_field([item], condition)
+    if isinstance(condition, Mapping) and isinstance(item, Mapping):
+        return match(item, condition)
+    return _equal(item, condition)
+
+
+def apply_update(doc: dict, update: Mapping, inserting: bool = False) -> dict:
+    """Apply an update document (operators or a replacement) to `doc` in place and return it."""
+    if not any(str(k).startswith("$") for k in update):
+        _id = doc.get("_id", _MISSING)
+        doc.clear()
+        doc.update(update)
+        if _id is not _MISSING:
+            if "_id" in update and not _equal(update["_id"], _id):
+                raise WriteError("The _id field cannot be changed", code=66)
+            doc["_id"] = _id
+        return doc
+    for op, fields in update.items():
+        for path, value in fields.items():
+            if path == "_id" or path.startswith("_id."):
+                if op == "$setOnInsert" and not inserting:
+                    # Ignored on a matched upsert, like every other $setOnInsert field
+                    continue
+                if op == "$setOnInsert" or op == "$set" and _equal(value, doc.get("_id")):
+                    doc["_id"] = value
+                    continue
+                raise WriteError(
+                    "Performing an update on the path '_id' would modify the immutable field '_id'", code=66
+                )
+            if op == "$set":
+                _write(doc, path, value)
+            elif op == "$setOnInsert":
+                if inserting:
+                    _write(doc, path, value)
+            elif op == "$unset":
+                _remove(doc, path)
+            elif op == "$inc":
+                current = _read(doc, path)
+                _write(doc, path, value if current is _MISSING else current + value)
+            elif op in ("$min", "$max"):
+                current = _read(doc, path)
+                better = _compare(value, current) < 0 if op == "$min" else _compare(value, current) > 0
+                if current is _MISSING or better:
+                    _write(doc, path, value)
+            elif op == "$currentDate":
+                _write(doc, path, datetime.now(timezone.utc).replace(tzinfo=None))
+            elif op == "$rename":
+                current = _read(doc, path)
+                if current is not _MISSING:
+                    _remove(doc, path)
+                    _write(doc, value, current)
+            elif op == "$push":
+                array = _array_at(doc, path, op)
+                if isinstance(value, Mapping) and "$each" in value:
+                    array.extend(value["$each"])
+                    if "$slice" in value:
+                        limit = value["$slice"]
+                        array[:] = array[:limit] if limit >= 0 else array[limit:]
+                else:
+                    array.append(value)
+            elif op == "$addToSet":
+                array = _array_at(doc, path, op)
+                items = value["$each"] if isinstance(value, Mapping) and "$each" in value else [value]
+                for item in items:
+                    if not any(_equal(existing, item) for existing in array):
+                        array.append(item)
+            elif op == "$pull":
+                current = _read(doc, path)
+                if isinstance(current, list):
+                    current[:] = [item for item in current if not _pull_matches(item, value)]
+            elif op == "$pullAll":
+                current = _read(doc, path)
+                if isinstance(current, list):
+                    current[:] = [item for item in current if not any(_equal(item, v) for v in value)]
+            else:
+                raise WriteError(f"Unknown modifier: {op}", code=9)
+    return doc
+
+
+def _upsert_seed(query: Mapping) -> dict:
+    """The document an upsert starts from: the query's equality conditions."""
+    seed: dict = {}
+    for key, condition in query.items():
+        if key == "$and":
+            for clause in condition:
+                seed.update(_upsert_seed(clause))
+        elif key.startswith("$"):
+            continue
+        elif _is_operator_doc(condition):
+            if "$eq" in condition:
+                _write(seed, key, condition["$eq"])
+        else:
+            _write(seed, key, condition)
+    return seed
+
+
+# ---------- projection, sorting, aggregation ----------
+def project(doc: dict, projection: Optional[Union[Mapping, List[str]]]) -> dict:
+    if not projection:
+        return doc
+    if not isinstance(projection, Mapping):
+        projection = {field: 1 for field in projection}
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    include_id = bool(projection.get("_id", 1))
+    if fields and any(fields.values()):
+        out: dict = {}
+        if include_id and "_id" in doc:
+            out["_id"] = doc["_id"]
+        for path in fields:
+            value = _read(doc, path)
+            if value is not _MISSING:
+                _write(out, path, value)
+        return out
+    for path in fields:
+        _remove(doc, path)
+    if not include_id:
+        doc.pop("_id", None)
+    return doc
+
+
+def _sort_spec(key_or_list: Any, direction: Optional[int] = None) -> List[Tuple[str, int]]:
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    if isinstance(key_or_list, Mapping):
+        return list(key_or_list.items())
+    return [tuple(item) for item in key_or_list]  # type: ignore[misc]
+
+
+def _sort_key(doc: Mapping, field: str, direction: int) -> Any:
+    values = list(_candidates(_lookup(doc, field.split("."))))
+    if not values:
+        return None
+    scalars = [v for v in values if not isinstance(v, list)] or values
+    pick = min if direction > 0 else max
+    return pick(scalars, key=functools.cmp_to_key(_compare))
+
+
+def sort_documents(docs: List[Mapping], spec: List[Tuple[str, int]]) -> List[Mapping]:
+    def order(a: Mapping, b: Mapping) -> int:
+        for field, direction in spec:
+            result = _compare(_sort_key(a, field, direction), _sort_key(b, field, direction))
+            if result:
+                return result * (1 if direction > 0 else -1)
+        return 0
+
+    return sorted(docs, key=functools.cmp_to_key(order)) if spec else list(docs)
+
+
+def _evaluate(doc: Mapping, expression: Any) -> Any:
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = _get(doc, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, list):
+        return [_evaluate(doc, item) for item in expression]
+    if not isinstance(expression, Mapping):
+        return expression
+    if len(expression) == 1 and next(iter(expression)).startswith("$"):
+        op, arg = next(iter(expression.items()))
+        if op == "$literal":
+            return arg
+        if op == "$cond":
+            if isinstance(arg, Mapping):
+                arg = [arg["if"], arg["then"], arg["else"]]
+            return _evaluate(doc, arg[1] if _evaluate(doc, arg[0]) else arg[2])
+        if op == "$ifNull":
+            for item in arg:
+                value = _evaluate(doc, item)
+                if value is not None:
+                    return value
+            return None
+        args = [_evaluate(doc, item) for item in (arg if isinstance(arg, list) else [arg])]
+        comparisons = {
+            "$eq": lambda c: c == 0,
+            "$ne": lambda c: c != 0,
+            "$gt": lambda c: c > 0,
+            "$gte": lambda c: c >= 0,
+            "$lt": lambda c: c < 0,
+            "$lte": lambda c: c <= 0,
+        }
+        if op in comparisons:
+            return comparisons[op](_compare(args[0], args[1]))
+        if op == "$and":
+            return all(args)
+        if op == "$or":
+            return any(args)
+        if op == "$not":
+            return not args[0]
+        if op == "$add":
+            return sum(args)
+        if op == "$subtract":
+            return args[0] - args[1]
+        if op == "$multiply":
+            return functools.reduce(lambda a, b: a * b, args, 1)
+        if op == "$divide":
+            return args[0] / args[1]
+        if op == "$size":
+            return len(args[0])
+        if op == "$floor":
+            return None if args[0] is None else math.floor(args[0])
+        if op == "$toString":
+            return None if args[0] is None else str(args[0])
+        raise OperationFailure(f"Unrecognized expression '{op}'", code=168)
+    return {key: _evaluate(doc, value) for key, value in expression.items()}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, Int64)) and not isinstance(value, bool)
+
+
+def _group(docs: List[dict], spec: Mapping) -> List[dict]:
+    groups: Dict[Any, dict] = {}
+    for doc in docs:
+        key = _evaluate(doc, spec["_id"])
+        state = groups.setdefault(_freeze(key), {"_id": key, "__docs__": []})
+        state["__docs__"].append(doc)
+    out: List[dict] = []
+    for state in groups.values():
+        members = state.pop("__docs__")
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            (op, arg), = accumulator.items()
+            values = [_evaluate(doc, arg) for doc in members]
+            if op == "$sum":
+                state[field] = sum(v for v in values if _is_number(v))
+            elif op == "$avg":
+                numbers = [v for v in values if _is_number(v)]
+                state[field] = sum(numbers) / len(numbers) if numbers else None
+            elif op == "$count":
+                state[field] = len(members)
+            elif op in ("$min", "$max"):
+                present = [v for v in values if v is not None]
+                pick = min if op == "$min" else max
+                state[field] = pick(present, key=functools.cmp_to_key(_compare)) if present else None
+            elif op == "$push":
+                state[field] = values
+            elif op == "$addToSet":
+                unique: List[Any] = []
+                for value in values:
+                    if not any(_equal(value, seen) for seen in unique):
+                        unique.append(value)
+                state[field] = unique
+            elif op == "$first":
+                state[field] = values[0] if values else None
+            elif op == "$last":
+                state[field] = values[-1] if values else None
+            else:
+                raise OperationFailure(f"unknown group operator '{op}'", code=15952)
+        out.append(state)
+    return out
+
+
+def _project_stage(docs: List[dict], spec: Mapping) -> List[dict]:
+    plain = {k: v for k, v in spec.items() if isinstance(v, (bool, int))}
+    computed = {k: v for k, v in spec.items() if k not in plain}
+    out = []
+    for doc in docs:
+        shaped = project(dict(doc), plain) if plain else {"_id": doc.get("_id")}
+        for field, expression in computed.items():
+            _write(shaped, field, _evaluate(doc, expression))
+        out.append(shaped)
+    return out
+
+
+def aggregate(docs: List[dict], pipeline: List[Mapping]) -> List[dict]:
+    """Run `pipeline` ($match, $group, $sort, $skip, $limit, $project, $unwind, $count) over `docs`."""
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match":
+            docs = [doc for doc in docs if match(doc, spec)]
+        elif name == "$group":
+            docs = _group(docs, spec)
+        elif name == "$sort":
+            docs = sort_documents(docs, _sort_spec(spec))
+        elif name == "$skip":
+            docs = docs[spec:]
+        elif name == "$limit":
+            docs = docs[:spec]
+        elif name == "$project":
+            docs = _project_stage(docs, spec)
+        elif name == "$unwind":
+            path = (spec["path"] if isinstance(spec, Mapping) else spec)[1:]
+            unwound = []
+            for doc in docs:
+                values = _read(doc, path)
+                for value in values if isinstance(values, list) else []:
+                    item = dict(doc)
+                    _write(item, path, value)
+                    unwound.append(item)
+            docs = unwound
+        elif name == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        else:
+            raise OperationFailure(f"Unrecognized pipeline stage name: '{name}'", code=40324)
+    return docs
+
+
+# ---------- cursors ----------
+class FakeCommandCursor:
+    """Async cursor over a computed result list (`aggregate`, `list_indexes`)."""
+
+    def __init__(self, documents: Optional[List[dict]] = None):
+        self._documents = documents
+        self._position = 0
+
+    def _results(self) -> List[dict]:
+        return self._documents or []
+
+    @property
+    def alive(self) -> bool:
+        return self._position < len(self._results())
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        results = self._results()
+        end = len(results) if not length else min(len(results), self._position + length)
+        batch = results[self._position:end]
+        self._position = end
+        return batch
+
+    async def next(self) -> dict:
+        return await self.__anext__()
+
+    def __aiter__(self) -> "FakeCommandCursor":
+        return self
+
+    async def __anext__(self) -> dict:
+        results = self._results()
+        if self._position >= len(results):
+            raise StopAsyncIteration
+        self._position += 1
+        return results[self._position - 1]
+
+    def batch_size(self, size: int) -> "FakeCommandCursor":
+        return self
+
+    async def close(self) -> None:
+        self._position = len(self._results())
+
+
+class FakeCursor(FakeCommandCursor):
+    """`find()` cursor: `sort`/`skip`/`limit` are applied when the first batch is read."""
+
+    def __init__(
+        self,
+        collection: "FakeCollection",
+        filter: Optional[Mapping] = None,
+        projection: Optional[Union[Mapping, List[str]]] = None,
+        sort: Optional[Any] = None,
+        skip: int = 0,
+        limit: int = 0,
+    ):
+        super().__init__()
+        self._collection = collection
+        self._filter = filter or {}
+        self._projection = projection
+        self._sort: List[Tuple[str, int]] = _sort_spec(sort) if sort else []
+        self._skip = skip
+        self._limit = limit
+
+    def _check_unread(self) -> None:
+        if self._documents is not None:
+            raise OperationFailure("cannot set options after executing query")
+
+    def sort(self, key_or_list: Any, direction: Optional[int] = None) -> "FakeCursor":
+        self._check_unread()
+        self._sort = _sort_spec(key_or_list, direction)
+        return self
+
+    def skip(self, skip: int) -> "FakeCursor":
+        self._check_unread()
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int) -> "FakeCursor":
+        self._check_unread()
+        self._limit = limit
+        return self
+
+    def _results(self) -> List[dict]:
+        if self._documents is None:
+            self._documents = self._collection._query(
+                self._filter, self._projection, self._sort, self._skip, self._limit
+            )
+        return self._documents
+
+
+# ---------- collections ----------
+class _Stored:
+    __slots__ = ("doc", "raw", "keys")
+
+    def __init__(self, doc: dict, raw: bytes, keys: Dict[str, Any]):
+        self.doc = doc  # decoded, used for matching; never handed out
+        self.raw = raw  # BSON, decoded afresh for every read
+        self.keys = keys  # unique index name -> key
+
+
+def _index_name(keys: List[Tuple[str, Any]]) -> str:
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+class FakeCollection:
+    """In-memory stand-in for `AsyncIOMotorCollection` (the subset this codebase uses)."""
+
+    def __init__(self, database: "FakeDatabase", name: str):
+        self._database = database
+        self._name = name
+        self._lock = database.client._lock
+        self._codec = database.client.codec_options
+        self._reset()
+
+    def _reset(self) -> None:
+        self._docs: Dict[Any, _Stored] = {}
+        self._indexes: Dict[str, dict] = {ID_INDEX: {"v": 2, "key": {"_id": 1}, "name": ID_INDEX}}
+        self._unique: Dict[str, Dict[Any, Any]] = {}
+        self.exists = False
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def full_name(self) -> str:
+        return f"{self._database.name}.{self._name}"
+
+    @property
+    def database(self) -> "FakeDatabase":
+        return self._database
+
+    def with_options(self, **kwargs: Any) -> "FakeCollection":
+        return self
+
+    def __getitem__(self, name: str) -> "FakeCollection":
+        return self._database[f"{self._name}.{name}"]
+
+    def __repr__(self) -> str:
+        return f"FakeCollection({self.full_name!r})"
+
+    # ----- storage -----
+    def _unique_keys(self, doc: Mapping) -> Dict[str, Any]:
+        keys: Dict[str, Any] = {}
+        for name, index in self._indexes.items():
+            if not index.get("unique") or name == ID_INDEX:
+                continue
+            partial = index.get("partialFilterExpression")
+            if partial is not None and not match(doc, partial):
+                continue
+            values = [_get(doc, field) for field in index["key"]]
+            if index.get("sparse") and all(v is _MISSING for v in values):
+                continue
+            keys[name] = tuple(_freeze(None if v is _MISSING else v) for v in values)
+        return keys
+
+    def _duplicate(self, name: str, doc: Mapping) -> DuplicateKeyError:
+        pattern = dict(self._indexes[name]["key"])
+        value = {field: (None if _get(doc, field) is _MISSING else _get(doc, field)) for field in pattern}
+        shown = ", ".join(f"{k}: {v!r}" for k, v in value.items())
+        message = f"E11000 duplicate key error collection: {self.full_name} index: {name} dup key: {{ {shown} }}"
+        return DuplicateKeyError(
+            message, 11000, {"code": 11000, "errmsg": message, "keyPattern": pattern, "keyValue": value}
+        )
+
+    def _save(self, doc: dict, previous: Optional[_Stored] = None) -> _Stored:
+        """Store `doc` (replacing `previous`), enforcing unique indexes; raises before changing anything."""
+        if "_id" not in doc:
+            doc = {"_id": ObjectId(), **doc}
+        ident = _freeze(doc["_id"])
+        if previous is None and ident in self._docs:
+            raise self._duplicate(ID_INDEX, doc)
+        keys = self._unique_keys(doc)
+        for name, key in keys.items():
+            owner = self._unique.get(name, {}).get(key, ident)
+            if owner != ident:
+                raise self._duplicate(name, doc)
+        raw = encode(doc, codec_options=self._codec)
+        stored = _Stored(decode(raw, self._codec), raw, keys)
+        if previous is not None:
+            for name, key in previous.keys.items():
+                self._unique.get(name, {}).pop(key, None)
+        for name, key in keys.items():
+            self._unique.setdefault(name, {})[key] = ident
+        self._docs[ident] = stored
+        self.exists = True
+        return stored
+
+    def _delete(self, stored: _Stored) -> None:
+        for name, key in stored.keys.items():
+            self._unique.get(name, {}).pop(key, None)
+        del self._docs[_freeze(stored.doc["_id"])]
+
+    def _matching(self, filter: Optional[Mapping]) -> List[_Stored]:
+        filter = _bson(filter or {}, self._codec)
+        if set(filter) == {"_id"} and not _is_operator_doc(filter["_id"]):
+            stored = self._docs.get(_freeze(filter["_id"]))
+            return [stored] if stored is not None else []
+        return [s for s in self._docs.values() if match(s.doc, filter)]
+
+    def _first(self, filter: Optional[Mapping], sort: Optional[Any] = None) -> Optional[_Stored]:
+        candidates = self._matching(filter)
+        if sort and candidates:
+            by_doc = {id(s.doc): s for s in candidates}
+            return by_doc[id(sort_documents([s.doc for s in candidates], _sort_spec(sort))[0])]
+        return candidates[0] if candidates else None
+
+    def _load(self, stored: _Stored, projection: Optional[Any] = None) -> dict:
+        return project(decode(stored.raw, self._codec), projection)
+
+    def _query(self, filter, projection, sort, skip, limit) -> List[dict]:
+        with self._lock:
+            found = self._matching(filter)
+            if sort:
+                by_doc = {id(s.doc): s for s in found}
+                found = [by_doc[id(doc)] for doc in sort_documents([s.doc for s in found], sort)]
+            found = found[skip:]
+            if limit:
+                found = found[:abs(limit)]
+            return [self._load(s, projection) for s in found]
+
+    def _update(self, filter: Mapping, update: Any, upsert: bool, multi: bool, sort: Optional[Any] = None) -> dict:
+        """Apply one update statement; returns the server's raw result (`n`, `nModified`, `upserted`)."""
+        update = _bson(update, self._codec)
+        if isinstance(update, list):
+            raise OperationFailure("Update pipelines are not supported by the in-memory database", code=2)
+        targets = self._matching(filter) if multi else [s for s in [self._first(filter, sort)] if s is not None]
+        modified = 0
+        for stored in targets:
+            doc = apply_update(decode(stored.raw, self._codec), update)
+            if encode(doc, codec_options=self._codec) != stored.raw:
+                self._save(doc, previous=stored)
+                modified += 1
+        if targets or not upsert:
+            return {"n": len(targets), "nModified": modified}
+        doc = apply_update(_upsert_seed(_bson(filter, self._codec)), update, inserting=True)
+        stored = self._save(doc)
+        return {"n": 1, "nModified": 0, "upserted": stored.doc["_id"]}
+
+    # ----- reads -----
+    def find(self, filter: Optional[Mapping] = None, projection: Optional[Any] = None, **kwargs: Any) -> FakeCursor:
+        return FakeCursor(
+            self,
+            filter,
+            projection,
+            sort=kwargs.get("sort"),
+            skip=kwargs.get("skip", 0),
+            limit=kwargs.get("limit", 0),
+        )
+
+    async def find_one(self, filter: Optional[Any] = None, *args: Any, **kwargs: Any) -> Optional[dict]:
+        if filter is not None and not isinstance(filter, Mapping):
+            filter = {"_id": filter}
+        results = await self.find(filter, *args, **{**kwargs, "limit": 1}).to_list(1)
+        return results[0] if results else None
+
+    async def count_documents(self, filter: Mapping, **kwargs: Any) -> int:
+        with self._lock:
+            found = len(self._matching(filter))
+        found = max(0, found - kwargs.get("skip", 0))
+        return min(found, kwargs["limit"]) if kwargs.get("limit") else found
+
+    async def estimated_document_count(self, **kwargs: Any) -> int:
+        return len(self._docs)
+
+    async def distinct(self, key: str, filter: Optional[Mapping] = None, **kwargs: Any) -> List[Any]:
+        with self._lock:
+            values: List[Any] = []
+            for stored in self._matching(filter):
+                for value in _candidates(_lookup(stored.doc, key.split("."))):
+                    if not isinstance(value, list) and not any(_equal(value, seen) for seen in values):
+                        values.append(value)
+            return [_bson(v, self._codec) for v in values]
+
+    def aggregate(self, pipeline: List[Mapping], **kwargs: Any) -> FakeCommandCursor:
+        with self._lock:
+            docs = [decode(s.raw, self._codec) for s in self._docs.values()]
+        return FakeCommandCursor(aggregate(docs, _bson(pipeline, self._codec)))
+
+    # ----- writes -----
+    async def insert_one(self, document: dict, **kwargs: Any) -> InsertOneResult:
+        document.setdefault("_id", ObjectId())
+        with self._lock:
+            self._save(_bson(document, self._codec))
+        return InsertOneResult(document["_id"], True)
+
+    async def insert_many(self, documents: Iterable[dict], ordered: bool = True, **kwargs: Any) -> InsertManyResult:
+        documents = list(documents)
+        if not documents:
+            raise TypeError("documents must be a non-empty list")
+        await self.bulk_write([InsertOne(doc) for doc in documents], ordered=ordered)
+        return InsertManyResult([doc["_id"] for doc in documents], True)
+
+    async def update_one(self, filter: Mapping, update: Any, upsert: bool = False, **kwargs: Any) -> UpdateResult:
+        with self._lock:
+            return UpdateResult(self._update(filter, update, upsert, multi=False, sort=kwargs.get("sort")), True)
+
+    async def update_many(self, filter: Mapping, update: Any, upsert: bool = False, **kwargs: Any) -> UpdateResult:
+        with self._lock:
+            return UpdateResult(self._update(filter, update, upsert, multi=True), True)
+
+    async def replace_one(self, filter: Mapping, replacement: Mapping, upsert: bool = False, **kwargs: Any) -> UpdateResult:
+        if any(str(k).startswith("$") for k in replacement):
+            raise ValueError("replacement can not include $ operators")
+        with self._lock:
+            return UpdateResult(self._update(filter, replacement, upsert, multi=False), True)
+
+    async def delete_one(self, filter: Mapping, **kwargs: Any) -> DeleteResult:
+        with self._lock:
+            stored = self._first(filter)
+            if stored is not None:
+                self._delete(stored)
+            return DeleteResult({"n": int(stored is not None)}, True)
+
+    async def delete_many(self, filter: Mapping, **kwargs: Any) -> DeleteResult:
+        with self._lock:
+            found = self._matching(filter)
+            for stored in found:
+                self._delete(stored)
+            return DeleteResult({"n": len(found)}, True)
+
+    async def find_one_and_update(
+        self,
+        filter: Mapping,
+        update: Any,
+        projection: Optional[Any] = None,
+        sort: Optional[Any] = None,
+        upsert: bool = False,
+        return_document: bool = ReturnDocument.BEFORE,
+        **kwargs: Any,
+    ) -> Optional[dict]:
+        with self._lock:
+            before = self._first(filter, sort)
+            previous = self._load(before, projection) if before is not None else None
+            raw = self._update(filter, update, upsert, multi=False, sort=sort)
+            if return_document != ReturnDocument.AFTER:
+                return previous
+            ident = raw.get("upserted", before.doc["_id"] if before is not None else None)
+            stored = self._docs.get(_freeze(ident)) if ident is not None else None
+            return self._load(stored, projection) if stored is not None else None
+
+    async def find_one_and_replace(self, filter: Mapping, replacement: Mapping, **kwargs: Any) -> Optional[dict]:
+        if any(str(k).startswith("$") for k in replacement):
+            raise ValueError("replacement can not include $ operators")
+        return await self.find_one_and_update(filter, replacement, **kwargs)
+
+    async def find_one_and_delete(
+        self, filter: Mapping, projection: Optional[Any] = None, sort: Optional[Any] = None, **kwargs: Any
+    ) -> Optional[dict]:
+        with self._lock:
+            stored = self._first(filter, sort)
+            if stored is None:
+                return None
+            self._delete(stored)
+            return self._load(stored, projection)
+
+    async def bulk_write(self, requests: Iterable[Any], ordered: bool = True, **kwargs: Any) -> BulkWriteResult:
+        """`InsertOne`/`UpdateOne`/`UpdateMany`/`ReplaceOne`/`DeleteOne`/`DeleteMany`, with BulkWriteError semantics."""
+        result: Dict[str, Any] = {
+            "writeErrors": [], "writeConcernErrors": [], "nInserted": 0, "nUpserted": 0,
+            "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": [],
+        }
+        requests = list(requests)
+        if not requests:
+            raise InvalidOperation("No operations to execute")
+        with self._lock:
+            for index, op in enumerate(requests):
+                try:
+                    if isinstance(op, InsertOne):
+                        document = op._doc
+                        document.setdefault("_id", ObjectId())
+                        self._save(_bson(document, self._codec))
+                        result["nInserted"] += 1
+                        continue
+                    if isinstance(op, (DeleteOne, DeleteMany)):
+                        found = self._matching(op._filter)
+                        for stored in found if isinstance(op, DeleteMany) else found[:1]:
+                            self._delete(stored)
+                            result["nRemoved"] += 1
+                        continue
+                    if not isinstance(op, (UpdateOne, UpdateMany, ReplaceOne)):
+                        raise TypeError(f"{op!r} is not a valid request")
+                    raw = self._update(
+                        op._filter, op._doc, bool(op._upsert), multi=isinstance(op, UpdateMany), sort=op._sort
+                    )
+                    if "upserted" in raw:
+                        result["nUpserted"] += 1
+                        result["upserted"].append({"index": index, "_id": raw["upserted"]})
+                    else:
+                        result["nMatched"] += raw["n"]
+                        result["nModified"] += raw["nModified"]
+                except OperationFailure as exc:
+                    result["writeErrors"].append(
+                        {"index": index, "code": exc.code, "errmsg": str(exc), "op": getattr(op, "_doc", None)}
+                    )
+                    if ordered:
+                        break
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    # ----- indexes -----
+    async def create_index(self, keys: Any, **kwargs: Any) -> str:
+        key = dict(_sort_spec(keys, 1))
+        name = kwargs.pop("name", None) or _index_name(list(key.items()))
+        index = {"v": 2, "key": key, "name": name}
+        for option in ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds"):
+            if kwargs.get(option) not in (None, False):
+                index[option] = _bson(kwargs[option], self._codec)
+        with self._lock:
+            existing = self._indexes.get(name)
+            if existing is not None:
+                if existing != index:
+                    raise OperationFailure(
+                        f"An existing index has the same name as the requested index: {name}", code=86
+                    )
+                return name
+            for other in self._indexes.values():
+                if list(other["key"].items()) == list(key.items()):
+                    raise OperationFailure(
+                        f"Index already exists with a different name: {other['name']}", code=85
+                    )
+            self._indexes[name] = index
+            if index.get("unique"):
+                seen: Dict[Any, Any] = {}
+                try:
+                    for ident, stored in self._docs.items():
+                        keys_for_doc = self._unique_keys(stored.doc)
+                        if name in keys_for_doc:
+                            if keys_for_doc[name] in seen:
+                                raise self._duplicate(name, stored.doc)
+                            seen[keys_for_doc[name]] = ident
+                except DuplicateKeyError:
+                    del self._indexes[name]
+                    raise
+                self._unique[name] = seen
+                for stored in self._docs.values():
+                    stored.keys = self._unique_keys(stored.doc)
+            self.exists = True
+        return name
+
+    async def create_indexes(self, indexes: List[Any], **kwargs: Any) -> List[str]:
+        names = []
+        for model in indexes:
+            document = dict(model.document)
+            names.append(await self.create_index(list(document.pop("key").items()), **document))
+        return names
+
+    async def drop_index(self, index_or_name: Any, **kwargs: Any) -> None:
+        name = index_or_name if isinstance(index_or_name, str) else _index_name(_sort_spec(index_or_name))
+        with self._lock:
+            if name == ID_INDEX:
+                raise OperationFailure("cannot drop _id index", code=72)
+            if name not in self._indexes:
+                raise OperationFailure(f"index not found with name [{name}]", code=27)
+            del self._indexes[name]
+            self._unique.pop(name, None)
+            for stored in self._docs.values():
+                stored.keys.pop(name, None)
+
+    async def drop_indexes(self, **kwargs: Any) -> None:
+        for name in [n for n in self._indexes if n != ID_INDEX]:
+            await self.drop_index(name)
+
+    def list_indexes(self, **kwargs: Any) -> FakeCommandCursor:
+        with self._lock:
+            return FakeCommandCursor([_bson(index, self._codec) for index in self._indexes.values()])
+
+    async def index_information(self) -> Dict[str, dict]:
+        info = {}
+        for index in await self.list_indexes().to_list(None):
+            entry = {k: v for k, v in index.items() if k != "name"}
+            entry["key"] = list(index["key"].items())
+            info[index["name"]] = entry
+        return info
+
+    async def drop(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._reset()
+
+    def explain(self, filter: Mapping, sort: Optional[Mapping] = None) -> dict:
+        """A query plan in the server's `queryPlanner` shape: the best index by equality prefix, else COLLSCAN."""
+        fields = [k for k in (filter or {}) if not k.startswith("$")]
+        equality = {k for k in fields if not _is_operator_doc(filter[k]) or set(filter[k]) <= {"$eq", "$in"}}
+        sort_keys = list((sort or {}).items())
+        best: Optional[Tuple[Tuple[int, bool], dict]] = None
+        for index in self._indexes.values():
+            keys = list(index["key"].items())
+            prefix = 0
+            while prefix < len(keys) and keys[prefix][0] in equality:
+                prefix += 1
+            used = prefix + int(prefix < len(keys) and keys[prefix][0] in fields)
+            rest = keys[prefix:prefix + len(sort_keys)]
+            covers_sort = bool(sort_keys) and [k for k, _ in rest] == [k for k, _ in sort_keys] and (
+                all(d == sd for (_, d), (_, sd) in zip(rest, sort_keys))
+                or all(d == -sd for (_, d), (_, sd) in zip(rest, sort_keys))
+            )
+            partial = index.get("partialFilterExpression") or {}
+            # Usable only when the query implies the partial filter; approximated as a non-null equality per field
+            implied = all(k in equality and filter[k] is not None for k in partial)
+            if not used and not covers_sort or not implied:
+                continue
+            score = (used, covers_sort)
+            if best is None or score > best[0]:
+                best = (score, index)
+        plan: dict
+        if best is None:
+            plan = {"stage": "COLLSCAN", "filter": filter or {}, "direction": "forward"}
+        else:
+            index = best[1]
+            plan = {
+                "stage": "FETCH",
+                "inputStage": {"stage": "IXSCAN", "indexName": index["name"], "keyPattern": dict(index["key"])},
+            }
+        if sort_keys and (best is None or not best[0][1]):
+            plan = {"stage": "SORT", "sortPattern": dict(sort_keys), "inputStage": plan}
+        return {
+            "queryPlanner": {"namespace": self.full_name, "parsedQuery": filter or {}, "winningPlan": plan,
+                             "rejectedPlans": []},
+            "ok": 1.0,
+        }
+
+
+# ---------- databases and clients ----------
+class FakeDatabase:
+    """In-memory stand-in for `AsyncIOMotorDatabase`."""
+
+    def __init__(self, client: "FakeMongoClient", name: str):
+        self._client = client
+        self._name = name
+        self._collections: Dict[str, FakeCollection] = {}
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def client(self) -> "FakeMongoClient":
+        return self._client
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        with self._client._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = self._collections[name] = FakeCollection(self, name)
+            return collection
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def __repr__(self) -> str:
+        return f"FakeDatabase({self._name!r})"
+
+    def get_collection(self, name: str, **kwargs: Any) -> FakeCollection:
+        return self[name]
+
+    def with_options(self, **kwargs: Any) -> "FakeDatabase":
+        # One in-process copy of the data: read preferences and concerns change nothing
+        return self
+
+    async def create_collection(self, name: str, **kwargs: Any) -> FakeCollection:
+        collection = self[name]
+        if collection.exists:
+            raise OperationFailure(f"Collection {self._name}.{name} already exists.", code=48)
+        collection.exists = True
+        return collection
+
+    async def list_collection_names(self, **kwargs: Any) -> List[str]:
+        return sorted(name for name, collection in self._collections.items() if collection.exists)
+
+    async def drop_collection(self, name_or_collection: Any, **kwargs: Any) -> None:
+        name = getattr(name_or_collection, "name", name_or_collection)
+        await self[name].drop()
+
+    async def command(self, command: Any, value: Any = 1, **kwargs: Any) -> dict:
+        """`ping`, `buildInfo` and `explain` (of find, count, delete, update, findAndModify and aggregate)."""
+        spec = {command: value, **kwargs} if isinstance(command, str) else {**command, **kwargs}
+        name = next(iter(spec))
+        if name == "ping":
+            return {"ok": 1.0}
+        if name == "buildInfo":
+            return {"version": "0.0.0-memory", "ok": 1.0}
+        if name == "explain":
+            inner = spec["explain"]
+            kind = next(iter(inner))
+            sort = inner.get("sort")
+            if kind in ("find", "count", "delete", "findAndModify", "distinct"):
+                filter = inner.get("filter", inner.get("query"))
+                if kind == "delete":
+                    filter = inner["deletes"][0]["q"]
+            elif kind == "update":
+                filter = inner["updates"][0]["q"]
+            elif kind == "aggregate":
+                stages = inner.get("pipeline") or [{}]
+                filter = stages[0].get("$match", {})
+            else:
+                raise OperationFailure(f"Explain is not supported for {kind} by the in-memory database", code=2)
+            return self[inner[kind]].explain(filter or {}, sort)
+        raise OperationFailure(f"no such command: '{name}'", code=59)
+
+
+class FakeMongoClient:
+    """In-memory stand-in for `AsyncIOMotorClient`; see `memory_client`.
+
+    Client options and event listeners are accepted and ignored (so command
+    and pool metrics stay empty), except `tz_aware`. `close()` keeps the data:
+    like a server, it outlives the clients connected to it.
+    """
+
+    def __init__(self, uri: str = MEMORY_SCHEME, **options: Any):
+        self._uri = uri
+        self._lock = threading.RLock()
+        self._databases: Dict[str, FakeDatabase] = {}
+        self.codec_options = CodecOptions(tz_aware=bool(options.get("tz_aware", False)))
+
+    def __getitem__(self, name: str) -> FakeDatabase:
+        with self._lock:
+            database = self._databases.get(name)
+            if database is None:
+                database = self._databases[name] = FakeDatabase(self, name)
+            return database
+
+    def __getattr__(self, name: str) -> FakeDatabase:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def __repr__(self) -> str:
+        return f"FakeMongoClient({self._uri!r})"
+
+    def get_database(self, name: Optional[str] = None, **kwargs: Any) -> FakeDatabase:
+        return self[name or self.get_default_database().name]
+
+    def get_default_database(self, default: Optional[str] = None, **kwargs: Any) -> FakeDatabase:
+        path = self._uri[len(MEMORY_SCHEME):].partition("/")[2].partition("?")[0]
+        return self[path or default or DEFAULT_DB_NAME]
+
+    @property
+    def address(self) -> None:
+        return None
+
+    async def server_info(self) -> dict:
+        return await self[DEFAULT_DB_NAME].command("buildInfo")
+
+    async def list_database_names(self, **kwargs: Any) -> List[str]:
+        return sorted(name for name, db in self._databases.items() if await db.list_collection_names())
+
+    async def drop_database(self, name_or_database: Any, **kwargs: Any) -> None:
+        name = getattr(name_or_database, "name", name_or_database)
+        with self._lock:
+            self._databases.pop(name, None)
+
+    def close(self) -> None:
+        return None
+
+
+def is_memory_uri(uri: str) -> bool:
+    return uri.strip().startswith(MEMORY_SCHEME)
+
+
+def memory_client(uri: str = MEMORY_SCHEME, **options: Any) -> FakeMongoClient:
+    """The process-wide in-memory client for `uri`'s host (`memory://`, `memory://other`).
+
+    Every client created for the same host shares its data, so the API and the
+    agents running in one process (tests, load tests) see the same documents.
+    """
+    host = uri.strip()[len(MEMORY_SCHEME):].partition("/")[0]
+    with _clients_lock:
+        client = _clients.get(host)
+        if client is None:
+            client = _clients[host] = FakeMongoClient(uri.strip(), **options)
+        return client
+
+
+def reset_memory_clients() -> None:
+    """Forget every in-memory database (between test cases)."""
+    with _clients_lock:
+        _clients.clear()
+
+
+__all__ = [
+    "FakeCollection",
+    "FakeCommandCursor",
+    "FakeCursor",
+    "FakeDatabase",
+    "FakeMongoClient",
+    "apply_update",
+    "is_memory_uri",
+    "match",
+    "memory_client",
+    "reset_memory_clients",
+]
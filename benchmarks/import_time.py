@@ -0,0 +1,137 @@
+"""
+Import-time profile of the API (what every worker pays before serving).
+
+Imports the target module in a fresh interpreter with `python -X importtime`
+(and builds its `app`, which `backend.main` creates on first access) and
+reports the total plus the slowest top-level packages and modules. Append the
+JSON line to a history file on each release to track regressions:
+
+CLI:
+  python -m benchmarks.import_time
+  python -m benchmarks.import_time --module backend.main --top 15 --repeat 5
+  python -m benchmarks.import_time --history benchmarks/import_time.jsonl --max-ms 1500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _git_sha() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def profile_once(module: str) -> List[dict]:
+    """Rows of `-X importtime` output: module, self_us, cumulative_us, depth."""
+    env = dict(os.environ)
+    # Any non-empty value disables writing .pyc files (even "0"), which would
+    # make every run pay for compiling the project's sources
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    # Building the app validates settings, which need a URI; nothing connects yet
+    env.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+    code = f"import importlib; getattr(importlib.import_module({module!r}), 'app', None)"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows: List[dict] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append(
+                {
+                    "module": name.strip(),
+                    "self_us": int(self_us),
+                    "cumulative_us": int(cumulative_us),
+                    "depth": (len(name) - len(name.lstrip())) // 2,
+                }
+            )
+        except ValueError:
+            continue
+    return rows
+
+
+def summarize(rows: List[dict], top: int) -> dict:
+    total_us = sum(r["self_us"] for r in rows)
+    by_package: Dict[str, int] = defaultdict(int)
+    for r in rows:
+        by_package[r["module"].split(".")[0]] += r["self_us"]
+    slowest = sorted((r for r in rows), key=lambda r: r["cumulative_us"], reverse=True)[:top]
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "modules": len(rows),
+        "packages": [
+            {"package": name, "ms": round(us / 1000, 1)}
+            for name, us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        ],
+        "slowest": [{"module": r["module"], "cumulative_ms": round(r["cumulative_us"] / 1000, 1)} for r in slowest],
+    }
+
+
+def run(module: str, top: int, repeat: int) -> dict:
+    # Warm-up: writes the bytecode cache and pulls the files into the OS page
+    # cache, so the measured runs reflect a deployed worker's start-up
+    profile_once(module)
+    runs = [profile_once(module) for _ in range(max(1, repeat))]
+    totals = [sum(r["self_us"] for r in rows) / 1000 for rows in runs]
+    # Report the breakdown of the median run
+    median_run = sorted(zip(totals, range(len(runs))))[len(runs) // 2][1]
+    report = summarize(runs[median_run], top)
+    report.update(
+        {
+            "module": module,
+            "repeat": len(runs),
+            "median_ms": round(statistics.median(totals), 1),
+            "min_ms": round(min(totals), 1),
+            "python": sys.version.split()[0],
+            "git_sha": _git_sha(),
+            "measured_at": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time profile of the API")
+    parser.add_argument("--module", default="backend.main", help="Module to import")
+    parser.add_argument("--top", type=int, default=10, help="Packages/modules to list")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters to measure (median is reported)")
+    parser.add_argument("--history", help="Append the report as one JSON line to this file")
+    parser.add_argument("--max-ms", type=float, help="Exit non-zero when the median exceeds this budget")
+    args = parser.parse_args()
+
+    report = run(args.module, args.top, args.repeat)
+    print(json.dumps(report, indent=2))
+    if args.history:
+        with open(args.history, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(report) + "\n")
+    if args.max_ms is not None and report["median_ms"] > args.max_ms:
+        print(f"Import time {report['median_ms']} ms exceeds budget {args.max_ms} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
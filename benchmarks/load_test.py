@@ -0,0 +1,361 @@
+"""
+HTTP load test for the API routers: RPS and p50/p95/p99 latency per endpoint.
+
+Seeds synthetic profiles, challenges, teams and hackathons into a dedicated
+database (its name must contain "loadtest"; its collections are dropped first),
+then drives each endpoint in turn with `--concurrency` async clients for
+`--requests` requests and prints one JSON report.
+
+By default the app runs in-process (httpx `ASGITransport`, lifespan included)
+against `MONGODB_URI`, so the numbers measure the routers, middleware and Mongo
+without socket overhead. With `--base-url` the load goes to a running server,
+which must use the same `MONGODB_URI` and `DB_NAME=<--db-name>`. With
+`--memory` the in-process app runs on the in-memory fake database
+(`MONGODB_URI=memory://`), which isolates router and serialization cost from
+Mongo; do not compare those reports with server-backed ones.
+
+Reports carry the git sha; append them to a history file and compare against a
+baseline to catch router regressions:
+
+CLI:
+  python -m benchmarks.load_test --profiles 5000 --requests 2000 --concurrency 32
+  python -m benchmarks.load_test --base-url http://localhost:8000 --db-name hackathon_twin_loadtest
+  python -m benchmarks.load_test --memory --requests 500
+  python -m benchmarks.load_test --history benchmarks/load_test.jsonl --baseline benchmarks/load_test.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+from bson import ObjectId
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEEDED = ("profiles", "challenges", "teams", "hackathons", "outreach_messages", "outreach_logs")
+SKILLS = ["Python", "TypeScript", "React", "Machine Learning", "Go", "Docker", "NLP", "Data Science"]
+
+
+def _git_sha() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+# ---------- seeding ----------
+@dataclass
+class Dataset:
+    profiles: List[str]
+    challenges: List[str]
+    teams: List[str]
+    hackathons: List[str]
+
+
+def _ids(n: int) -> List[str]:
+    return [str(ObjectId()) for _ in range(n)]
+
+
+async def seed(db, profiles: int, challenges: int, teams: int, hackathons: int) -> Dataset:
+    """Drop the load-test collections and insert synthetic documents (string ids, like the API)."""
+    if "loadtest" not in db.name:
+        raise SystemExit(f"Refusing to seed {db.name!r}: the load-test database name must contain 'loadtest'")
+    for name in SEEDED:
+        await db[name].drop()
+    from backend.utils.indexes import ensure_indexes
+
+    await ensure_indexes(db, force=True)
+    data = Dataset(_ids(profiles), _ids(challenges), _ids(teams), _ids(hackathons))
+    rnd = random.Random(42)
+    await _insert(db["profiles"], [
+        {
+            "_id": _id,
+            "name": f"Load Test {i}",
+            "email": f"loadtest{i}@example.com",
+            "skills": rnd.sample(SKILLS, 3),
+            "location": rnd.choice(["Berlin", "Remote", "Lagos", "Austin"]),
+            "linkedin_url": f"https://github.com/loadtest{i}",
+            "status": "new",
+        }
+        for i, _id in enumerate(data.profiles)
+    ])
+    await _insert(db["challenges"], [
+        {
+            "_id": _id,
+            "title": f"Challenge {i}",
+            "description": "Ship something useful in 48 hours.",
+            "difficulty": rnd.choice(["easy", "medium", "hard"]),
+            "participants": rnd.sample(data.profiles, min(5, len(data.profiles))),
+        }
+        for i, _id in enumerate(data.challenges)
+    ])
+    await _insert(db["teams"], [
+        {
+            "_id": _id,
+            "name": f"Team {i}",
+            "members": rnd.sample(data.profiles, min(4, len(data.profiles))),
+            "skills_needed": rnd.sample(SKILLS, 2),
+            "challenge_id": rnd.choice(data.challenges) if data.challenges else None,
+        }
+        for i, _id in enumerate(data.teams)
+    ])
+    await _insert(db["hackathons"], [
+        {
+            "_id": _id,
+            "topic": f"Hackathon {i}",
+            "description": "A weekend of building.",
+            "location": "Remote",
+            "status": "planned",
+            "plan": {
+                "workshops": [{"title": f"Workshop {w}", "description": "Hands-on."} for w in range(4)],
+                "agenda": [{"time": f"{9 + a}:00", "title": f"Session {a}"} for a in range(8)],
+                "problem_statements": [
+                    {"title": f"Problem {p}", "description": "Solve it.", "skills_required": rnd.sample(SKILLS, 2)}
+                    for p in range(3)
+                ],
+            },
+        }
+        for i, _id in enumerate(data.hackathons)
+    ])
+    return data
+
+
+async def _insert(collection, docs: List[dict], batch: int = 1000) -> None:
+    for start in range(0, len(docs), batch):
+        await collection.insert_many(docs[start:start + batch], ordered=False)
+
+
+# ---------- scenarios ----------
+Request = Tuple[str, str, Optional[dict]]  # method, url, json body
+
+
+def _new_profile(n: int) -> dict:
+    return {
+        "name": f"New {n}",
+        "email": f"new{n}@example.com",
+        "skills": ["Python"],
+        "location": "Remote",
+        "linkedin_url": f"https://github.com/new{n}",
+        "status": "new",
+    }
+
+
+def scenarios(data: Dataset) -> Dict[str, Callable[[int], Request]]:
+    """Endpoint label -> factory of the i-th request; every router gets reads and writes."""
+    rnd = random.Random(7)
+    pick = rnd.choice
+    serial = itertools.count()  # unique emails/URLs across warm-up and measured runs
+
+    def page(n: int) -> int:
+        return rnd.randrange(0, max(1, n - 20))
+
+    return {
+        "GET /health": lambda i: ("GET", "/health", None),
+        "GET /profiles/": lambda i: ("GET", f"/profiles/?skip={page(len(data.profiles))}&limit=20", None),
+        "GET /profiles/{profile_id}": lambda i: ("GET", f"/profiles/{pick(data.profiles)}", None),
+        "POST /profiles/": lambda i: ("POST", "/profiles/", _new_profile(next(serial))),
+        "PATCH /profiles/{profile_id}": lambda i: (
+            "PATCH", f"/profiles/{pick(data.profiles)}", {"status": pick(["new", "contacted", "replied"])}
+        ),
+        "GET /challenges/": lambda i: ("GET", f"/challenges/?skip={page(len(data.challenges))}&limit=20", None),
+        "GET /challenges/{challenge_id}": lambda i: ("GET", f"/challenges/{pick(data.challenges)}", None),
+        "GET /teams/?challenge_id": lambda i: ("GET", f"/teams/?challenge_id={pick(data.challenges)}", None),
+        "GET /teams/{team_id}": lambda i: ("GET", f"/teams/{pick(data.teams)}", None),
+        "POST /teams/{team_id}/members/{user_id}": lambda i: (
+            "POST", f"/teams/{pick(data.teams)}/members/{pick(data.profiles)}", None
+        ),
+        "GET /hackathons/": lambda i: ("GET", f"/hackathons/?skip={page(len(data.hackathons))}&limit=20", None),
+        "GET /hackathons/{hackathon_id}": lambda i: ("GET", f"/hackathons/{pick(data.hackathons)}", None),
+        "POST /hackathons/{hackathon_id}/invite": lambda i: (
+            "POST", f"/hackathons/{pick(data.hackathons)}/invite?limit=5", None
+        ),
+    }
+
+
+# ---------- load ----------
+def _percentile(sorted_ms: List[float], q: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    # nearest-rank
+    return sorted_ms[min(len(sorted_ms), max(1, math.ceil(q / 100 * len(sorted_ms)))) - 1]
+
+
+async def drive(client: httpx.AsyncClient, make: Callable[[int], Request], requests: int, concurrency: int) -> dict:
+    """Issue `requests` requests from `concurrency` workers; latency per request in ms."""
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    async def _worker() -> None:
+        while True:
+            i = next(counter)
+            if i >= requests:
+                return
+            method, url, body = make(i)
+            start = perf_counter()
+            try:
+                resp = await client.request(method, url, json=body)
+                outcome = None if resp.status_code < 400 else str(resp.status_code)
+            except httpx.HTTPError as exc:
+                outcome = type(exc).__name__
+            latencies.append((perf_counter() - start) * 1000)
+            if outcome:
+                errors[outcome] = errors.get(outcome, 0) + 1
+
+    start = perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(max(1, concurrency))))
+    elapsed = perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+async def _run_endpoints(client: httpx.AsyncClient, data: Dataset, args: argparse.Namespace) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    selected = [s.strip() for s in (args.only or "").split(",") if s.strip()]
+    for label, make in scenarios(data).items():
+        if selected and not any(s in label for s in selected):
+            continue
+        if args.warmup:
+            await drive(client, make, args.warmup, min(args.concurrency, args.warmup))
+        results[label] = await drive(client, make, args.requests, args.concurrency)
+        print(f"{label:45} {results[label]['rps']:>9} rps  p95 {results[label]['p95_ms']} ms", file=sys.stderr)
+    return results
+
+
+async def run(args: argparse.Namespace) -> dict:
+    os.environ["DB_NAME"] = args.db_name
+    if args.memory:
+        os.environ["MONGODB_URI"] = "memory://"
+    # Keep per-request access logging out of the measurement unless configured
+    os.environ.setdefault("LOG_ONLY_SLOW_OR_ERRORS", "true")
+    from backend.config import get_settings
+    from backend.db import create_mongo_client, get_database
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.base_url:
+        client = create_mongo_client(get_settings(), appname="benchmarks.load_test")
+        try:
+            data = await seed(client[args.db_name], args.profiles, args.challenges, args.teams, args.hackathons)
+        finally:
+            client.close()
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30.0) as http:
+            endpoints = await _run_endpoints(http, data, args)
+        mode = "http"
+    else:
+        from backend.main import app
+
+        async with app.router.lifespan_context(app):
+            data = await seed(get_database(), args.profiles, args.challenges, args.teams, args.hackathons)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30.0) as http:
+                endpoints = await _run_endpoints(http, data, args)
+        mode = "asgi-memory" if args.memory else "asgi"
+
+    return {
+        "git_sha": _git_sha(),
+        "measured_at": datetime.now(timezone.utc).isoformat(),
+        "mode": mode,
+        "python": sys.version.split()[0],
+        "scale": {
+            "profiles": args.profiles,
+            "challenges": args.challenges,
+            "teams": args.teams,
+            "hackathons": args.hackathons,
+        },
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "endpoints": endpoints,
+    }
+
+
+# ---------- comparison ----------
+def load_baseline(path: str) -> dict:
+    """A report file, or the last line of a JSON-lines history."""
+    with open(path, encoding="utf-8") as fh:
+        text = fh.read().strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(text.splitlines()[-1])
+
+
+def regressions(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    found: List[str] = []
+    for label, now in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(label)
+        if not before:
+            continue
+        if before["rps"] and now["rps"] < before["rps"] * (1 - tolerance):
+            found.append(f"{label}: {now['rps']} rps vs {before['rps']} at {baseline.get('git_sha')}")
+        if before["p95_ms"] and now["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            found.append(f"{label}: p95 {now['p95_ms']} ms vs {before['p95_ms']} at {baseline.get('git_sha')}")
+        if sum(now["errors"].values()) > sum(before["errors"].values()):
+            found.append(f"{label}: errors {now['errors']} vs {before['errors']}")
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP load test for the API routers")
+    parser.add_argument("--base-url", help="Load a running server instead of the in-process app")
+    parser.add_argument("--memory", action="store_true", help="Use the in-memory fake database (in-process only)")
+    parser.add_argument("--db-name", default="hackathon_twin_loadtest", help="Database to seed (dropped first)")
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--challenges", type=int, default=50)
+    parser.add_argument("--teams", type=int, default=200)
+    parser.add_argument("--hackathons", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests per endpoint")
+    parser.add_argument("--only", help="Comma-separated substrings of endpoint labels to run")
+    parser.add_argument("--history", help="Append the report as one JSON line to this file")
+    parser.add_argument("--baseline", help="Report or history file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed RPS/p95 regression (fraction)")
+    args = parser.parse_args()
+    if args.memory and args.base_url:
+        parser.error("--memory runs the app in-process; it cannot be combined with --base-url")
+    if min(args.profiles, args.challenges, args.teams, args.hackathons) < 1:
+        parser.error("every collection needs at least one seeded document")
+
+    baseline = load_baseline(args.baseline) if args.baseline and os.path.exists(args.baseline) else None
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.history:
+        with open(args.history, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(report) + "\n")
+    if baseline is not None and baseline.get("mode", report["mode"]) != report["mode"]:
+        print(f"Baseline mode {baseline['mode']} differs from {report['mode']}; not comparing", file=sys.stderr)
+        baseline = None
+    if baseline is not None:
+        found = regressions(report, baseline, args.tolerance)
+        for line in found:
+            print(f"Regression: {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,34 +3,103 @@
 Main entry point for the Hackathon Twin application.
 
 This allows running the app with: uv run main.py
+
+Serving options (flags override the environment):
+  --workers N                 WEB_CONCURRENCY (default 1); each worker is a separate
+                              process with its own event loop, Mongo client,
+                              generation rate limiter (WEB_CONCURRENCY splits the
+                              budget between them) and /metrics (series carry a
+                              `worker` label)
+  --loop auto|asyncio|uvloop  SERVE_LOOP (default auto: uvloop when installed)
+  --http auto|h11|httptools   SERVE_HTTP (default auto: httptools when installed)
+  --limit-max-requests N      SERVE_LIMIT_MAX_REQUESTS: recycle a worker after N
+                              requests (0 = never); it finishes in-flight requests
+                              and is replaced by the supervisor
+  --limit-max-requests-jitter N
+                              SERVE_LIMIT_MAX_REQUESTS_JITTER: random extra requests
+                              per worker, so workers do not all restart together
+  --backlog N                 SERVE_BACKLOG (default 2048)
+  --keep-alive SECONDS        SERVE_KEEP_ALIVE (default 5)
+  --graceful-timeout SECONDS  SERVE_GRACEFUL_TIMEOUT: wait for in-flight requests on
+                              shutdown (default 30)
+
+  uv run main.py --workers 4 --limit-max-requests 10000 --limit-max-requests-jitter 1000
+  uv sync --extra serve   # uvloop + httptools
 """
 
+import argparse
+import importlib.util
+import inspect
 import os
 import sys
 
+APP = "backend.main:app"
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name, "").strip()
+    return int(value) if value else default
+
+
+def _implementation(choice: str) -> str:
+    """`choice` unless it is an optional package that is not installed (then uvicorn's auto pick)."""
+    if choice in ("uvloop", "httptools") and importlib.util.find_spec(choice) is None:
+        print(f"{choice} is not installed (uv sync --extra serve); using auto", file=sys.stderr)
+        return "auto"
+    return choice
+
 
-def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the Hackathon Twin API")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=_env_int("PORT", 8000))
+    parser.add_argument("--workers", type=int, default=_env_int("WEB_CONCURRENCY", 1))
+    parser.add_argument("--loop", choices=["auto", "asyncio", "uvloop"], default=os.getenv("SERVE_LOOP", "auto"))
+    parser.add_argument("--http", choices=["auto", "h11", "httptools"], default=os.getenv("SERVE_HTTP", "auto"))
+    parser.add_argument("--limit-max-requests", type=int, default=_env_int("SERVE_LIMIT_MAX_REQUESTS", 0))
+    parser.add_argument(
+        "--limit-max-requests-jitter", type=int, default=_env_int("SERVE_LIMIT_MAX_REQUESTS_JITTER", 0)
+    )
+    parser.add_argument("--backlog", type=int, default=_env_int("SERVE_BACKLOG", 2048))
+    parser.add_argument("--keep-alive", type=int, default=_env_int("SERVE_KEEP_ALIVE", 5))
+    parser.add_argument("--graceful-timeout", type=int, default=_env_int("SERVE_GRACEFUL_TIMEOUT", 30))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main entry point for the application."""
     # Add the project root to Python path
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-    
-    # Import and run uvicorn
+
     import uvicorn
-    from backend.main import app
-    
-    # Get host and port from environment or use defaults
-    host = os.getenv("HOST", "0.0.0.0")
-    port = int(os.getenv("PORT", "8000"))
-    
-    # Run the server
-    uvicorn.run(
-        app,
-        host=host,
-        port=port,
-        reload=False,  # Set to True for development
-        log_level="info"
+
+    args = parse_args(argv)
+    options = dict(
+        host=args.host,
+        port=args.port,
+        workers=max(1, args.workers),
+        loop=_implementation(args.loop),
+        http=_implementation(args.http),
+        limit_max_requests=args.limit_max_requests or None,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        reload=False,  # use `uvicorn backend.main:app --reload` for development
+        log_level="info",
     )
+    if args.limit_max_requests_jitter:
+        if "limit_max_requests_jitter" in inspect.signature(uvicorn.Config.__init__).parameters:
+            options["limit_max_requests_jitter"] = args.limit_max_requests_jitter
+        else:
+            print("This uvicorn has no limit_max_requests_jitter; ignoring it", file=sys.stderr)
+
+    # Workers inherit the environment; keep the app's startup log in line with the flags,
+    # and tell per-process limits and metrics how many workers share the load
+    os.environ["HOST"], os.environ["PORT"] = args.host, str(args.port)
+    os.environ["WEB_CONCURRENCY"] = str(options["workers"])
+    # Workers are spawned processes that import the app themselves, so pass it by import string
+    uvicorn.run(APP, **options)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
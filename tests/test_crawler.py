@@ -0,0 +1,50 @@
+import asyncio
+from datetime import timedelta
+
+from agents.crawler import CrawlStore, crawl_due
+from benchmarks.fakedb import FakeMongoClient
+
+
+class FakeGitHub:
+    """Duck-typed `GitHubClient` serving `users` newest-first, one list per page."""
+
+    def __init__(self, users: int) -> None:
+        self.ids = list(range(users, 0, -1))
+        self.pages: list = []
+
+    def search_users_page(self, query, page, per_page=100, sort=None, order=None):
+        self.pages.append(page)
+        chunk = self.ids[(page - 1) * per_page:page * per_page]
+        return [{"id": i, "login": f"user{i}", "html_url": f"https://github.com/user{i}"} for i in chunk]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_a_query_paused_by_the_page_budget_is_claimable_again_immediately():
+    client = FakeMongoClient()
+    db = client["crawl"]
+    store = CrawlStore(db, owner="test")
+    github = FakeGitHub(users=250)  # pages of 100, 100, 50
+    run(store.enqueue(["python"]))
+
+    def crawl(max_pages: int):
+        return run(crawl_due(client, "crawl", store, github, max_pages, timedelta(hours=24), timedelta(minutes=5)))
+
+    [first] = crawl(max_pages=1)
+    # The paused query is claimed once per run, not again within the same run
+    assert (first.pages, first.caught_up) == (1, False)
+    assert github.pages == [1]
+
+    entry = run(store.claim(timedelta(minutes=5)))
+    assert entry is not None and entry["query"] == "python"
+    run(store.release(entry, timedelta(0), {}))
+
+    # The next run resumes from the checkpoint and catches up
+    [second] = crawl(max_pages=10)
+    assert second.caught_up and github.pages == [1, 2, 3]
+    assert run(db["profiles"].count_documents({})) == 250
+
+    # Caught up: not due again until the recrawl interval
+    assert run(store.claim(timedelta(minutes=5))) is None
@@ -0,0 +1,117 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+
+from agents.enrichment import enrich_profiles, pending_filter
+from agents.github_client import GitHubHTTPError, GitHubRateLimitError
+from benchmarks.fakedb import FakeMongoClient
+
+
+class FakeGitHub:
+    """Duck-typed `GitHubClient`: per-login exceptions, otherwise a fixed user."""
+
+    def __init__(self, errors: dict) -> None:
+        self.errors = errors
+        self.calls: list = []
+
+    def user(self, login: str) -> dict:
+        self.calls.append(login)
+        if login in self.errors:
+            raise self.errors[login]
+        return {"login": login, "location": "Berlin"}
+
+    def user_repos(self, login: str) -> list:
+        return [{"language": "Python"}]
+
+
+@pytest.fixture
+def db():
+    return FakeMongoClient(tz_aware=True)["test"]
+
+
+def _seed(db, logins):
+    docs = [{"_id": i, "linkedin_url": f"https://github.com/{login}"} for i, login in enumerate(logins)]
+    asyncio.run(db["profiles"].insert_many(docs))
+
+
+def _by_login(db) -> dict:
+    async def load():
+        return {doc["linkedin_url"].rsplit("/", 1)[1]: doc async for doc in db["profiles"].find({})}
+
+    return asyncio.run(load())
+
+
+def _pending(db, stale_after=timedelta(days=30)) -> set:
+    async def load():
+        return {doc["_id"] async for doc in db["profiles"].find(pending_filter(stale_after))}
+
+    return asyncio.run(load())
+
+
+def test_permanent_and_transient_failures_are_stamped_differently(db):
+    _seed(db, ["ok", "gone", "flaky"])
+    github = FakeGitHub({
+        "gone": GitHubHTTPError("/users/gone", 404, "Not Found"),
+        "flaky": ConnectionResetError("reset by peer"),
+    })
+
+    stats = asyncio.run(enrich_profiles(db, github, concurrency=2, retry_after=timedelta(minutes=5)))
+
+    assert (stats.enriched, stats.failed, stats.written) == (1, 2, 3)
+    docs = _by_login(db)
+    assert docs["ok"]["skills"] == ["Python"] and "enrichment_error" not in docs["ok"]
+    assert "enriched_at" in docs["gone"] and "enrichment_retry_at" not in docs["gone"]
+    assert "404" in docs["gone"]["enrichment_error"]
+    assert "enriched_at" not in docs["flaky"] and "enrichment_retry_at" in docs["flaky"]
+
+    # Nothing is pending until the transient failure's retry time has passed
+    assert _pending(db) == set()
+    asyncio.run(db["profiles"].update_one({"_id": docs["flaky"]["_id"]}, {"$set": {
+        "enrichment_retry_at": docs["flaky"]["enrichment_retry_at"] - timedelta(minutes=10),
+    }}))
+    assert _pending(db) == {docs["flaky"]["_id"]}
+
+    # A successful retry clears the error and the retry time
+    asyncio.run(enrich_profiles(db, FakeGitHub({})))
+    flaky = _by_login(db)["flaky"]
+    assert "enriched_at" in flaky
+    assert "enrichment_error" not in flaky and "enrichment_retry_at" not in flaky
+
+
+def test_rate_limit_stops_the_run_and_flushes_finished_updates(db):
+    logins = [f"user{i}" for i in range(10)]
+    _seed(db, logins)
+    reset_at = time.time() + 3600
+    github = FakeGitHub({"user3": GitHubRateLimitError("core", reset_at)})
+
+    stats = asyncio.run(enrich_profiles(db, github, concurrency=1, batch_size=100))
+
+    assert stats.rate_limited_until is not None
+    assert abs(stats.rate_limited_until.timestamp() - reset_at) < 1
+    # No GitHub calls after the rate-limited one; finished work is written
+    assert github.calls == logins[:4]
+    assert (stats.enriched, stats.failed, stats.written) == (3, 0, 3)
+    docs = _by_login(db)
+    assert all("enriched_at" in docs[login] for login in logins[:3])
+    # The rate-limited profile and everything after it stay pending
+    assert _pending(db) == {i for i in range(3, 10)}
+
+
+def test_writer_failure_cancels_the_pipeline_and_propagates(db, monkeypatch):
+    _seed(db, [f"user{i}" for i in range(20)])
+
+    async def failing_bulk_write(self, requests, ordered=True):
+        raise ConnectionResetError("primary stepped down")
+
+    monkeypatch.setattr(type(db["profiles"]), "bulk_write", failing_bulk_write)
+
+    async def run():
+        # Before the fix the workers stayed blocked on the full done queue
+        return await asyncio.wait_for(enrich_profiles(db, FakeGitHub({}), concurrency=2, batch_size=1), 5)
+
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(run())
+    # Nothing was written, so every profile is picked up again next run
+    assert _pending(db) == set(range(20))
@@ -0,0 +1,213 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+import agents.outreach_agent
+from agents.recruitment_agent import Profile, upsert_profiles
+from backend.config import get_settings
+from backend.utils.indexes import ensure_indexes
+from backend.utils.request_context import current_request
+from benchmarks.fakedb import FakeMongoClient, memory_client, reset_memory_clients
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def db():
+    return FakeMongoClient()["test"]
+
+
+@pytest.fixture
+def profiles(db):
+    run(ensure_indexes(db))
+    return db["profiles"]
+
+
+# ---------- update operators ----------
+def test_add_to_set_and_pull(db):
+    teams = db["teams"]
+    run(teams.insert_one({"_id": "t1", "members": ["ann"]}))
+
+    async def update(update):
+        return await teams.find_one_and_update({"_id": "t1"}, update, return_document=ReturnDocument.AFTER)
+
+    assert run(update({"$addToSet": {"members": "bob"}}))["members"] == ["ann", "bob"]
+    assert run(update({"$addToSet": {"members": "bob"}}))["members"] == ["ann", "bob"]
+    assert run(update({"$addToSet": {"members": {"$each": ["bob", "cy", "cy"]}}}))["members"] == ["ann", "bob", "cy"]
+    assert run(update({"$pull": {"members": "bob"}}))["members"] == ["ann", "cy"]
+    assert run(update({"$pull": {"members": {"$in": ["ann", "zed"]}}}))["members"] == ["cy"]
+    # Missing document: no upsert, nothing returned
+    assert run(teams.find_one_and_update({"_id": "nope"}, {"$addToSet": {"members": "x"}})) is None
+
+
+def test_upsert_seeds_the_new_document_from_the_filter(db):
+    col = db["crawl_frontier"]
+    update = {"$set": {"status": "due"}, "$setOnInsert": {"attempts": 0}, "$inc": {"runs": 1}}
+
+    result = run(col.update_one({"_id": "q:python", "source": "github"}, update, upsert=True))
+    assert result.upserted_id == "q:python" and result.matched_count == 0
+    assert run(col.find_one({"_id": "q:python"})) == {
+        "_id": "q:python",
+        "source": "github",
+        "status": "due",
+        "attempts": 0,
+        "runs": 1,
+    }
+
+    # Second time it matches: $setOnInsert is skipped
+    run(col.update_one({"_id": "q:python"}, {"$set": {"attempts": 5}}))
+    result = run(col.update_one({"_id": "q:python", "source": "github"}, update, upsert=True))
+    assert result.upserted_id is None and result.matched_count == 1
+    doc = run(col.find_one({"_id": "q:python"}))
+    assert (doc["attempts"], doc["runs"]) == (5, 2)
+
+
+# ---------- indexes and errors ----------
+def test_partial_unique_indexes_only_cover_matching_documents(profiles):
+    # uniq_email covers documents with an email; uniq_identity_hash only string hashes
+    run(profiles.insert_many([{"name": "a"}, {"name": "b"}, {"identity_hash": None}, {"identity_hash": None}]))
+    run(profiles.insert_one({"email": "ann@example.com", "identity_hash": "h1"}))
+
+    with pytest.raises(DuplicateKeyError) as info:
+        run(profiles.insert_one({"email": "ann@example.com"}))
+    assert info.value.code == 11000
+    assert info.value.details["keyValue"] == {"email": "ann@example.com"}
+
+    with pytest.raises(DuplicateKeyError):
+        run(profiles.update_one({"name": "a"}, {"$set": {"identity_hash": "h1"}}))
+    assert run(profiles.count_documents({})) == 5
+
+
+def test_unordered_bulk_write_applies_the_rest_and_reports_duplicates(profiles):
+    run(profiles.insert_one({"_id": "p0", "identity_hash": "taken"}))
+    ops = [
+        UpdateOne({"identity_hash": "new1"}, {"$setOnInsert": {"_id": "p1", "identity_hash": "new1"}}, upsert=True),
+        UpdateOne({"_id": "p2"}, {"$setOnInsert": {"identity_hash": "taken"}}, upsert=True),
+        UpdateOne({"identity_hash": "new2"}, {"$setOnInsert": {"_id": "p3", "identity_hash": "new2"}}, upsert=True),
+    ]
+
+    with pytest.raises(BulkWriteError) as info:
+        run(profiles.bulk_write(ops, ordered=False))
+
+    details = info.value.details
+    assert details["nUpserted"] == 2
+    assert [(e["index"], e["code"]) for e in details["writeErrors"]] == [(1, 11000)]
+    assert sorted(d["_id"] for d in run(profiles.find({}).to_list(None))) == ["p0", "p1", "p3"]
+
+
+def test_ordered_bulk_write_stops_at_the_first_error(profiles):
+    run(profiles.insert_one({"_id": "p0", "email": "x@example.com"}))
+    ops = [
+        UpdateOne({"_id": "p1"}, {"$set": {"email": "x@example.com"}}, upsert=True),
+        UpdateOne({"_id": "p2"}, {"$set": {"email": "y@example.com"}}, upsert=True),
+    ]
+
+    with pytest.raises(BulkWriteError) as info:
+        run(profiles.bulk_write(ops))
+
+    assert info.value.details["nUpserted"] == 0
+    assert run(profiles.count_documents({})) == 1
+
+
+def test_upsert_profiles_counts_inserted_and_existing(db):
+    client = db.client
+    run(ensure_indexes(db))
+    batch = [
+        Profile("Ann", "ann@example.com", [], "Berlin", "https://github.com/ann"),
+        Profile("Bob", "bob@example.com", [], "Paris", "https://github.com/bob"),
+    ]
+
+    first = run(upsert_profiles(client, db.name, batch))
+    again = run(upsert_profiles(client, db.name, batch + [Profile("Cy", "", [], "", "https://github.com/cy")]))
+
+    assert (first.inserted, first.matched, first.errors) == (2, 0, 0)
+    assert (again.inserted, again.matched, again.errors) == (1, 2, 0)
+
+
+# ---------- API on memory:// ----------
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setenv("MONGODB_URI", "memory://")
+    monkeypatch.setenv("DB_NAME", "api_test")
+    get_settings.cache_clear()
+    reset_memory_clients()
+    from backend.main import app
+
+    with TestClient(app) as client:
+        yield client
+    get_settings.cache_clear()
+    reset_memory_clients()
+
+
+def test_create_app_reads_settings_when_called(monkeypatch):
+    monkeypatch.setenv("MONGODB_URI", "memory://")
+    monkeypatch.setenv("DISABLED_ROUTERS", "hackathons")
+    get_settings.cache_clear()
+    import backend.main
+
+    try:
+        paths = set(backend.main.create_app().openapi()["paths"])
+    finally:
+        get_settings.cache_clear()
+    assert "/health" in paths and "/profiles/" in paths and "/metrics" not in paths
+    assert not any(path.startswith("/hackathons") for path in paths)
+
+
+def test_profile_and_team_crud_on_the_in_memory_database(api):
+    profile = {
+        "name": "Ann",
+        "email": "ann@example.com",
+        "skills": ["Python"],
+        "location": "Berlin",
+        "linkedin_url": "https://github.com/ann",
+        "status": "scraped",
+    }
+    created = api.post("/profiles/", json=profile)
+    assert created.status_code == 201
+    profile_id = created.json()["_id"]
+
+    assert api.post("/profiles/", json={**profile, "linkedin_url": "https://github.com/ann2"}).status_code == 409
+    assert api.get(f"/profiles/{profile_id}").json()["name"] == "Ann"
+    assert [p["_id"] for p in api.get("/profiles/").json()] == [profile_id]
+    assert api.patch(f"/profiles/{profile_id}", json={"location": "Paris"}).json()["location"] == "Paris"
+
+    team_id = api.post("/teams/", json={"name": "T", "skills_needed": ["Python"]}).json()["_id"]
+    members = api.post(f"/teams/{team_id}/members/{profile_id}").json()["members"]
+    assert members == [profile_id]
+    assert api.post(f"/teams/{team_id}/members/{profile_id}").json()["members"] == [profile_id]
+    assert api.delete(f"/teams/{team_id}/members/{profile_id}").json()["members"] == []
+
+    assert api.delete(f"/profiles/{profile_id}").status_code == 204
+    assert api.get(f"/profiles/{profile_id}").status_code == 404
+    # The API and other clients in the process share the same in-memory data
+    assert run(memory_client()["api_test"]["teams"].count_documents({})) == 1
+
+
+def test_send_emails_runs_smtp_off_the_event_loop_with_the_request_context(api, monkeypatch):
+    calls = []
+
+    def fake_send(to_email, subject, message):
+        try:
+            asyncio.get_running_loop()
+            on_loop = True
+        except RuntimeError:
+            on_loop = False
+        calls.append((to_email, on_loop, current_request.get()))
+
+    monkeypatch.setattr(agents.outreach_agent, "send_email_via_gmail", fake_send)
+    db = memory_client()["api_test"]
+    run(db["hackathons"].insert_one({"_id": "h1", "topic": "AI"}))
+    run(db["profiles"].insert_one({"_id": "p1", "email": "ann@example.com"}))
+    run(db["outreach_messages"].insert_one({"hackathon_id": "h1", "profile_id": "p1", "status": "generated"}))
+
+    assert api.post("/hackathons/h1/send-emails?dry_run=false").json() == 1
+
+    [(to_email, on_loop, request)] = calls
+    assert to_email == "ann@example.com"
+    assert not on_loop
+    assert request is not None and request.path == "/hackathons/h1/send-emails"
@@ -0,0 +1,188 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Tuple
+
+import pytest
+
+from agents.github_client import GitHubClient, GitHubRateLimitError
+
+Response = Tuple[int, dict, Optional[dict]]
+
+
+class FakeGitHub:
+    """Local stand-in for api.github.com: a settable handler answers each request, requests are recorded."""
+
+    def __init__(self) -> None:
+        self.requests: List[Tuple[str, dict]] = []
+        self.handler: Callable[[str, dict], Optional[Response]] = lambda path, headers: (404, {}, None)
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                headers = {k.lower(): v for k, v in self.headers.items()}
+                fake.requests.append((self.path, headers))
+                response = fake.handler(self.path, headers)
+                if response is None:
+                    # Drop the connection without answering
+                    self.close_connection = True
+                    return
+                status, extra, body = response
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in extra.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def github():
+    fake = FakeGitHub()
+    yield fake
+    fake.close()
+
+
+@pytest.fixture
+def sleeps() -> List[float]:
+    return []
+
+
+def make_client(github: FakeGitHub, sleeps: List[float], **kwargs) -> GitHubClient:
+    return GitHubClient(base_url=github.url, sleep=sleeps.append, timeout=5.0, **kwargs)
+
+
+def _query(path: str) -> dict:
+    from urllib.parse import parse_qs, urlsplit
+
+    return {k: v[0] for k, v in parse_qs(urlsplit(path).query).items()}
+
+
+def test_search_users_pages_until_a_short_page(github, sleeps):
+    users = [{"login": f"user{i}", "html_url": f"https://github.com/user{i}"} for i in range(5)]
+
+    def handler(path, headers):
+        q = _query(path)
+        page, per_page = int(q["page"]), int(q["per_page"])
+        return 200, {}, {"items": users[(page - 1) * per_page:page * per_page]}
+
+    github.handler = handler
+    client = make_client(github, sleeps)
+
+    found = list(client.search_users("python", limit=10))
+
+    assert [item["login"] for _, item in found] == [u["login"] for u in users]
+    # per_page is min(100, limit); the first short page ends the search
+    assert [int(_query(p)["page"]) for p, _ in github.requests] == [1]
+    assert _query(github.requests[0][0])["per_page"] == "10"
+
+    github.requests.clear()
+    found = list(client.search_users("python", limit=4))
+    assert [page for page, _ in found] == [1, 1, 1, 1]
+
+    github.requests.clear()
+    client = make_client(github, sleeps)
+    found = []
+    for page in (1, 2, 3):
+        found.extend(client.search_users_page("python", page, per_page=2))
+    assert len(found) == 5
+
+
+def test_search_stops_at_the_result_cap(github, sleeps):
+    client = make_client(github, sleeps)
+    assert client.search_users_page("python", page=11, per_page=100) == []
+    assert github.requests == []
+
+
+def test_etag_is_sent_and_304_reuses_the_cached_body(github, sleeps, tmp_path):
+    body = {"login": "octocat", "public_repos": 8}
+
+    def handler(path, headers):
+        if headers.get("if-none-match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, None
+        return 200, {"ETag": '"v1"'}, body
+
+    github.handler = handler
+    client = make_client(github, sleeps, cache_dir=str(tmp_path))
+
+    assert client.user("octocat") == body
+    assert "if-none-match" not in github.requests[0][1]
+
+    # A new client (next run) shares the on-disk cache
+    client = make_client(github, sleeps, cache_dir=str(tmp_path))
+    assert client.user("octocat") == body
+    assert github.requests[1][1]["if-none-match"] == '"v1"'
+    assert client.stats["not_modified"] == 1
+
+
+def test_rate_limit_sleeps_until_reset_when_within_max_wait(github, sleeps):
+    reset = int(time.time()) + 5
+    responses = [
+        (403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset), "X-RateLimit-Resource": "core"}, {}),
+        (200, {"X-RateLimit-Remaining": "59", "X-RateLimit-Reset": str(reset + 3600)}, {"login": "octocat"}),
+    ]
+    github.handler = lambda path, headers: responses.pop(0)
+    client = make_client(github, sleeps, max_wait=60)
+
+    assert client.user("octocat") == {"login": "octocat"}
+    assert len(sleeps) == 1 and 0 < sleeps[0] <= 7
+    assert client.stats["rate_waits"] == 1
+
+
+def test_rate_limit_raises_when_reset_is_beyond_max_wait(github, sleeps):
+    reset = int(time.time()) + 3600
+    github.handler = lambda path, headers: (
+        403,
+        {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset), "X-RateLimit-Resource": "core"},
+        {"message": "API rate limit exceeded"},
+    )
+    client = make_client(github, sleeps, max_wait=60)
+
+    with pytest.raises(GitHubRateLimitError) as info:
+        client.user("octocat")
+    assert info.value.reset_at == reset
+    assert sleeps == []
+
+
+def test_server_errors_are_retried_with_backoff(github, sleeps):
+    responses = [(502, {}, {}), (503, {}, {}), (200, {}, {"login": "octocat"})]
+    github.handler = lambda path, headers: responses.pop(0)
+    client = make_client(github, sleeps)
+
+    assert client.user("octocat") == {"login": "octocat"}
+    assert sleeps == [2, 4]
+    assert client.stats["retries"] == 2
+
+
+def test_dropped_connections_are_retried(github, sleeps):
+    responses: List[Optional[Response]] = [None, None, (200, {}, {"login": "octocat"})]
+    github.handler = lambda path, headers: responses.pop(0)
+    client = make_client(github, sleeps)
+
+    assert client.user("octocat") == {"login": "octocat"}
+    assert client.stats["retries"] == 2
+
+
+def test_network_errors_propagate_after_max_retries(sleeps):
+    client = GitHubClient(base_url="http://127.0.0.1:9", sleep=sleeps.append, timeout=1.0, max_retries=2)
+
+    with pytest.raises(OSError):
+        client.user("octocat")
+    assert len(sleeps) == 2
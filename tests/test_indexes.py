@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from backend.utils.indexes import META_COLLECTION, META_ID, ensure_indexes
+from benchmarks.fakedb import FakeMongoClient
+
+OPTIONAL = "profiles.uniq_identity_hash"
+
+
+@pytest.fixture
+def db():
+    return FakeMongoClient()["test"]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def _seed_duplicate_identities(db) -> None:
+    run(db["profiles"].insert_many([{"identity_hash": "same"}, {"identity_hash": "same"}]))
+
+
+async def _index_names(db, collection: str) -> dict:
+    return {i["name"]: i for i in await db[collection].list_indexes().to_list(None)}
+
+
+def test_failed_optional_index_is_recorded_with_the_fingerprint(db):
+    _seed_duplicate_identities(db)
+
+    result = run(ensure_indexes(db))
+
+    assert result.status == "incomplete"
+    assert set(result.failed) == {OPTIONAL}
+    assert OPTIONAL not in result.created
+    assert "profiles.uniq_email" in result.created
+    meta = run(db[META_COLLECTION].find_one({"_id": META_ID}))
+    assert meta["fingerprint"] == result.fingerprint
+    assert [f["index"] for f in meta["failed"]] == [OPTIONAL]
+    assert "lease_until" not in meta
+
+    # Unchanged registry: the next boot skips reconciliation but still reports the failure
+    again = run(ensure_indexes(db))
+    assert again.status == "skipped"
+    assert set(again.failed) == {OPTIONAL}
+    assert again.created == []
+
+
+def test_force_retries_failed_indexes_and_clears_them(db):
+    _seed_duplicate_identities(db)
+    run(ensure_indexes(db))
+    run(db["profiles"].delete_many({}))
+
+    result = run(ensure_indexes(db, force=True))
+
+    assert result.status == "reconciled"
+    assert result.created == [OPTIONAL]
+    assert "failed" not in run(db[META_COLLECTION].find_one({"_id": META_ID}))
+    assert "uniq_identity_hash" in run(_index_names(db, "profiles"))
+
+
+def test_failed_replacement_restores_the_previous_index(db):
+    _seed_duplicate_identities(db)
+    # An older, non-unique definition under the same name
+    run(db["profiles"].create_index([("identity_hash", 1)], name="uniq_identity_hash"))
+
+    result = run(ensure_indexes(db))
+
+    assert result.status == "incomplete"
+    assert OPTIONAL not in result.replaced and OPTIONAL not in result.created
+    previous = run(_index_names(db, "profiles"))["uniq_identity_hash"]
+    assert dict(previous["key"]) == {"identity_hash": 1}
+    assert not previous.get("unique")
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import List
+
+import google.generativeai as genai
+import pytest
+
+from backend.utils import llm_usage, tracing
+from backend.utils.tracing import Span, SpanExporter, Tracer
+from benchmarks.fakedb import FakeMongoClient
+
+
+class ListExporter(SpanExporter):
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]) -> None:
+        self.spans.extend(spans)
+
+
+class FakeModel:
+    """Stands in for `genai.GenerativeModel`; `fail` raises instead of answering."""
+
+    fail = False
+    delay = 0.0
+
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+
+    def generate_content(self, prompt: str):
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        time.sleep(self.delay)
+        usage = SimpleNamespace(prompt_token_count=12, candidates_token_count=34, total_token_count=46)
+        return SimpleNamespace(text="hello there", usage_metadata=usage)
+
+
+@pytest.fixture
+def traced(monkeypatch):
+    exporter = ListExporter()
+    tracer = Tracer(exporter, sample_rate=1.0)
+    recorder = llm_usage.LLMCallRecorder()
+    monkeypatch.setattr(tracing, "_tracer", tracer)
+    monkeypatch.setattr(llm_usage, "recorder", recorder)
+    monkeypatch.setattr(genai, "GenerativeModel", FakeModel)
+    monkeypatch.setattr(FakeModel, "fail", False)
+    monkeypatch.setattr(FakeModel, "delay", 0.0)
+    yield exporter, tracer, recorder
+    tracer.shutdown()
+
+
+def test_span_exporter_is_abstract():
+    with pytest.raises(TypeError):
+        SpanExporter()
+
+
+def test_generate_content_records_usage_on_the_span_and_the_call(traced):
+    exporter, tracer, recorder = traced
+
+    resp = asyncio.run(llm_usage.generate_content("gemini-1.5-flash", "hi", caller="test"))
+    tracer.shutdown()
+
+    assert resp.text == "hello there"
+    [span] = exporter.spans
+    assert span.name == "llm.generate_content" and span.error is None
+    assert span.attributes["llm.prompt_tokens"] == 12
+    assert span.attributes["llm.output_tokens"] == 34
+    [doc] = recorder._buffer
+    assert doc["usage"]["prompt_token_count"] == 12
+    assert doc["outcome"] == "ok" and doc["output_chars"] == len("hello there")
+    assert doc["cost_usd"] > 0
+
+
+def test_generate_content_failure_ends_the_span_with_the_error(traced, monkeypatch):
+    exporter, tracer, recorder = traced
+    monkeypatch.setattr(FakeModel, "fail", True)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(llm_usage.generate_content("gemini-1.5-flash", "hi", caller="test"))
+    tracer.shutdown()
+
+    [span] = exporter.spans
+    assert span.error == "RuntimeError: quota exceeded"
+    [doc] = recorder._buffer
+    assert doc["outcome"] == "error" and doc["usage"] == {} and doc["cost_usd"] == 0
+
+
+def test_cancelled_generate_content_is_recorded_as_cancelled(traced, monkeypatch):
+    exporter, tracer, recorder = traced
+    monkeypatch.setattr(FakeModel, "delay", 0.2)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(llm_usage.generate_content("gemini-1.5-flash", "hi", caller="test"), 0.01))
+    tracer.shutdown()
+
+    [span] = exporter.spans
+    assert span.error is not None and "CancelledError" in span.error
+    [doc] = recorder._buffer
+    assert doc["outcome"] == "cancelled" and doc["cost_usd"] == 0
+
+
+def test_usage_report_keeps_cancelled_calls_out_of_errors_and_latency():
+    db = FakeMongoClient()["test"]
+    now = datetime.now(timezone.utc)
+    calls = [("ok", 100.0), ("ok", 200.0), ("error", 300.0), ("cancelled", 5.0), ("cancelled", 7.0)]
+    asyncio.run(db[llm_usage.COLLECTION].insert_many([
+        {"caller": "test", "model": "m", "outcome": outcome, "latency_ms": ms, "usage": {}, "cost_usd": 0.0, "created_at": now}
+        for outcome, ms in calls
+    ]))
+
+    [row] = asyncio.run(llm_usage.usage_report(db))
+
+    assert (row["calls"], row["errors"], row["cancelled"]) == (5, 1, 2)
+    assert (row["p50_ms"], row["p95_ms"]) == (200.0, 300.0)
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from backend.config import get_settings
+from backend.utils import admission
+from backend.utils.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def settings_env(monkeypatch):
+    monkeypatch.setenv("MONGODB_URI", "memory://")
+    get_settings.cache_clear()
+    yield monkeypatch
+    get_settings.cache_clear()
+
+
+def _registry(workers: int) -> MetricsRegistry:
+    registry = MetricsRegistry(workers=workers)
+    registry.counter("jobs_total", "Jobs", ("queue",)).inc("default")
+    registry.counter("ticks_total", "Ticks").inc()
+    return registry
+
+
+def test_metrics_have_no_worker_label_with_one_worker():
+    assert _registry(1).render().splitlines()[2:] == [
+        'jobs_total{queue="default"} 1.0',
+        "# HELP ticks_total Ticks",
+        "# TYPE ticks_total counter",
+        "ticks_total 1.0",
+    ]
+
+
+def test_metrics_are_labelled_by_worker_pid_with_several_workers():
+    lines = _registry(4).render().splitlines()
+    worker = f'worker="{os.getpid()}"'
+    assert f'jobs_total{{{worker},queue="default"}} 1.0' in lines
+    assert f"ticks_total{{{worker}}} 1.0" in lines
+    assert "# TYPE ticks_total counter" in lines
+
+
+def test_generation_budget_is_split_across_workers(settings_env):
+    settings_env.setenv("GENERATION_RATE_PER_MINUTE", "12")
+    settings_env.setenv("GENERATION_BURST", "3")
+    settings_env.setenv("WEB_CONCURRENCY", "4")
+    settings_env.setattr(admission, "_generation_limiter", None)
+
+    limiter = admission.get_generation_limiter()
+
+    assert limiter.rate * 60 == pytest.approx(3.0)
+    assert limiter.burst == 1